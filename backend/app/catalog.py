@@ -0,0 +1,370 @@
+"""
+In-memory places catalog for the Ayodhya Guide API
+
+The catalog is loaded once from the configured storage backend and kept
+resident. A background watcher polls the backend and, when it changes, builds
+a complete new Catalog off to the side and swaps it in with a single reference
+assignment, so readers always see either the old or the new version and
+never a half-loaded one.
+"""
+
+import os
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from .columns import BBox, DocMask, PlaceColumns
+from .facets import FacetIndex
+from .fuzzy import FuzzyIndex
+from .geo import SpatialIndex, coordinates_of
+from .hours import local_now
+from .metrics import catalog_load_latency
+from .models import Place
+from .responses import BodyLRU
+from .search import SearchIndex
+from .snapshot import MappedCatalog
+from .storage import RecordFilter, StorageBackend, TextSearch, backend_from_env
+from .suggest import Completion, Suggester, completions_from
+
+
+# Version of the placeholder catalog served when the data can't be read
+EMPTY_VERSION = "empty"
+
+
+class CatalogError(ValueError):
+    """Raised when the places data is not a valid catalog"""
+
+
+def validate_places(places) -> List[Dict]:
+    """Validate every record against Place once; return response-shaped dicts"""
+    if not isinstance(places, list):
+        raise CatalogError("places data must be a JSON list")
+
+    records = []
+    errors = []
+    seen_slugs = set()
+    for i, raw in enumerate(places):
+        label = raw.get("slug", "?") if isinstance(raw, dict) else "?"
+        try:
+            record = Place.model_validate(raw).model_dump()
+        except ValidationError as e:
+            problems = "; ".join(
+                f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+            )
+            errors.append(f"record {i} ({label}): {problems}")
+            continue
+        if record.get("category"):
+            # A handful of distinct values shared by every record
+            record["category"] = sys.intern(record["category"])
+        if record["slug"] in seen_slugs:
+            errors.append(f"record {i} ({label}): duplicate slug")
+        seen_slugs.add(record["slug"])
+        records.append(record)
+
+    if errors:
+        shown = "\n  ".join(errors[:20])
+        more = f"\n  ... and {len(errors) - 20} more" if len(errors) > 20 else ""
+        raise CatalogError(f"{len(errors)} invalid place record(s):\n  {shown}{more}")
+    return records
+
+
+class _RecordLookup:
+    """record_by_slug as a view over Catalog.doc_by_slug"""
+
+    __slots__ = ("_catalog",)
+
+    def __init__(self, catalog: "Catalog"):
+        self._catalog = catalog
+
+    def __getitem__(self, slug: str) -> Dict:
+        return self._catalog.records[self._catalog.doc_by_slug[slug]]
+
+    def __contains__(self, slug: str) -> bool:
+        return slug in self._catalog.doc_by_slug
+
+    def get(self, slug: str, default=None):
+        doc_id = self._catalog.doc_by_slug.get(slug)
+        return default if doc_id is None else self._catalog.records[doc_id]
+
+
+class Catalog:
+    """Immutable snapshot of the places data for one version of the file"""
+
+    def __init__(
+        self,
+        places: List[Dict],
+        version: str,
+        text_search: Optional[TextSearch] = None,
+        record_filter: Optional[RecordFilter] = None,
+    ):
+        # Seconds spent on each build step, for the startup report
+        self.build_timings: Dict[str, float] = {}
+        start = time.perf_counter()
+        # Validated once here; responses reuse these instead of running
+        # response_model validation on every request. Only the records are
+        # kept: places is read by the index builds below (search and
+        # suggestions also use tags, which Place drops) and then released.
+        self.records: List[Dict] = validate_places(places)
+        self.build_timings["validate"] = time.perf_counter() - start
+        self.places = self.records
+        self.version = version
+        # Pre-encoded response bodies for this version (see responses.py)
+        self.encoded: Dict[str, object] = {}
+        self.record_bodies = BodyLRU()
+
+        # Lookup indexes, built once per version
+        self.doc_by_slug: Dict[str, int] = {r["slug"]: doc_id for doc_id, r in enumerate(self.records)}
+        self.record_by_slug = _RecordLookup(self)
+        self.categories: List[str] = sorted({r["category"] for r in self.records if r.get("category")})
+        # Rating, coordinates and category as NumPy columns for filters
+        self.columns = PlaceColumns.from_places(self.records)
+        mark = time.perf_counter()
+        self.build_timings["lookups"] = mark - start - self.build_timings["validate"]
+        # A backend with its own text search (SQLite FTS5) replaces the
+        # in-memory inverted index
+        self.text_search = text_search
+        # Likewise a backend's indexed category/rating filter (SQLite)
+        self.record_filter = record_filter
+        self.search_index = SearchIndex(places) if text_search is None else None
+        self.build_timings["search_index"] = time.perf_counter() - mark
+        mark = time.perf_counter()
+        points = []
+        for doc_id, record in enumerate(self.records):
+            coords = coordinates_of(record)
+            if coords:
+                points.append((doc_id, coords[0], coords[1]))
+        self.spatial_index = SpatialIndex(points)
+        self.build_timings["spatial_index"] = time.perf_counter() - mark
+        mark = time.perf_counter()
+        self.suggester = Suggester(completions_from(places))
+        self.build_timings["suggest"] = time.perf_counter() - mark
+        mark = time.perf_counter()
+        self.fuzzy_index = FuzzyIndex.from_places(self.records)
+        self.build_timings["fuzzy_index"] = time.perf_counter() - mark
+        mark = time.perf_counter()
+        self.facets = FacetIndex.from_places(self.records, self.columns, self.categories)
+        self.build_timings["facets"] = time.perf_counter() - mark
+
+    def get(self, slug: str) -> Optional[Dict]:
+        """Look up a place by slug"""
+        return self.record_by_slug.get(slug)
+
+    def in_category(self, category: str) -> List[Dict]:
+        """Places in a category, matched case-insensitively"""
+        if self.columns.category(category) is None:
+            return []
+        return self._take(self.columns.filter(category=category).tolist())
+
+    def _take(self, doc_ids: Iterable[int]) -> List[Dict]:
+        records = self.records
+        return [records[doc_id] for doc_id in doc_ids]
+
+    def top_rated(self, limit: int) -> List[Dict]:
+        """Highest rated places first"""
+        return [self.records[doc_id] for doc_id in self.columns.top_rated(limit)]
+
+    def filter(
+        self,
+        category: Optional[str] = None,
+        min_rating: Optional[float] = None,
+        max_rating: Optional[float] = None,
+        bbox: Optional[BBox] = None,
+    ) -> List[Dict]:
+        """Validated records matching every given filter, in catalog order"""
+        if self.record_filter is not None and (
+            category is not None or min_rating is not None or max_rating is not None
+        ):
+            doc_ids = self.record_filter(category, min_rating, max_rating)
+            if bbox is not None:
+                inside = self.columns.mask(bbox=bbox)
+                doc_ids = [doc_id for doc_id in doc_ids if inside[doc_id]]
+        else:
+            doc_ids = self.columns.filter(
+                category=category, min_rating=min_rating, max_rating=max_rating, bbox=bbox
+            ).tolist()
+        return [self.records[doc_id] for doc_id in doc_ids]
+
+    def search(self, query: str, category: Optional[str] = None, fuzzy: Optional[bool] = None) -> List[Dict]:
+        """Ranked full-text search, optionally restricted to one category
+
+        By default falls back to fuzzy name matching when nothing matches
+        exactly; fuzzy=True only matches fuzzily, fuzzy=False never does.
+        """
+        if not query.strip():
+            # An empty query matches everything, as before
+            return self.in_category(category) if category else list(self.records)
+        return [self.records[doc_id] for doc_id in self.search_ids(query, category, fuzzy)]
+
+    def search_ids(self, query: str, category: Optional[str] = None, fuzzy: Optional[bool] = None) -> List[int]:
+        """Doc ids for search(), best first"""
+        if not query.strip():
+            return self.columns.filter(category=category).tolist() if category else list(range(len(self.records)))
+        doc_ids = [] if fuzzy else self._exact_ids(query, category)
+        if doc_ids or fuzzy is False:
+            return doc_ids
+        allowed = DocMask(self.columns.mask(category=category)) if category else None
+        return [doc_id for doc_id, _ in self.fuzzy_index.search(query, allowed)]
+
+    def _exact_ids(self, query: str, category: Optional[str]) -> List[int]:
+        if self.text_search is not None:
+            doc_ids = (self.doc_by_slug.get(slug) for slug in self.text_search(query, category))
+            return [doc_id for doc_id in doc_ids if doc_id is not None]
+        allowed = DocMask(self.columns.mask(category=category)) if category else None
+        return [doc_id for doc_id, _ in self.search_index.search(query, allowed)]
+
+    def faceted_search(
+        self,
+        query: str,
+        filters: Optional[Dict[str, List[str]]] = None,
+        fuzzy: Optional[bool] = None,
+        category: Optional[str] = None,
+    ) -> Tuple[List[Dict], Dict[str, Dict[str, int]]]:
+        """search() narrowed by facet filters, plus per-facet counts (see facets.py)
+
+        category restricts the search itself, so it applies on top of any
+        category facet filter and the counts only cover that category.
+        """
+        now = local_now()
+        doc_ids, counts = self.facets.apply(
+            self.search_ids(query, category, fuzzy), filters, (now.weekday(), now.hour * 60 + now.minute)
+        )
+        return [self.records[doc_id] for doc_id in doc_ids], counts
+
+    def nearby(
+        self,
+        lat: float,
+        lon: float,
+        radius: Optional[float] = None,
+        k: Optional[int] = None,
+        category: Optional[str] = None,
+    ) -> List[Tuple[Dict, float]]:
+        """(place, metres) pairs nearest first"""
+        allowed = DocMask(self.columns.mask(category=category)) if category else None
+        hits = self.spatial_index.nearby(lat, lon, radius, k, allowed)
+        return [(self.records[doc_id], distance) for doc_id, distance in hits]
+
+    def suggest(self, query: str, limit: int = 10) -> List[Completion]:
+        """Typeahead completions for a partial query, best rated first"""
+        return self.suggester.suggest(query, limit)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+
+class CatalogStore:
+    """Process-wide holder of the current Catalog with hot reload"""
+
+    def __init__(self, backend: Optional[StorageBackend] = None, poll_interval: float = 2.0):
+        self._backend = backend
+        self.poll_interval = poll_interval
+        self._current: Optional[Catalog] = None
+        self._signature = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        # Seconds for the most recent successful load: read/parse, then build
+        self.load_timings: Dict[str, float] = {}
+
+    @property
+    def loaded(self) -> bool:
+        """True once real catalog data (not the empty fallback) is live"""
+        return self._current is not None and self._current.version != EMPTY_VERSION
+
+    @property
+    def backend(self) -> StorageBackend:
+        if self._backend is None:
+            self._backend = backend_from_env()
+        return self._backend
+
+    @property
+    def current(self) -> Catalog:
+        """Return the live catalog, loading it on first use"""
+        catalog = self._current
+        if catalog is None:
+            self.refresh()
+            catalog = self._current
+        return catalog
+
+    def refresh(self) -> bool:
+        """Reload the catalog if the backend changed; return True on swap"""
+        with self._lock:
+            backend = self.backend
+            signature = backend.signature()
+            if self._current is not None and signature == self._signature:
+                return False
+
+            known = self._current.version if self._current is not None else None
+            start = time.perf_counter()
+            try:
+                loaded = backend.load(known)
+            except OSError as e:
+                print(f"Error loading places data: {e}")
+                if self._current is None:
+                    self._current = Catalog([], EMPTY_VERSION)
+                return False
+            except Exception as e:
+                print(f"Error loading places data: {e}")
+                if self._current is None:
+                    raise
+                self._signature = signature
+                return False
+
+            self._signature = signature
+            load_seconds = time.perf_counter() - start
+            catalog_load_latency.observe(load_seconds, "load")
+            if loaded is None:
+                return False
+
+            places, version = loaded
+            start = time.perf_counter()
+            try:
+                if isinstance(places, MappedCatalog):
+                    catalog = places
+                else:
+                    catalog = Catalog(places, version, backend.text_search, backend.record_filter)
+            except Exception as e:
+                print(f"Error loading places data: {e}")
+                if self._current is None:
+                    # Refuse to start on a bad catalog; on reload keep serving
+                    # the last good version instead
+                    raise
+                return False
+
+            build_seconds = time.perf_counter() - start
+            catalog_load_latency.observe(build_seconds, "build")
+            self.load_timings = {"load": load_seconds, "build": build_seconds}
+            self._current = catalog
+            return True
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                if self.refresh():
+                    print(f"Reloaded places catalog (version {self._current.version})")
+            except Exception as e:
+                print(f"Catalog watcher error: {e}")
+
+    def start(self):
+        """Load the catalog and start the background watcher"""
+        self.refresh()
+        if self.poll_interval > 0 and self._watcher is None:
+            self._stop.clear()
+            self._watcher = threading.Thread(
+                target=self._watch, name="catalog-watcher", daemon=True
+            )
+            self._watcher.start()
+
+    def stop(self):
+        """Stop the background watcher"""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=self.poll_interval + 1)
+            self._watcher = None
+
+
+catalog_store = CatalogStore(
+    poll_interval=float(os.environ.get("CATALOG_POLL_INTERVAL", "2.0"))
+)
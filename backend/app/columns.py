@@ -0,0 +1,127 @@
+"""
+Columnar view of the catalog for whole-column filters
+
+Ratings, coordinates and categories are kept as NumPy arrays indexed by doc
+id (the place's position in the catalog), with categories interned as small
+integer codes. Filters such as "rating >= 4.5 in this bounding box" then run
+as vectorized comparisons over whole columns instead of a Python loop over
+dicts. A snapshot stores the same arrays, so mapped catalogs wrap them
+without copying.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .geo import coordinates_of
+
+# Category code of places without a category
+NO_CATEGORY = 0xFFFF
+
+BBox = Tuple[float, float, float, float]
+
+
+class DocMask:
+    """Boolean mask over doc ids usable as an ``allowed`` container"""
+
+    __slots__ = ("_bits",)
+
+    def __init__(self, mask: np.ndarray):
+        # bytearray indexing is much cheaper than NumPy scalar access for
+        # the per-candidate checks the indexes do
+        self._bits = bytearray(np.asarray(mask, dtype=np.bool_).tobytes())
+
+    def __contains__(self, doc_id: int) -> bool:
+        return bool(self._bits[doc_id])
+
+
+class PlaceColumns:
+    """rating / lat / lon / category_code columns plus rating order"""
+
+    def __init__(self, rating: np.ndarray, lat: np.ndarray, lon: np.ndarray,
+                 category_code: np.ndarray, category_keys: Sequence[str],
+                 rating_order: Optional[np.ndarray] = None):
+        self.rating = rating
+        self.lat = lat
+        self.lon = lon
+        self.category_code = category_code
+        self.category_keys = list(category_keys)
+        self._codes: Dict[str, int] = {key: code for code, key in enumerate(self.category_keys)}
+        if rating_order is None:
+            # Stable, best first; missing ratings sort as 0 like before
+            rating_order = np.argsort(-np.nan_to_num(rating, nan=0.0), kind="stable").astype(np.uint32)
+        self.rating_order = rating_order
+
+    @classmethod
+    def from_places(cls, places: Iterable[Dict]) -> "PlaceColumns":
+        places = list(places)
+        count = len(places)
+        rating = np.full(count, np.nan, dtype=np.float32)
+        lat = np.full(count, np.nan, dtype=np.float64)
+        lon = np.full(count, np.nan, dtype=np.float64)
+        keys = sorted({p["category"].casefold() for p in places if p.get("category")})
+        codes = {key: code for code, key in enumerate(keys)}
+        category_code = np.full(count, NO_CATEGORY, dtype=np.uint16)
+        for doc_id, place in enumerate(places):
+            value = place.get("rating")
+            if isinstance(value, (int, float)):
+                rating[doc_id] = value
+            coords = coordinates_of(place)
+            if coords:
+                lat[doc_id], lon[doc_id] = coords
+            if place.get("category"):
+                category_code[doc_id] = codes[place["category"].casefold()]
+        return cls(rating, lat, lon, category_code, keys)
+
+    def __len__(self) -> int:
+        return len(self.rating)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.rating, self.lat, self.lon, self.category_code, self.rating_order))
+
+    def category(self, name: str) -> Optional[int]:
+        """Code of a category (case-insensitive), None if unknown"""
+        return self._codes.get(name.casefold())
+
+    def mask(
+        self,
+        category: Optional[str] = None,
+        min_rating: Optional[float] = None,
+        max_rating: Optional[float] = None,
+        bbox: Optional[BBox] = None,
+    ) -> np.ndarray:
+        """Boolean mask of the places matching every given filter"""
+        mask = np.ones(len(self), dtype=np.bool_)
+        if category is not None:
+            code = self.category(category)
+            if code is None:
+                return np.zeros(len(self), dtype=np.bool_)
+            mask &= self.category_code == code
+        # NaN compares False, so unrated places drop out of rating filters
+        if min_rating is not None:
+            mask &= self.rating >= min_rating
+        if max_rating is not None:
+            mask &= self.rating <= max_rating
+        if bbox is not None:
+            min_lat, min_lon, max_lat, max_lon = bbox
+            mask &= (self.lat >= min_lat) & (self.lat <= max_lat)
+            if min_lon <= max_lon:
+                mask &= (self.lon >= min_lon) & (self.lon <= max_lon)
+            else:
+                # Box crossing the antimeridian
+                mask &= (self.lon >= min_lon) | (self.lon <= max_lon)
+        return mask
+
+    def filter(self, **filters) -> np.ndarray:
+        """Doc ids (catalog order) matching mask(**filters)"""
+        return np.flatnonzero(self.mask(**filters))
+
+    def in_category(self, name: str) -> np.ndarray:
+        code = self.category(name)
+        if code is None:
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(self.category_code == code)
+
+    def top_rated(self, limit: int) -> List[int]:
+        return self.rating_order[:limit].tolist()
@@ -0,0 +1,182 @@
+"""
+Durable contact-message pipeline
+
+Requests put messages on a bounded asyncio queue and wait for them to be
+committed. A single background writer drains whatever has queued up and
+writes it to an append-only SQLite table in one transaction (group commit),
+so a burst of N messages costs one fsync instead of N. When the queue is
+full, submitters wait briefly and are then turned away with 503.
+"""
+
+import asyncio
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .models import ContactMessage
+
+DEFAULT_DB = Path(__file__).parent / "data" / "contact_messages.db"
+
+
+class QueueFullError(Exception):
+    """Raised when the contact queue stays full past the enqueue timeout"""
+
+
+class ContactStore:
+    """Append-only SQLite table of contact messages"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Only ever used from the writer, one batch at a time
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS contact_messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                received_at REAL NOT NULL,
+                name TEXT NOT NULL,
+                email TEXT NOT NULL,
+                subject TEXT,
+                message TEXT NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+    def write_batch(self, rows: List[Tuple[float, ContactMessage]]) -> List[int]:
+        """Insert rows in one transaction; return their ids"""
+        ids = []
+        with self._conn:
+            for received_at, msg in rows:
+                cur = self._conn.execute(
+                    "INSERT INTO contact_messages (received_at, name, email, subject, message) VALUES (?, ?, ?, ?, ?)",
+                    (received_at, msg.name, msg.email, msg.subject, msg.message),
+                )
+                ids.append(cur.lastrowid)
+        return ids
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class ContactQueue:
+    """Bounded queue with a single group-committing background writer"""
+
+    def __init__(
+        self,
+        store: ContactStore,
+        maxsize: int = 1000,
+        max_batch: int = 200,
+        enqueue_timeout: float = 1.0,
+    ):
+        self.store = store
+        self.maxsize = maxsize
+        self.max_batch = max_batch
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "rejected": 0,
+            "failed": 0,
+            "batches": 0,
+            "max_depth": 0,
+            "last_batch_size": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+
+    async def start(self):
+        await asyncio.to_thread(self.store.open)
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._writer = asyncio.create_task(self._run(), name="contact-writer")
+
+    async def stop(self):
+        """Flush everything still queued, then close the store"""
+        if self._writer is not None:
+            await self._queue.put(None)
+            await self._writer
+            self._writer = None
+        await asyncio.to_thread(self.store.close)
+
+    async def submit(self, message: ContactMessage) -> int:
+        """Queue a message and wait until it is committed; return its id"""
+        if self._queue is None:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.wait_for(self._queue.put((time.time(), message, future)), self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            self.stats["rejected"] += 1
+            raise QueueFullError("Contact queue is full")
+        self.stats["enqueued"] += 1
+        self.stats["max_depth"] = max(self.stats["max_depth"], self._queue.qsize())
+        return await future
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            batch = []
+            if item is None:
+                stopping = True
+            else:
+                batch.append(item)
+            # Take whatever else is already waiting, up to max_batch
+            while len(batch) < self.max_batch and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    continue
+                batch.append(item)
+            if batch:
+                await self._flush(batch)
+
+    async def _flush(self, batch):
+        start = time.perf_counter()
+        try:
+            ids = await asyncio.to_thread(self.store.write_batch, [(ts, msg) for ts, msg, _ in batch])
+        except Exception as e:
+            print(f"Error writing contact messages: {e}")
+            self.stats["failed"] += len(batch)
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        for (_, _, future), message_id in zip(batch, ids):
+            if not future.done():
+                future.set_result(message_id)
+
+        self.stats["written"] += len(batch)
+        self.stats["batches"] += 1
+        self.stats["last_batch_size"] = len(batch)
+        self.stats["last_flush_ms"] = elapsed
+        self.stats["max_flush_ms"] = max(self.stats["max_flush_ms"], elapsed)
+        self.stats["total_flush_ms"] += elapsed
+
+    def snapshot(self) -> Dict:
+        """Current queue depth and flush statistics"""
+        stats = dict(self.stats)
+        stats["depth"] = self._queue.qsize() if self._queue is not None else 0
+        stats["capacity"] = self.maxsize
+        batches = stats["batches"]
+        stats["avg_flush_ms"] = stats["total_flush_ms"] / batches if batches else 0.0
+        stats["avg_batch_size"] = stats["written"] / batches if batches else 0.0
+        return stats
+
+
+contact_queue = ContactQueue(
+    ContactStore(Path(os.environ.get("CONTACT_DB", DEFAULT_DB))),
+    maxsize=int(os.environ.get("CONTACT_QUEUE_SIZE", "1000")),
+)
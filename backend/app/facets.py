@@ -0,0 +1,183 @@
+"""
+Faceted filtering and counts over search results
+
+Every facet value (a category, a rating bucket, free/paid entry) has a
+bitset of the places that carry it, as a Python int where bit i is doc i,
+built once per catalog version. "Open now" is assembled per request by
+OR-ing one bitset per distinct timings string. A search then costs one
+conversion of its matches to a bitset, plus an AND and a popcount per
+facet value, instead of a pass over every result per facet.
+
+Filters combine OR within a facet and AND across facets. Counts are
+disjunctive: each facet is counted with every other facet's filters
+applied but not its own, so picking "temple" still shows how many ghats
+there are.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from fastapi import HTTPException
+
+from .columns import PlaceColumns
+from .hours import parse_timings
+
+# (name, lower bound inclusive, upper bound exclusive)
+RATING_BUCKETS: Tuple[Tuple[str, Optional[float], Optional[float]], ...] = (
+    ("4.5+", 4.5, None),
+    ("4-4.5", 4.0, 4.5),
+    ("3-4", 3.0, 4.0),
+    ("<3", None, 3.0),
+)
+
+FEE_UNKNOWN, FEE_FREE, FEE_PAID = 0, 1, 2
+FEES = {"free": FEE_FREE, "paid": FEE_PAID}
+NO_HOURS = 0xFFFF
+
+_PRICE_RE = re.compile(r"\d|₹|\brs\.?\b|\binr\b", re.IGNORECASE)
+_CHARGE_RE = re.compile(r"\b(?:fees?|charges?|tickets?|paid)\b", re.IGNORECASE)
+
+
+def fee_code(entry_fee) -> int:
+    """FEE_FREE / FEE_PAID from the entryFee text, FEE_UNKNOWN if unclear"""
+    if not isinstance(entry_fee, str):
+        return FEE_UNKNOWN
+    if _PRICE_RE.search(entry_fee):
+        # "Free for children, ₹50 for adults" still costs something
+        return FEE_PAID
+    if "free" in entry_fee.lower():
+        return FEE_FREE
+    if _CHARGE_RE.search(entry_fee):
+        # "Nominal entry fee"
+        return FEE_PAID
+    return FEE_UNKNOWN
+
+
+def to_bits(mask: np.ndarray) -> int:
+    """Bitset (bit i = mask[i]) of a boolean array"""
+    return int.from_bytes(np.packbits(mask, bitorder="little").tobytes(), "little")
+
+
+def from_bits(bits: int, size: int) -> np.ndarray:
+    """Boolean array of size from a bitset"""
+    raw = np.frombuffer(bits.to_bytes((size + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(raw, bitorder="little", count=size).astype(np.bool_)
+
+
+def _rating_bucket(rating: np.ndarray, low: Optional[float], high: Optional[float]) -> np.ndarray:
+    # NaN compares False, so unrated places fall in no bucket
+    mask = rating == rating
+    if low is not None:
+        mask &= rating >= low
+    if high is not None:
+        mask &= rating < high
+    return mask
+
+
+def hours_codes(timings: Iterable) -> Tuple[np.ndarray, List[str]]:
+    """Per-doc index into a list of the distinct timings strings"""
+    distinct: Dict[str, int] = {}
+    codes = [
+        distinct.setdefault(t, len(distinct)) if isinstance(t, str) and t else NO_HOURS
+        for t in timings
+    ]
+    return np.array(codes, dtype=np.uint16), list(distinct)
+
+
+class FacetIndex:
+    """Per-value bitsets for category, rating bucket, fee and opening hours"""
+
+    def __init__(
+        self,
+        columns: PlaceColumns,
+        category_names: Sequence[str],
+        fee: np.ndarray,
+        hours: np.ndarray,
+        timings: Sequence[str],
+    ):
+        self.size = len(columns)
+        # Display name per casefolded key, in key order
+        names = {name.casefold(): name for name in category_names}
+        self.masks: Dict[str, Dict[str, int]] = {
+            "category": {
+                names.get(key, key): to_bits(columns.category_code == code)
+                for code, key in enumerate(columns.category_keys)
+            },
+            "rating": {
+                name: to_bits(_rating_bucket(columns.rating, low, high)) for name, low, high in RATING_BUCKETS
+            },
+            "fee": {name: to_bits(fee == code) for name, code in FEES.items()},
+        }
+        # One bitset per distinct timings string the parser understands
+        self.hours = []
+        for code, text in enumerate(timings):
+            parsed = parse_timings(text)
+            if parsed is not None:
+                self.hours.append((parsed, to_bits(hours == code)))
+        self._known_hours = 0
+        for _, bits in self.hours:
+            self._known_hours |= bits
+
+    @classmethod
+    def from_places(cls, places: Sequence[Dict], columns: PlaceColumns, category_names: Sequence[str]) -> "FacetIndex":
+        fee = np.array([fee_code(p.get("entryFee")) for p in places], dtype=np.uint8)
+        hours, timings = hours_codes(p.get("timings") for p in places)
+        return cls(columns, category_names, fee, hours, timings)
+
+    def open_now(self, weekday: int, minute: int) -> Dict[str, int]:
+        """open / closed bitsets at a moment; places with unknown hours are in neither"""
+        open_bits = 0
+        for parsed, bits in self.hours:
+            if parsed.is_open(weekday, minute):
+                open_bits |= bits
+        return {"open": open_bits, "closed": self._known_hours & ~open_bits}
+
+    def _selected(self, masks: Dict[str, Dict[str, int]], filters: Dict[str, List[str]]) -> Dict[str, int]:
+        """OR of the chosen values' bitsets, per filtered facet
+
+        Unknown values match nothing, as an unknown category always has.
+        """
+        selected = {}
+        for facet, values in filters.items():
+            if facet not in masks:
+                raise HTTPException(status_code=400, detail=f"Unknown facet: {facet}")
+            if not values:
+                continue
+            by_key = {name.casefold(): bits for name, bits in masks[facet].items()}
+            bits = 0
+            for value in values:
+                bits |= by_key.get(value.casefold(), 0)
+            selected[facet] = bits
+        return selected
+
+    def apply(
+        self,
+        doc_ids: Sequence[int],
+        filters: Optional[Dict[str, List[str]]],
+        now: Tuple[int, int],
+    ) -> Tuple[List[int], Dict[str, Dict[str, int]]]:
+        """doc_ids (order kept) passing every filter, plus facet counts"""
+        masks = dict(self.masks, open_now=self.open_now(*now))
+        selected = self._selected(masks, filters or {})
+
+        matched_mask = np.zeros(self.size, dtype=np.bool_)
+        ids = np.asarray(doc_ids, dtype=np.intp)
+        matched_mask[ids] = True
+        matched = to_bits(matched_mask)
+
+        counts: Dict[str, Dict[str, int]] = {}
+        for facet, values in masks.items():
+            base = matched
+            for other, bits in selected.items():
+                if other != facet:
+                    base &= bits
+            counts[facet] = {name: (base & bits).bit_count() for name, bits in values.items()}
+
+        if not selected:
+            return list(doc_ids), counts
+        keep = matched
+        for bits in selected.values():
+            keep &= bits
+        keep_mask = from_bits(keep, self.size)
+        return ids[keep_mask[ids]].tolist(), counts
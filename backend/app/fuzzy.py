@@ -0,0 +1,133 @@
+"""
+Typo- and transliteration-tolerant name matching
+
+Place names are romanized many ways ("Kanak Bhawan" / "Kanak Bhavan",
+"Sarayu" / "Saryu", "Hanuman Garhi" / "Hanumangarhi"). Names are folded
+with a few transliteration rules (see fold), then broken into character
+trigrams. A query is folded the same way, and candidates are scored by
+trigram similarity (shared / union) using the posting lists of the query's
+trigrams. Only names sharing at least one trigram with the query are ever
+looked at; nothing is compared against every record.
+
+Matching targets are each place's whole name with the spaces removed, so
+"hanumangarhi" matches "Hanuman Garhi", and each word of the name, so
+"bhavan" alone finds "Kanak Bhawan". Targets are deduplicated, since many
+places share words like "temple".
+"""
+
+import json
+import re
+from typing import Container, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .search import _TOKEN_RE, normalize
+
+# Minimum similarity for a match (pg_trgm's default)
+THRESHOLD = 0.3
+
+# Applied in order after lowercasing and stripping accents
+_RULES = [
+    (re.compile(r"w"), "v"),
+    (re.compile(r"ee"), "i"),
+    (re.compile(r"oo"), "u"),
+    # Aspirates: bh/dh/gh/kh/... are often written without the h
+    (re.compile(r"(?<=[bcdgjkpst])h"), ""),
+    # Doubled letters, including long vowels (aa -> a)
+    (re.compile(r"([a-z])\1+"), r"\1"),
+]
+
+
+def fold(text: str) -> str:
+    """Normalize and apply the transliteration rules, word by word"""
+    words = []
+    for word in _TOKEN_RE.findall(normalize(text)):
+        for pattern, replacement in _RULES:
+            word = pattern.sub(replacement, word)
+        words.append(word)
+    return " ".join(words)
+
+
+def trigrams(folded: str) -> Set[str]:
+    """Trigrams of a folded string with spaces collapsed, padded at both ends"""
+    padded = f"  {folded.replace(' ', '')} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _targets(name: str) -> Set[str]:
+    folded = fold(name)
+    words = folded.split()
+    return {folded, *words} if len(words) > 1 else set(words)
+
+
+class FuzzyIndex:
+    """Trigram index over distinct folded names and name words"""
+
+    def __init__(self, vocabulary: List[str], docs: List[List[int]]):
+        # vocabulary[i] matches the doc ids in docs[i]
+        self.vocabulary = vocabulary
+        self.doc_starts = np.zeros(len(docs) + 1, dtype=np.int64)
+        np.cumsum([len(d) for d in docs], out=self.doc_starts[1:])
+        self.doc_ids = np.fromiter((d for ds in docs for d in ds), dtype=np.uint32, count=int(self.doc_starts[-1]))
+        self.gram_counts = np.zeros(len(vocabulary), dtype=np.int32)
+        postings: Dict[str, List[int]] = {}
+        for target_id, target in enumerate(vocabulary):
+            grams = trigrams(target)
+            self.gram_counts[target_id] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(target_id)
+        self.postings: Dict[str, np.ndarray] = {
+            gram: np.array(ids, dtype=np.uint32) for gram, ids in postings.items()
+        }
+
+    @classmethod
+    def from_places(cls, places: Iterable[Dict]) -> "FuzzyIndex":
+        target_docs: Dict[str, List[int]] = {}
+        for doc_id, place in enumerate(places):
+            name = place.get("name")
+            if isinstance(name, str):
+                for target in _targets(name):
+                    target_docs.setdefault(target, []).append(doc_id)
+        return cls(list(target_docs), list(target_docs.values()))
+
+    def dump(self) -> bytes:
+        docs = [
+            self.doc_ids[self.doc_starts[i]:self.doc_starts[i + 1]].tolist()
+            for i in range(len(self.vocabulary))
+        ]
+        return json.dumps({"vocabulary": self.vocabulary, "docs": docs}, separators=(",", ":")).encode("utf-8")
+
+    @classmethod
+    def load(cls, data) -> "FuzzyIndex":
+        raw = json.loads(bytes(data))
+        return cls(raw["vocabulary"], raw["docs"])
+
+    def search(
+        self, query: str, allowed: Optional[Container[int]] = None, threshold: float = THRESHOLD
+    ) -> List[Tuple[int, float]]:
+        """(doc id, similarity) pairs, most similar first"""
+        folded = fold(query)
+        if not folded:
+            return []
+        grams = trigrams(folded)
+        lists = [ids for ids in (self.postings.get(gram) for gram in grams) if ids is not None]
+        if not lists:
+            return []
+        # Ids are unique within one posting list, so a target's count is
+        # the number of trigrams it shares with the query. Costs the
+        # postings touched, not the vocabulary size.
+        candidates, shared = np.unique(np.concatenate(lists), return_counts=True)
+        similarity = shared / (len(grams) + self.gram_counts[candidates] - shared)
+        keep = similarity >= threshold
+        scores: Dict[int, float] = {}
+        for target_id, score in zip(candidates[keep].tolist(), similarity[keep].tolist()):
+            start, end = self.doc_starts[target_id], self.doc_starts[target_id + 1]
+            for doc_id in self.doc_ids[start:end].tolist():
+                if allowed is not None and doc_id not in allowed:
+                    continue
+                if score > scores.get(doc_id, 0.0):
+                    scores[doc_id] = score
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+    def __len__(self) -> int:
+        return len(self.vocabulary)
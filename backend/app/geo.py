@@ -0,0 +1,155 @@
+"""
+Spatial index over place coordinates
+
+Points are projected onto the unit sphere (x, y, z) and stored in a k-d
+tree with small leaf buckets. Straight-line (chord) distance on the sphere is
+monotonic with great-circle distance, so radius and k-nearest queries can
+prune on chord length without any longitude wrap-around special cases, and
+only the handful of surviving candidates get a haversine distance.
+"""
+
+import heapq
+import math
+from array import array
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+EARTH_RADIUS_M = 6371008.8
+LEAF_SIZE = 8
+
+
+def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in metres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def to_xyz(lat: float, lon: float) -> Tuple[float, float, float]:
+    phi, lmb = math.radians(lat), math.radians(lon)
+    cos_phi = math.cos(phi)
+    return (cos_phi * math.cos(lmb), cos_phi * math.sin(lmb), math.sin(phi))
+
+
+def chord_for_distance(metres: float) -> float:
+    """Chord length on the unit sphere for a surface distance"""
+    angle = min(math.pi, metres / EARTH_RADIUS_M)
+    return 2 * math.sin(angle / 2)
+
+
+def coordinates_of(place) -> Optional[Tuple[float, float]]:
+    """(lat, lon) of a place, or None if missing or malformed"""
+    coords = place.get("coordinates")
+    try:
+        lat, lon = float(coords[0]), float(coords[1])
+    except (TypeError, ValueError, IndexError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon
+
+
+class SpatialIndex:
+    """k-d tree over (doc id, lat, lon) points
+
+    The tree is implicit: points are stored in flat arrays in tree order and
+    a node is just a [lo, hi) range split at its midpoint, with the split
+    planes in a heap-ordered array. Flat arrays keep the index compact and
+    let it run unchanged over buffers memory-mapped from a snapshot.
+    """
+
+    def __init__(self, points: List[Tuple[int, float, float]]):
+        items = [(to_xyz(lat, lon), doc_id, lat, lon) for doc_id, lat, lon in points]
+        splits: Dict[int, float] = {}
+        ordered = self._build(items, 0, 0, splits)
+        self.xyz = array("d", (c for item in ordered for c in item[0]))
+        self.latlon = array("d", (c for item in ordered for c in item[2:]))
+        self.ids = array("I", (item[1] for item in ordered))
+        self.splits = array("d", [0.0]) * (max(splits) + 1 if splits else 0)
+        for node, split in splits.items():
+            self.splits[node] = split
+
+    @classmethod
+    def from_arrays(cls, xyz: Sequence[float], latlon: Sequence[float], ids: Sequence[int],
+                    splits: Sequence[float]) -> "SpatialIndex":
+        """Wrap arrays written by a previous build (see snapshot.py)"""
+        index = cls.__new__(cls)
+        index.xyz, index.latlon, index.ids, index.splits = xyz, latlon, ids, splits
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _build(self, items, depth, node, splits):
+        if len(items) <= LEAF_SIZE:
+            return items
+        axis = depth % 3
+        items.sort(key=lambda item: item[0][axis])
+        mid = len(items) // 2
+        splits[node] = items[mid][0][axis]
+        return (self._build(items[:mid], depth + 1, 2 * node + 1, splits)
+                + self._build(items[mid:], depth + 1, 2 * node + 2, splits))
+
+    def nearby(
+        self,
+        lat: float,
+        lon: float,
+        radius: Optional[float] = None,
+        k: Optional[int] = None,
+        allowed: Optional[Set[int]] = None,
+    ) -> List[Tuple[int, float]]:
+        """(doc id, metres) within radius, nearest first, at most k results"""
+        if not len(self.ids) or (k is not None and k <= 0):
+            return []
+
+        xyz, ids, splits = self.xyz, self.ids, self.splits
+        tx, ty, tz = target = to_xyz(lat, lon)
+        limit = chord_for_distance(radius) if radius is not None else 2.0
+        limit_sq = limit * limit
+        # Max-heap of (-chord_sq, position) holding the best k so far
+        best: List[Tuple[float, int]] = []
+
+        def bound_sq():
+            if k is not None and len(best) == k:
+                return min(limit_sq, -best[0][0])
+            return limit_sq
+
+        # Each entry is a node (heap number, [lo, hi) range, depth) plus the
+        # squared distance to its splitting plane, so far branches are
+        # re-checked against the bound as it tightens
+        stack = [(0, 0, len(ids), 0, 0.0)]
+        while stack:
+            node, lo, hi, depth, plane_sq = stack.pop()
+            if plane_sq > bound_sq():
+                continue
+            if hi - lo <= LEAF_SIZE:
+                for pos in range(lo, hi):
+                    if allowed is not None and ids[pos] not in allowed:
+                        continue
+                    base = 3 * pos
+                    d_sq = (xyz[base] - tx) ** 2 + (xyz[base + 1] - ty) ** 2 + (xyz[base + 2] - tz) ** 2
+                    if d_sq > bound_sq():
+                        continue
+                    if k is not None and len(best) == k:
+                        heapq.heapreplace(best, (-d_sq, pos))
+                    else:
+                        heapq.heappush(best, (-d_sq, pos))
+                continue
+
+            axis = depth % 3
+            mid = lo + (hi - lo) // 2
+            diff = target[axis] - splits[node]
+            left = (2 * node + 1, lo, mid, depth + 1)
+            right = (2 * node + 2, mid, hi, depth + 1)
+            near, far = (left, right) if diff < 0 else (right, left)
+            # Push far first so the near side is explored first
+            stack.append(far + (max(plane_sq, diff * diff),))
+            stack.append(near + (plane_sq,))
+
+        results = []
+        for _, pos in best:
+            p_lat, p_lon = self.latlon[2 * pos], self.latlon[2 * pos + 1]
+            results.append((ids[pos], haversine(lat, lon, p_lat, p_lon)))
+        results.sort(key=lambda r: (r[1], r[0]))
+        return results
@@ -0,0 +1,106 @@
+"""
+Opening hours parsed from the free-text ``timings`` field
+
+Handles the forms used in places.json, for example:
+    "5:00 AM - 9:00 PM (All days)"
+    "7:00 AM - 12:00 PM, 4:00 PM - 9:00 PM"
+    "24 hours (Best during sunrise and sunset)"
+    "9:00 AM - 6:00 PM (Closed on Mondays)"
+
+Times are minutes since midnight. A start without AM/PM takes the end's,
+unless that would put it at or after the end ("11 - 2 PM" is 11:00-14:00).
+A range runs past midnight only when both ends say AM/PM ("6 PM - 2 AM").
+Text that cannot be parsed gives None, and callers treat the place as
+always open rather than guessing.
+"""
+
+import os
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import FrozenSet, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+DAY_MINUTES = 24 * 60
+
+# Timings are local to the places, not the server
+TIMEZONE = os.environ.get("PLACES_TIMEZONE", "Asia/Kolkata")
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+_RANGE_RE = re.compile(
+    r"(\d{1,2})(?:[:.](\d{2}))?\s*([ap])?\.?m?\.?\s*(?:-|–|to)\s*(\d{1,2})(?:[:.](\d{2}))?\s*([ap])\.?m\.?",
+    re.IGNORECASE,
+)
+_ALL_DAY_RE = re.compile(r"\b24\s*(?:hours|hrs|x\s*7)\b|\bopen all day\b", re.IGNORECASE)
+_CLOSED_RE = re.compile(r"closed on ([a-z ,&]+)", re.IGNORECASE)
+
+
+class OpeningHours(NamedTuple):
+    # (open, close) minutes since midnight; close may exceed DAY_MINUTES
+    intervals: Tuple[Tuple[int, int], ...]
+    # Weekday numbers (Monday = 0) the place is closed
+    closed_days: FrozenSet[int] = frozenset()
+
+    def is_open(self, weekday: int, minute: int) -> bool:
+        """Open at minute (since midnight) of weekday"""
+        if weekday not in self.closed_days:
+            if any(start <= minute < end for start, end in self.intervals):
+                return True
+        # Late opening hours from the day before
+        yesterday = (weekday - 1) % 7
+        return yesterday not in self.closed_days and any(
+            start <= minute + DAY_MINUTES < end for start, end in self.intervals
+        )
+
+    def on(self, weekday: int) -> Tuple[Tuple[int, int], ...]:
+        """Intervals for one day (empty if closed)"""
+        return () if weekday in self.closed_days else self.intervals
+
+
+def local_now() -> datetime:
+    """Current time in TIMEZONE (server local time if the zone is unknown)"""
+    try:
+        return datetime.now(ZoneInfo(TIMEZONE))
+    except ZoneInfoNotFoundError:
+        return datetime.now()
+
+
+def _minutes(hour: str, minute: Optional[str], meridiem: str) -> int:
+    h = int(hour) % 12
+    if meridiem.lower() == "p":
+        h += 12
+    return h * 60 + int(minute or 0)
+
+
+@lru_cache(maxsize=1024)
+def parse_timings(text: Optional[str]) -> Optional[OpeningHours]:
+    """OpeningHours for a timings string, None if it cannot be understood"""
+    if not text:
+        return None
+    closed = set()
+    for match in _CLOSED_RE.finditer(text):
+        for day_number, day in enumerate(WEEKDAYS):
+            if day in match.group(1).lower() or day[:3] in match.group(1).lower().split():
+                closed.add(day_number)
+    if _ALL_DAY_RE.search(text):
+        return OpeningHours(((0, DAY_MINUTES),), frozenset(closed))
+
+    intervals = []
+    for start_h, start_m, start_mer, end_h, end_m, end_mer in _RANGE_RE.findall(text):
+        end = _minutes(end_h, end_m, end_mer)
+        if start_mer:
+            start = _minutes(start_h, start_m, start_mer)
+            if end <= start:
+                end += DAY_MINUTES
+        else:
+            start = _minutes(start_h, start_m, end_mer)
+            if start >= end:
+                start = _minutes(start_h, start_m, "a" if end_mer.lower() == "p" else "p")
+            if start >= end:
+                # No reading fits within one day ("11:30 - 11 AM")
+                continue
+        intervals.append((start, end))
+    if not intervals:
+        return None
+    return OpeningHours(tuple(sorted(intervals)), frozenset(closed))
@@ -0,0 +1,265 @@
+"""
+Responsive image metadata from the build_images.py manifest
+
+The manifest (images/build/manifest.json, override with IMAGE_MANIFEST) maps
+each source image to its resized WebP/AVIF variants. It is re-read only when
+its mtime changes.
+
+Sizes that were not prebuilt are produced on demand by ImageResizer and kept
+in a bounded LRU cache on disk (IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES).
+Requested widths and qualities are snapped to a few fixed steps, so the
+number of distinct variants per image stays small.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+
+from .metrics import record_cache
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+
+def resolve_manifest_file() -> Path:
+    override = os.environ.get("IMAGE_MANIFEST")
+    if override:
+        return Path(override)
+    return PROJECT_ROOT / "images" / "build" / "manifest.json"
+
+
+class ImageManifest:
+    """mtime-checked view of the image build manifest"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self._path = path
+        self._mtime: Optional[int] = None
+        self._sources: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        return self._path or resolve_manifest_file()
+
+    def sources(self) -> Dict[str, Dict]:
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except OSError:
+            return {}
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    try:
+                        self._sources = json.loads(self.path.read_text()).get("sources", {})
+                    except (OSError, ValueError) as e:
+                        print(f"Error loading image manifest: {e}")
+                        self._sources = {}
+                    self._mtime = mtime
+        return self._sources
+
+    def srcset(self, image: str) -> Dict:
+        """srcset strings per format for an image path like images/x.jpg"""
+        entry = self.sources().get(image)
+        if not entry:
+            # Not built (yet); clients fall back to the original
+            return {"src": image, "width": None, "height": None, "srcset": {}}
+        by_format: Dict[str, List[Dict]] = {}
+        for variant in entry.get("variants", []):
+            by_format.setdefault(variant["format"], []).append(variant)
+        return {
+            "src": image,
+            "width": entry.get("width"),
+            "height": entry.get("height"),
+            "srcset": {
+                fmt: ", ".join(f"{v['path']} {v['width']}w" for v in sorted(variants, key=lambda v: v["width"]))
+                for fmt, variants in by_format.items()
+            },
+        }
+
+
+image_manifest = ImageManifest()
+
+
+class ImageResizer:
+    """On-demand resize/transcode with a size-bounded on-disk LRU cache
+
+    Transcodes and file system calls run off the event loop, and concurrent
+    requests for the same variant share a single transcode. Evicted files
+    are deleted by the first transcode at least EVICT_GRACE seconds later,
+    so a response already handed their path can still open them.
+    """
+
+    FORMATS = {"webp": ("WEBP", "image/webp"), "jpeg": ("JPEG", "image/jpeg"), "avif": ("AVIF", "image/avif")}
+    SOURCE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+    # Requests are served the next width up (or the largest) and nearest quality
+    WIDTHS = (160, 320, 480, 640, 960, 1280, 1920, 2560)
+    QUALITIES = (50, 65, 80, 90)
+    EVICT_GRACE = 60.0
+
+    def __init__(self, source_dir: Path, cache_dir: Path, max_bytes: int, workers: int = 2):
+        self.source_dir = source_dir
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loaded = False
+        self._index_lock: Optional[asyncio.Lock] = None
+        # (delete after, filename) of evicted files, oldest first
+        self._evicted: Deque[Tuple[float, str]] = deque()
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+
+    def supported_formats(self) -> List[str]:
+        from PIL import Image
+
+        extensions = Image.registered_extensions()
+        return [fmt for fmt in self.FORMATS if f".{fmt}" in extensions]
+
+    @classmethod
+    def snap_width(cls, width: int) -> int:
+        return cls.WIDTHS[min(bisect_left(cls.WIDTHS, width), len(cls.WIDTHS) - 1)]
+
+    @classmethod
+    def snap_quality(cls, quality: int) -> int:
+        return min(cls.QUALITIES, key=lambda q: (abs(q - quality), q))
+
+    def source_path(self, name: str) -> Optional[Path]:
+        """Path of a source image, refusing anything outside source_dir"""
+        path = (self.source_dir / name).resolve()
+        if path.parent != self.source_dir.resolve() or path.suffix.lower() not in self.SOURCE_EXTENSIONS:
+            return None
+        return path if path.is_file() else None
+
+    def _scan_index(self) -> List[Tuple[str, int]]:
+        """(filename, size) of the cached files, oldest first"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        files = []
+        for path in self.cache_dir.iterdir():
+            if path.name.startswith("."):
+                continue
+            st = path.stat()
+            files.append((st.st_mtime, path.name, st.st_size))
+        return [(filename, size) for _, filename, size in sorted(files)]
+
+    async def _load_index(self):
+        """Rebuild LRU order from the cache directory, once"""
+        if self._index_lock is None:
+            self._index_lock = asyncio.Lock()
+        async with self._index_lock:
+            if self._loaded:
+                return
+            for filename, size in await asyncio.to_thread(self._scan_index):
+                self._entries[filename] = size
+                self._total += size
+            self._loaded = True
+
+    def _touch(self, filename: str):
+        self._entries.move_to_end(filename)
+
+    def _add(self, filename: str, size: int):
+        self._entries[filename] = size
+        self._total += size
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            old, old_size = self._entries.popitem(last=False)
+            self._total -= old_size
+            self.stats["evictions"] += 1
+            self._evicted.append((time.monotonic() + self.EVICT_GRACE, old))
+
+    def _expired(self) -> List[str]:
+        """Evicted files past their grace period and not cached again since"""
+        now = time.monotonic()
+        expired = []
+        while self._evicted and self._evicted[0][0] <= now:
+            _, filename = self._evicted.popleft()
+            if filename not in self._entries and filename not in self._inflight:
+                expired.append(filename)
+        return expired
+
+    def _transcode(self, source: Path, target: Path, width: int, fmt: str, quality: int,
+                   expired: List[str] = ()) -> int:
+        from PIL import Image, ImageOps
+
+        for filename in expired:
+            (self.cache_dir / filename).unlink(missing_ok=True)
+
+        pil_format = self.FORMATS[fmt][0]
+        with Image.open(source) as img:
+            img = ImageOps.exif_transpose(img)
+            if img.mode not in ("RGB", "RGBA") or (fmt == "jpeg" and img.mode != "RGB"):
+                img = img.convert("RGB")
+            if width < img.width:
+                height = round(img.height * width / img.width)
+                img = img.resize((width, height), Image.LANCZOS)
+            tmp = target.with_name(f".{target.name}.{threading.get_ident()}.tmp")
+            img.save(tmp, pil_format, quality=quality)
+        os.replace(tmp, target)
+        return target.stat().st_size
+
+    async def get(self, source: Path, width: int, fmt: str, quality: int) -> Path:
+        """Path of the cached variant, transcoding it if needed
+
+        width and quality are snapped to WIDTHS and QUALITIES first.
+        """
+        if not self._loaded:
+            await self._load_index()
+        width, quality = self.snap_width(width), self.snap_quality(quality)
+        st = await asyncio.to_thread(source.stat)
+        key_src = f"{source.name}|{st.st_mtime_ns}|{st.st_size}|{width}|{fmt}|{quality}"
+        filename = f"{hashlib.sha256(key_src.encode()).hexdigest()[:24]}.{fmt}"
+        target = self.cache_dir / filename
+
+        if filename in self._entries and await asyncio.to_thread(target.exists):
+            self.stats["hits"] += 1
+            record_cache("image", "hit")
+            self._touch(filename)
+            return target
+
+        pending = self._inflight.get(filename)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            record_cache("image", "coalesced")
+            await asyncio.shield(pending)
+            return target
+
+        self.stats["misses"] += 1
+        record_cache("image", "miss")
+        loop = asyncio.get_running_loop()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="image-resize")
+        future = loop.run_in_executor(
+            self._executor, self._transcode, source, target, width, fmt, quality, self._expired()
+        )
+        self._inflight[filename] = future
+        try:
+            size = await asyncio.shield(future)
+        finally:
+            self._inflight.pop(filename, None)
+        if filename in self._entries:
+            self._total -= self._entries.pop(filename)
+        self._add(filename, size)
+        return target
+
+    def snapshot(self) -> Dict:
+        stats = dict(self.stats)
+        stats["entries"] = len(self._entries)
+        stats["bytes"] = self._total
+        stats["max_bytes"] = self.max_bytes
+        stats["pending_deletes"] = len(self._evicted)
+        return stats
+
+
+image_resizer = ImageResizer(
+    source_dir=PROJECT_ROOT / "images",
+    cache_dir=Path(os.environ.get("IMAGE_CACHE_DIR", Path(__file__).parent.parent / ".image_cache")),
+    max_bytes=int(os.environ.get("IMAGE_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+    workers=int(os.environ.get("IMAGE_RESIZE_WORKERS", "2")),
+)
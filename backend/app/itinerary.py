@@ -0,0 +1,310 @@
+"""
+Day itinerary planning for a handful of places
+
+Given the stops, a start point and a time window, orders the visits to keep
+travel short while respecting each place's opening hours (hours.py):
+
+1. Nearest-neighbour construction: from the current position, go to the
+   stop whose visit can begin soonest.
+2. 2-opt (reverse a run of stops) and Or-opt (move a run of 1-3 stops)
+   until neither shortens the route. Moves are screened with O(1) distance
+   deltas, and one is kept only if the day's schedule still fits.
+3. Stops left out are retried at their cheapest feasible position. Those
+   that still don't fit are returned as unscheduled, with the reason.
+
+Distances come from one vectorized haversine matrix per request. Matrices
+are cached by catalog version and coordinates, so re-planning the same
+stops (a different start time, say) skips the matrix.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .geo import EARTH_RADIUS_M
+from .hours import DAY_MINUTES, OpeningHours
+
+MATRIX_CACHE_SIZE = 256
+
+# Or-opt moves runs of up to this many stops
+OR_OPT_MAX = 3
+
+_EPS = 1e-6
+
+
+def haversine_matrix(lat: Sequence[float], lon: Sequence[float]) -> np.ndarray:
+    """Pairwise great-circle distances in metres"""
+    phi = np.radians(np.asarray(lat, dtype=np.float64))
+    lmb = np.radians(np.asarray(lon, dtype=np.float64))
+    dphi = phi[:, None] - phi[None, :]
+    dlmb = lmb[:, None] - lmb[None, :]
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi)[:, None] * np.cos(phi)[None, :] * np.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class MatrixCache:
+    """LRU of distance matrices keyed by catalog version and points"""
+
+    def __init__(self, size: int = MATRIX_CACHE_SIZE):
+        self.size = size
+        self._lock = threading.Lock()
+        self._matrices: "OrderedDict[Tuple, np.ndarray]" = OrderedDict()
+
+    def get(self, version: str, points: Sequence[Tuple[float, float]]) -> np.ndarray:
+        key = (version, tuple(points))
+        with self._lock:
+            matrix = self._matrices.get(key)
+            if matrix is not None:
+                self._matrices.move_to_end(key)
+                return matrix
+        lat, lon = zip(*points)
+        matrix = haversine_matrix(lat, lon)
+        with self._lock:
+            self._matrices[key] = matrix
+            while len(self._matrices) > self.size:
+                self._matrices.popitem(last=False)
+        return matrix
+
+
+matrix_cache = MatrixCache()
+
+
+def format_minutes(minutes: float) -> str:
+    """HH:MM for minutes since midnight (wrapping past midnight)"""
+    minutes = int(round(minutes)) % DAY_MINUTES
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class Planner:
+    """Schedules one day's visits; node 0 is the start, stops are 1..n"""
+
+    def __init__(
+        self,
+        distances: np.ndarray,
+        hours: Sequence[Optional[OpeningHours]],
+        weekday: int,
+        start_minute: int,
+        end_minute: int,
+        visit_minutes: int,
+        speed_m_per_min: float,
+        return_to_start: bool = False,
+    ):
+        self.dist: List[List[float]] = distances.tolist()
+        self.travel: List[List[float]] = (distances / speed_m_per_min).tolist()
+        # Hours for stops 1..n; unknown hours count as always open
+        self.windows = [()] + [
+            h.on(weekday) if h is not None else ((0, 2 * DAY_MINUTES),) for h in hours
+        ]
+        self.start_minute = start_minute
+        self.end_minute = end_minute
+        self.visit = visit_minutes
+        self.return_to_start = return_to_start
+
+    def begin(self, node: int, arrive: float) -> Optional[float]:
+        """Earliest time a visit arriving at arrive can start and still finish in hours"""
+        for opens, closes in self.windows[node]:
+            start = max(arrive, opens)
+            if start + self.visit <= closes:
+                return start
+        return None
+
+    def schedule(self, route: List[int]) -> Optional[List[Tuple[float, float]]]:
+        """(arrive, begin) per stop, or None if the route does not fit the day"""
+        times = []
+        position, clock = 0, float(self.start_minute)
+        for node in route:
+            arrive = clock + self.travel[position][node]
+            start = self.begin(node, arrive)
+            if start is None or start + self.visit > self.end_minute:
+                return None
+            times.append((arrive, start))
+            position, clock = node, start + self.visit
+        if self.return_to_start and clock + self.travel[position][0] > self.end_minute:
+            return None
+        return times
+
+    def length(self, route: List[int]) -> float:
+        seq = self._sequence(route)
+        return sum(self.dist[a][b] for a, b in zip(seq, seq[1:]))
+
+    def travel_minutes(self, route: List[int]) -> float:
+        seq = self._sequence(route)
+        return sum(self.travel[a][b] for a, b in zip(seq, seq[1:]))
+
+    def _sequence(self, route: List[int]) -> List[int]:
+        return [0] + route + ([0] if self.return_to_start else [])
+
+    def nearest_neighbour(self, stops: List[int]) -> Tuple[List[int], List[int]]:
+        """Greedy route plus the stops it could not fit"""
+        route: List[int] = []
+        remaining = list(stops)
+        position, clock = 0, float(self.start_minute)
+        while remaining:
+            best = None
+            for node in remaining:
+                start = self.begin(node, clock + self.travel[position][node])
+                if start is None or start + self.visit > self.end_minute:
+                    continue
+                candidate = (start, self.dist[position][node], node)
+                if best is None or candidate < best:
+                    best = candidate
+            if best is None:
+                break
+            start, _, node = best
+            if self.return_to_start and self.schedule(route + [node]) is None:
+                # No time left to get back
+                break
+            route.append(node)
+            remaining.remove(node)
+            position, clock = node, start + self.visit
+        return route, remaining
+
+    def _try(self, route: List[int], candidate: List[int], current: float) -> Optional[float]:
+        if candidate == route:
+            return None
+        length = self.length(candidate)
+        if length < current - _EPS and self.schedule(candidate) is not None:
+            return length
+        return None
+
+    def improve(self, route: List[int]) -> List[int]:
+        """2-opt and Or-opt until no move shortens the route"""
+        dist = self.dist
+        current = self.length(route)
+        improved = True
+        while improved:
+            improved = False
+            seq = self._sequence(route)
+            m = len(route)
+            # 2-opt: reverse seq[a..b]
+            for a in range(1, m):
+                for b in range(a + 1, m + 1):
+                    prev, after = seq[a - 1], seq[b + 1] if b + 1 < len(seq) else None
+                    delta = dist[prev][seq[b]] - dist[prev][seq[a]]
+                    if after is not None:
+                        delta += dist[seq[a]][after] - dist[seq[b]][after]
+                    if delta >= -_EPS:
+                        continue
+                    candidate = route[:a - 1] + route[a - 1:b][::-1] + route[b:]
+                    length = self._try(route, candidate, current)
+                    if length is not None:
+                        route, current, improved = candidate, length, True
+                        break
+                if improved:
+                    break
+            if improved:
+                continue
+            # Or-opt: move seq[a..b] (up to OR_OPT_MAX stops) after seq[p]
+            for size in range(1, min(OR_OPT_MAX, m - 1) + 1):
+                for a in range(1, m - size + 2):
+                    b = a + size - 1
+                    prev, after = seq[a - 1], seq[b + 1] if b + 1 < len(seq) else None
+                    removed = -dist[prev][seq[a]]
+                    if after is not None:
+                        removed += dist[prev][after] - dist[seq[b]][after]
+                    for p in range(0, m + 1):
+                        if a - 1 <= p <= b:
+                            continue
+                        nxt = seq[p + 1] if p + 1 < len(seq) else None
+                        added = dist[seq[p]][seq[a]]
+                        if nxt is not None:
+                            added += dist[seq[b]][nxt] - dist[seq[p]][nxt]
+                        if removed + added >= -_EPS:
+                            continue
+                        segment = route[a - 1:b]
+                        rest = route[:a - 1] + route[b:]
+                        # Position of seq[p] within rest (seq[0] is the start)
+                        insert_at = p if p < a else p - size
+                        candidate = rest[:insert_at] + segment + rest[insert_at:]
+                        length = self._try(route, candidate, current)
+                        if length is not None:
+                            route, current, improved = candidate, length, True
+                            break
+                    if improved:
+                        break
+                if improved:
+                    break
+        return route
+
+    def insert(self, route: List[int], leftovers: List[int]) -> Tuple[List[int], List[int]]:
+        """Cheapest feasible insertion of stops the construction left out"""
+        unscheduled = []
+        for node in leftovers:
+            best = None
+            for position in range(len(route) + 1):
+                candidate = route[:position] + [node] + route[position:]
+                if self.schedule(candidate) is None:
+                    continue
+                length = self.length(candidate)
+                if best is None or length < best[0]:
+                    best = (length, candidate)
+            if best is None:
+                unscheduled.append(node)
+            else:
+                route = best[1]
+        return route, unscheduled
+
+    def solve(self, stops: List[int]) -> Tuple[List[int], List[int]]:
+        route, leftovers = self.nearest_neighbour(stops)
+        route = self.improve(route)
+        if leftovers:
+            route, leftovers = self.insert(route, leftovers)
+            route = self.improve(route)
+        return route, leftovers
+
+
+def unscheduled_reason(planner: Planner, node: int) -> str:
+    if not planner.windows[node]:
+        return "closed on this day"
+    opens = [window for window in planner.windows[node] if window[1] - window[0] >= planner.visit]
+    if not opens:
+        return "open for less than the visit time"
+    return "does not fit in the time window"
+
+
+def plan_itinerary(
+    version: str,
+    start: Tuple[float, float],
+    stops: List[Tuple[Dict, Tuple[float, float], Optional[OpeningHours]]],
+    weekday: int,
+    start_minute: int,
+    end_minute: int,
+    visit_minutes: int,
+    speed_kmh: float,
+    return_to_start: bool = False,
+) -> Dict:
+    """Visiting order, times and distances for (place, coordinates, hours) stops"""
+    points = [start] + [coords for _, coords, _ in stops]
+    distances = matrix_cache.get(version, points)
+    planner = Planner(
+        distances, [hours for _, _, hours in stops], weekday, start_minute, end_minute,
+        visit_minutes, speed_kmh * 1000 / 60, return_to_start,
+    )
+    route, leftovers = planner.solve(list(range(1, len(stops) + 1)))
+
+    visits = []
+    position = 0
+    for node, (arrive, begin) in zip(route, planner.schedule(route) or []):
+        place = stops[node - 1][0]
+        visits.append({
+            "slug": place["slug"],
+            "name": place.get("name"),
+            "arrive": format_minutes(arrive),
+            "start": format_minutes(begin),
+            "end": format_minutes(begin + visit_minutes),
+            "wait_minutes": round(begin - arrive),
+            "travel_minutes": round(planner.travel[position][node]),
+            "distance": round(planner.dist[position][node], 1),
+        })
+        position = node
+    return {
+        "stops": visits,
+        "unscheduled": [
+            {"slug": stops[node - 1][0]["slug"], "reason": unscheduled_reason(planner, node)}
+            for node in leftovers
+        ],
+        "total_distance": round(planner.length(route), 1),
+        "total_travel_minutes": round(planner.travel_minutes(route)),
+    }
@@ -1,46 +1,75 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response
 from fastapi.staticfiles import StaticFiles
-import json
-import os
-from pathlib import Path
-from typing import List, Optional
-from pydantic import BaseModel
-
-# Data models
-class Place(BaseModel):
-    id: int
-    name: str
-    slug: str
-    category: str
-    description: str
-    image: str
-    rating: float
-    location: str
-    coordinates: List[float]
-    timings: str
-    entryFee: str
-    bestTime: str
-    history: Optional[str] = None
-    tips: Optional[List[str]] = None
-    gallery: Optional[List[str]] = None
-
-class SearchQuery(BaseModel):
-    query: str
-    category: Optional[str] = None
+from contextlib import asynccontextmanager
+import time
+from typing import List, Optional, Tuple
+
+from .catalog import catalog_store
+from .contact import QueueFullError, contact_queue
+from .geo import coordinates_of
+from .hours import local_now, parse_timings
+from .images import PROJECT_ROOT, image_manifest, image_resizer
+from .itinerary import plan_itinerary
+from .metrics import PROMETHEUS_MEDIA_TYPE, Gauge, MetricsMiddleware, registry, timed
+from .models import MAX_BATCH, BatchQuery, ContactMessage, ItineraryQuery, Place, SearchQuery
+from .profiling import ProfilingMiddleware, profiler
+from .pagination import (
+    MAX_LIMIT, ndjson_response, page_headers, paginate, parse_fields, projected, wants_ndjson
+)
+from .responses import (
+    ENCODINGS, MIN_COMPRESS_SIZE, CachedBody, cached_body, cached_json_response, encode_json, etag_for
+)
+from .startup import process_age, startup
+from .suggest import MAX_SUGGESTIONS
+
+def places_body(catalog):
+    return cached_body(catalog, "places", lambda: catalog.records)
 
-class ContactMessage(BaseModel):
-    name: str
-    email: str
-    subject: Optional[str] = None
-    message: str
+def categories_body(catalog):
+    return cached_body(catalog, "categories", lambda: {"categories": catalog.categories})
+
+def warm_up(catalog):
+    """Build and compress the hot response bodies before taking traffic"""
+    for cached in (places_body(catalog), categories_body(catalog)):
+        if len(cached.body) >= MIN_COMPRESS_SIZE:
+            for encoding in ENCODINGS:
+                cached.variant(encoding)
+    if catalog.places:
+        # Opens this thread's SQLite FTS connection when that backend is used
+        catalog.search(catalog.places[0].get("name", ""))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load and warm the catalog once at startup and watch it for changes"""
+    boot = process_age()
+    if boot is not None:
+        # Interpreter start, imports and server setup up to this point
+        startup.record("boot", boot)
+    catalog_store.start()
+    catalog = catalog_store.current
+    if "load" in catalog_store.load_timings:
+        startup.record("catalog_load", catalog_store.load_timings["load"])
+    for step, seconds in catalog.build_timings.items():
+        startup.record(step, seconds)
+    started = time.perf_counter()
+    warm_up(catalog)
+    startup.record("warm_up", time.perf_counter() - started)
+    await contact_queue.start()
+    startup.mark_ready()
+    print(startup.report())
+    yield
+    await contact_queue.stop()
+    catalog_store.stop()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Ayodhya Guide API",
     description="API for the Ayodhya Guide application - exploring the holy city of Ayodhya",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -50,22 +79,34 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Profile-Id"],
 )
+# Only installed when enabled, so normal requests pay nothing for it
+if profiler.enabled:
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+# Outermost, so CORS preflights and errors are counted too
+app.add_middleware(MetricsMiddleware)
+
+registry.register(Gauge(
+    "catalog_places", "Places in the live catalog",
+    callback=lambda: {(): len(catalog_store.current)}))
+registry.register(Gauge(
+    "app_startup_seconds", "Time spent in each startup phase of this worker", ("phase",),
+    callback=lambda: {(phase,): seconds for phase, seconds in startup.phases.items()}))
+registry.register(Gauge(
+    "contact_queue_depth", "Contact messages waiting to be written",
+    callback=lambda: {(): contact_queue.snapshot()["depth"]}))
+registry.register(Gauge(
+    "image_cache", "Resized image disk cache: entries, bytes, max_bytes, evictions, pending_deletes", ("stat",),
+    callback=lambda: {
+        (stat,): value for stat, value in image_resizer.snapshot().items()
+        if stat not in ("hits", "misses", "coalesced")
+    }))
 
 # Load places data
 def load_places_data():
-    """Load places data from JSON file"""
-    try:
-        data_file = Path(__file__).parent / "data" / "places.json"
-        if not data_file.exists():
-            # Fallback to parent directory
-            data_file = Path(__file__).parent.parent.parent / "data" / "places.json"
-        
-        with open(data_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading places data: {e}")
-        return []
+    """Return the resident places catalog (parsed once, hot-reloaded on change)"""
+    return catalog_store.current.places
 
 # Routes
 @app.get("/")
@@ -77,83 +118,286 @@ async def root():
         "endpoints": {
             "places": "/api/places",
             "search": "/api/search",
+            "suggest": "/api/suggest",
             "categories": "/api/categories",
+            "nearby": "/api/places/nearby",
             "contact": "/api/contact"
         }
     }
 
+def parse_bbox(bbox: Optional[str]) -> Optional[Tuple[float, float, float, float]]:
+    """min_lat,min_lon,max_lat,max_lon"""
+    if not bbox:
+        return None
+    try:
+        min_lat, min_lon, max_lat, max_lon = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be min_lat,min_lon,max_lat,max_lon")
+    if not (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lon <= 180 and -180 <= max_lon <= 180):
+        raise HTTPException(status_code=400, detail="bbox is out of range")
+    return min_lat, min_lon, max_lat, max_lon
+
 @app.get("/api/places", response_model=List[Place])
-async def get_places():
-    """Get all places"""
-    places = load_places_data()
-    return places
+async def get_places(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated Place fields to return"),
+    format: Optional[str] = Query(None, pattern="^(json|ndjson)$"),
+    category: Optional[str] = None,
+    min_rating: Optional[float] = Query(None, ge=0, le=5),
+    max_rating: Optional[float] = Query(None, ge=0, le=5),
+    bbox: Optional[str] = Query(None, description="min_lat,min_lon,max_lat,max_lon")
+):
+    """Get all places (optionally filtered, paginated, projected or streamed as NDJSON)"""
+    catalog = catalog_store.current
+    ndjson = wants_ndjson(request, format)
+    box = parse_bbox(bbox)
+    filtered = category is not None or min_rating is not None or max_rating is not None or box is not None
+    if limit is None and cursor is None and fields is None and not ndjson and not filtered:
+        return await cached_json_response(request, places_body(catalog))
+    
+    field_names = parse_fields(fields)
+    records = catalog.records
+    if filtered:
+        with timed("filter"):
+            records = catalog.filter(category, min_rating, max_rating, box)
+    page = paginate(records, limit, cursor, catalog.version)
+    headers = page_headers(request, page)
+    if ndjson:
+        return ndjson_response(page.items, field_names, headers)
+    return JSONResponse(content=projected(page.items, field_names), headers=headers)
+
+async def batch_response(request: Request, slugs: List[str], fields) -> Response:
+    """Places for several slugs in request order, plus the slugs not found"""
+    catalog = catalog_store.current
+    field_names = parse_fields(fields)
+    slugs = list(dict.fromkeys(s.strip() for s in slugs if s.strip()))
+    if not slugs:
+        raise HTTPException(status_code=400, detail="No slugs given")
+    if len(slugs) > MAX_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH} slugs per request")
+    
+    results, missing = [], []
+    for slug in slugs:
+        record = catalog.record_by_slug.get(slug)
+        if record is None:
+            missing.append(slug)
+        else:
+            results.append(record)
+    payload = {"results": projected(results, field_names), "missing": missing, "total": len(results)}
+    # Not kept in catalog.encoded (one entry per slug combination), but
+    # still gets an ETag and (cheap) compression
+    key = f"batch:{','.join(slugs)}:{','.join(field_names or ())}"
+    cached = CachedBody(encode_json(payload), etag_for(catalog.version, key), fast=True)
+    return await cached_json_response(request, cached)
+
+@app.get("/api/places/batch")
+async def get_places_batch(
+    request: Request,
+    slugs: str = Query(..., description="Comma-separated slugs"),
+    fields: Optional[str] = Query(None, description="Comma-separated Place fields to return")
+):
+    """Get several places by slug in one request; unknown slugs are listed in missing"""
+    return await batch_response(request, slugs.split(","), fields)
+
+@app.post("/api/places/batch")
+async def post_places_batch(batch: BatchQuery, request: Request):
+    """Same as GET /api/places/batch, for slug lists too long for a URL"""
+    return await batch_response(request, batch.slugs, batch.fields)
+
+@app.get("/api/places/featured")
+async def get_featured_places():
+    """Get featured places (top rated)"""
+    # Catalog keeps places pre-sorted by rating; return top 5
+    featured_places = catalog_store.current.top_rated(5)
+    
+    return {
+        "featured_places": featured_places,
+        "total": len(featured_places)
+    }
+
+@app.get("/api/places/nearby")
+async def get_nearby_places(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius: float = Query(2000, gt=0, description="Search radius in metres"),
+    k: int = Query(10, ge=1, le=100, description="Maximum number of results"),
+    category: Optional[str] = None
+):
+    """Get places near a point, nearest first, with haversine distances"""
+    with timed("nearby"):
+        hits = catalog_store.current.nearby(lat, lon, radius, k, category)
+    
+    return {
+        "lat": lat,
+        "lon": lon,
+        "radius": radius,
+        "category": category,
+        "results": [{**place, "distance": round(distance, 1)} for place, distance in hits],
+        "total": len(hits)
+    }
 
 @app.get("/api/places/{slug}", response_model=Place)
-async def get_place_by_slug(slug: str):
+async def get_place_by_slug(slug: str, request: Request):
     """Get a specific place by slug"""
-    places = load_places_data()
-    place = next((p for p in places if p["slug"] == slug), None)
+    catalog = catalog_store.current
+    place = catalog.get(slug)
     
     if not place:
         raise HTTPException(status_code=404, detail="Place not found")
     
-    return place
+    cached = catalog.record_bodies.get(catalog, f"place:{slug}", lambda: catalog.record_by_slug[slug])
+    return await cached_json_response(request, cached)
+
+@app.get("/api/places/{slug}/images")
+async def get_place_images(slug: str):
+    """Get responsive srcset data for a place's main and gallery images"""
+    place = catalog_store.current.get(slug)
+    
+    if not place:
+        raise HTTPException(status_code=404, detail="Place not found")
+    
+    return {
+        "slug": slug,
+        "image": image_manifest.srcset(place["image"]),
+        "gallery": [image_manifest.srcset(image) for image in place.get("gallery") or []]
+    }
+
+@app.get("/api/images/{name}")
+async def get_resized_image(
+    name: str,
+    w: int = Query(640, ge=16, le=2560, description="Target width in pixels, rounded up to a fixed step (never upscaled)"),
+    fmt: str = Query("webp", pattern="^(webp|jpeg|avif)$"),
+    q: int = Query(80, ge=1, le=100, description="Encoder quality, rounded to a fixed step")
+):
+    """Get a resized/transcoded copy of an image from images/"""
+    source = await run_in_threadpool(image_resizer.source_path, name)
+    if source is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    try:
+        formats = image_resizer.supported_formats()
+    except ImportError:
+        raise HTTPException(status_code=503, detail="Image processing is not available on this server")
+    if fmt not in formats:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{fmt}'")
+    
+    path = await image_resizer.get(source, w, fmt, q)
+    return FileResponse(
+        path,
+        media_type=image_resizer.FORMATS[fmt][1],
+        headers={"Cache-Control": "public, max-age=86400"}
+    )
 
 @app.get("/api/categories")
-async def get_categories():
+async def get_categories(request: Request):
     """Get all available categories"""
-    places = load_places_data()
-    categories = list(set(place["category"] for place in places))
-    return {"categories": categories}
+    return await cached_json_response(request, categories_body(catalog_store.current))
 
 @app.post("/api/search")
-async def search_places(search_query: SearchQuery):
-    """Search places by query and optional category filter"""
-    places = load_places_data()
-    
-    query = search_query.query.lower()
-    category = search_query.category.lower() if search_query.category else None
-    
-    filtered_places = []
-    
-    for place in places:
-        # Check if place matches search query
-        matches_query = (
-            query in place["name"].lower() or
-            query in place["description"].lower() or
-            query in place["location"].lower() or
-            query in place["category"].lower()
+async def search_places(
+    search_query: SearchQuery,
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(json|ndjson)$")
+):
+    """Search places by query and facet filters (ranked by relevance), with facet counts"""
+    catalog = catalog_store.current
+    field_names = parse_fields(search_query.fields)
+    with timed("search"):
+        # The single category parameter narrows the search; facet filters
+        # (including filters.category) then apply within it
+        filtered_places, facets = catalog.faceted_search(
+            search_query.query, search_query.filters, search_query.fuzzy, search_query.category
         )
-        
-        # Check if place matches category filter
-        matches_category = not category or place["category"].lower() == category
-        
-        if matches_query and matches_category:
-            filtered_places.append(place)
+    page = paginate(filtered_places, search_query.limit, search_query.cursor, catalog.version)
+    
+    if wants_ndjson(request, format):
+        return ndjson_response(page.items, field_names, page_headers(request, page))
     
     return {
         "query": search_query.query,
         "category": search_query.category,
-        "results": filtered_places,
-        "total": len(filtered_places)
+        "results": projected(page.items, field_names),
+        "total": page.total,
+        "next_cursor": page.next_cursor,
+        "facets": facets
+    }
+
+@app.get("/api/suggest")
+async def suggest_places(
+    q: str = Query(..., max_length=100),
+    limit: int = Query(8, ge=1, le=MAX_SUGGESTIONS)
+):
+    """Typeahead completions (place names, categories, tags) for a partial query"""
+    with timed("suggest"):
+        suggestions = catalog_store.current.suggest(q, limit)
+    return {
+        "query": q,
+        "suggestions": [completion._asdict() for completion in suggestions]
+    }
+
+def clock_minutes(value: str) -> int:
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+@app.post("/api/itinerary")
+async def plan_day(query: ItineraryQuery):
+    """Order a day's visits around opening hours with the least travel"""
+    catalog = catalog_store.current
+    start_minute, end_minute = clock_minutes(query.start_time), clock_minutes(query.end_time)
+    if end_minute <= start_minute:
+        raise HTTPException(status_code=400, detail="end_time must be after start_time")
+    if query.start and not (-90 <= query.start[0] <= 90 and -180 <= query.start[1] <= 180):
+        raise HTTPException(status_code=400, detail="start is out of range")
+    
+    stops, missing, no_coordinates = [], [], []
+    for slug in dict.fromkeys(query.slugs):
+        place = catalog.record_by_slug.get(slug)
+        if place is None:
+            missing.append(slug)
+            continue
+        coords = coordinates_of(place)
+        if coords is None:
+            no_coordinates.append({"slug": slug, "reason": "no coordinates"})
+            continue
+        stops.append((place, coords, parse_timings(place.get("timings"))))
+    
+    day = query.date or local_now().date()
+    start = tuple(query.start) if query.start else (stops[0][1] if stops else None)
+    result = {"stops": [], "unscheduled": [], "total_distance": 0.0, "total_travel_minutes": 0}
+    if stops:
+        with timed("itinerary"):
+            # The solver is CPU-bound; keep it off the event loop
+            result = await run_in_threadpool(
+                plan_itinerary, catalog.version, start, stops, day.weekday(), start_minute,
+                end_minute, query.visit_minutes, query.speed_kmh, query.return_to_start
+            )
+    
+    return {
+        "date": day.isoformat(),
+        "start": {"lat": start[0], "lon": start[1], "time": query.start_time} if start else None,
+        **result,
+        "unscheduled": no_coordinates + result["unscheduled"],
+        "missing": missing
     }
 
 @app.post("/api/contact")
 async def submit_contact(contact: ContactMessage):
     """Submit a contact form message"""
-    # In a real application, you would save this to a database
-    # For now, we'll just log it and return a success message
-    
-    print(f"Contact form submitted:")
-    print(f"Name: {contact.name}")
-    print(f"Email: {contact.email}")
-    if contact.subject:
-        print(f"Subject: {contact.subject}")
-    print(f"Message: {contact.message}")
+    # Queued for the background writer; returns once the batch is committed
+    try:
+        message_id = await contact_queue.submit(contact)
+    except QueueFullError:
+        raise HTTPException(
+            status_code=503,
+            detail="We're receiving a lot of messages right now, please try again shortly",
+            headers={"Retry-After": "5"}
+        )
     
     return {
         "message": "Thank you for your message! We'll get back to you soon.",
         "status": "success",
+        "id": message_id,
         "data": {
             "name": contact.name,
             "email": contact.email,
@@ -162,39 +406,104 @@ async def submit_contact(contact: ContactMessage):
         }
     }
 
+@app.get("/api/contact/stats")
+async def get_contact_stats():
+    """Contact queue depth and flush latency statistics"""
+    return contact_queue.snapshot()
+
 @app.get("/api/places/category/{category}")
-async def get_places_by_category(category: str):
+async def get_places_by_category(
+    category: str,
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated Place fields to return"),
+    format: Optional[str] = Query(None, pattern="^(json|ndjson)$")
+):
     """Get all places in a specific category"""
-    places = load_places_data()
-    filtered_places = [p for p in places if p["category"].lower() == category.lower()]
+    catalog = catalog_store.current
+    field_names = parse_fields(fields)
+    filtered_places = catalog.in_category(category)
     
     if not filtered_places:
         raise HTTPException(status_code=404, detail=f"No places found in category '{category}'")
     
+    page = paginate(filtered_places, limit, cursor, catalog.version)
+    if wants_ndjson(request, format):
+        return ndjson_response(page.items, field_names, page_headers(request, page))
+    
     return {
         "category": category,
-        "places": filtered_places,
-        "total": len(filtered_places)
+        "places": projected(page.items, field_names),
+        "total": page.total,
+        "next_cursor": page.next_cursor
     }
 
-@app.get("/api/places/featured")
-async def get_featured_places():
-    """Get featured places (top rated)"""
-    places = load_places_data()
-    
-    # Sort by rating and return top 5
-    featured_places = sorted(places, key=lambda x: x["rating"], reverse=True)[:5]
-    
-    return {
-        "featured_places": featured_places,
-        "total": len(featured_places)
-    }
+# Original images and prebuilt variants (images/build) as static files
+if (PROJECT_ROOT / "images").is_dir():
+    app.mount("/images", StaticFiles(directory=PROJECT_ROOT / "images"), name="images")
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "Ayodhya Guide API"}
 
+@app.get("/ready")
+async def readiness_check():
+    """200 once the catalog and its indexes are built and warmed, else 503"""
+    ready = startup.ready and catalog_store.loaded
+    content = {
+        "status": "ready" if ready else "starting",
+        "catalog_version": catalog_store.current.version if catalog_store.loaded else None,
+        "startup": startup.snapshot()
+    }
+    return JSONResponse(status_code=200 if ready else 503, content=content)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics for this worker process"""
+    return Response(content=registry.expose(), media_type=PROMETHEUS_MEDIA_TYPE)
+
+def require_debug_token(request: Request):
+    """Hide /debug unless profiling is enabled; 401 without the token"""
+    if not profiler.enabled:
+        raise HTTPException(status_code=404, detail="Not found")
+    token = request.headers.get("x-debug-token")
+    authorization = request.headers.get("authorization", "")
+    if token is None and authorization.lower().startswith("bearer "):
+        token = authorization[7:].strip()
+    if not profiler.authorized(token):
+        raise HTTPException(status_code=401, detail="Invalid or missing debug token")
+
+@app.get("/debug/profiles", include_in_schema=False)
+async def list_profiles(request: Request):
+    """Most recent request profiles, newest first"""
+    require_debug_token(request)
+    return {"profiles": profiler.list(), "capacity": profiler.profiles.maxlen}
+
+@app.get("/debug/profiles/{profile_id}", include_in_schema=False)
+async def get_profile(
+    profile_id: int,
+    request: Request,
+    format: str = Query("text", pattern="^(text|pstats)$"),
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls|ncalls)$"),
+    limit: int = Query(40, ge=1, le=1000)
+):
+    """One profile as a pstats report, or the raw .pstats file"""
+    require_debug_token(request)
+    profile = profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "pstats":
+        return Response(
+            content=profile.dump(),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.pstats"'}
+        )
+    summary = profile.summary()
+    header = f"{summary['method']} {summary['path']} -> {summary['status']} in {summary['duration_ms']} ms ({summary['trigger']})\n\n"
+    return PlainTextResponse(header + profile.report(sort, limit))
+
 # Error handlers
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
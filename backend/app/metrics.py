@@ -0,0 +1,292 @@
+"""
+Request metrics, internal timings and the Prometheus /metrics exposition
+
+MetricsMiddleware is a plain ASGI middleware (it does not buffer or wrap
+streaming bodies) that records, per method and route template:
+
+* request counts by status, 5xx / unhandled error counts
+* latency histograms
+* in-flight requests
+
+Code inside a request can time its own steps with ``timed("search")``; each
+step is observed in a histogram and listed in the response's Server-Timing
+header so slow requests can be broken down from the browser devtools.
+
+Metrics are per process: with several uvicorn workers each one exposes its
+own counters, which Prometheus sums across scrape targets.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Starlette appends "; charset=utf-8" to text/* media types
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4"
+
+# Seconds; covers cached responses (~100 µs) up to slow image resizes
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Catalog loads and index builds are slower and rarer
+LOAD_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def expose(self) -> List[str]:
+        lines = self.header()
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Gauge set directly, or read from a callback at scrape time"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 callback: Optional[Callable[[], Dict[LabelValues, float]]] = None):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._callback = callback
+
+    def set(self, value: float, *labels: str):
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def expose(self) -> List[str]:
+        lines = self.header()
+        if self._callback is not None:
+            try:
+                values = self._callback()
+            except Exception as e:
+                print(f"Metrics callback for {self.name} failed: {e}")
+                values = {}
+        else:
+            with self._lock:
+                values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last is +Inf), sum, count]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def expose(self) -> List[str]:
+        lines = self.header()
+        with self._lock:
+            items = sorted((labels, [list(s[0]), s[1], s[2]]) for labels, s in self._series.items())
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {repr(total)}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def expose(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP requests by method, route template and status code",
+    ("method", "route", "status")))
+http_errors = registry.register(Counter(
+    "http_request_errors_total", "HTTP requests that ended in a 5xx or an unhandled exception",
+    ("method", "route")))
+http_latency = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route template",
+    ("method", "route")))
+http_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served"))
+internal_latency = registry.register(Histogram(
+    "app_operation_duration_seconds", "Internal operation timings (search, nearby, ...)",
+    ("operation",)))
+catalog_load_latency = registry.register(Histogram(
+    "catalog_load_duration_seconds", "Catalog reload timings by phase (load = read/parse, build = validate/index)",
+    ("phase",), buckets=LOAD_BUCKETS))
+cache_requests = registry.register(Counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit/miss/coalesced)",
+    ("cache", "result")))
+
+
+# Server-Timing entries of the request being served, set by the middleware
+_server_timing: ContextVar[Optional[List[str]]] = ContextVar("server_timing", default=None)
+
+
+def _add_server_timing(entry: str):
+    entries = _server_timing.get()
+    if entries is not None:
+        entries.append(entry)
+
+
+@contextmanager
+def timed(operation: str):
+    """Time a block into app_operation_duration_seconds and Server-Timing"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        internal_latency.observe(elapsed, operation)
+        _add_server_timing(f"{operation};dur={elapsed * 1000:.3f}")
+
+
+def record_cache(cache: str, result: str):
+    """Count a cache lookup (hit/miss/...) and note it in Server-Timing"""
+    cache_requests.inc(cache, result)
+    _add_server_timing(f'{cache};desc="{result}"')
+
+
+def route_template(scope, root_path: str) -> str:
+    """Route path template of a routed request; bounded label cardinality"""
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path", "unmatched")
+    mounted = scope.get("root_path", "")
+    # Mounted apps (StaticFiles) extend root_path with the mount prefix
+    if mounted != root_path and mounted.startswith(root_path):
+        return mounted[len(root_path):] + "/{path}"
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Record per-route counts, errors, latency and add Server-Timing"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        root_path = scope.get("root_path", "")
+        entries: List[str] = []
+        token = _server_timing.set(entries)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                app_ms = (time.perf_counter() - start) * 1000
+                timing = ", ".join([f"app;dur={app_ms:.3f}"] + entries)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", timing.encode("latin-1"))
+                ]
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            status = 500
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            http_in_flight.dec()
+            _server_timing.reset(token)
+            route = route_template(scope, root_path)
+            http_requests.inc(method, route, str(status))
+            http_latency.observe(elapsed, method, route)
+            if status >= 500:
+                http_errors.inc(method, route)
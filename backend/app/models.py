@@ -0,0 +1,62 @@
+import datetime
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+
+# Most places one batch lookup may ask for
+MAX_BATCH = 100
+# Most stops one itinerary may plan. The solver holds the GIL: 25 random
+# stops take ~4 ms p50 (6 ms p95) on one core, and grow roughly with the square.
+MAX_STOPS = 25
+
+_CLOCK = r"^([01]\d|2[0-3]):[0-5]\d$"
+
+# Data models
+class Place(BaseModel):
+    id: int
+    name: str
+    slug: str
+    category: str
+    description: str
+    image: str
+    rating: float
+    location: str
+    coordinates: List[float]
+    timings: str
+    entryFee: str
+    bestTime: str
+    history: Optional[str] = None
+    tips: Optional[List[str]] = None
+    gallery: Optional[List[str]] = None
+
+class SearchQuery(BaseModel):
+    query: str
+    category: Optional[str] = None
+    limit: Optional[int] = Field(None, ge=1, le=500)
+    cursor: Optional[str] = None
+    fields: Optional[List[str]] = None
+    # None: fall back to fuzzy name matching when nothing matches exactly
+    fuzzy: Optional[bool] = None
+    # Facet -> accepted values, e.g. {"category": ["temple", "ghat"], "fee": ["free"]}
+    filters: Optional[Dict[str, List[str]]] = None
+
+class BatchQuery(BaseModel):
+    slugs: List[str] = Field(..., min_length=1, max_length=MAX_BATCH)
+    fields: Optional[List[str]] = None
+
+class ItineraryQuery(BaseModel):
+    slugs: List[str] = Field(..., min_length=1, max_length=MAX_STOPS)
+    # [lat, lon]; defaults to the first stop
+    start: Optional[List[float]] = Field(None, min_length=2, max_length=2)
+    # Decides closed days; defaults to today
+    date: Optional[datetime.date] = None
+    start_time: str = Field("09:00", pattern=_CLOCK)
+    end_time: str = Field("18:00", pattern=_CLOCK)
+    visit_minutes: int = Field(45, ge=0, le=480)
+    speed_kmh: float = Field(15.0, gt=0, le=120)
+    return_to_start: bool = False
+
+class ContactMessage(BaseModel):
+    name: str
+    email: str
+    subject: Optional[str] = None
+    message: str
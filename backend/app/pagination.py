@@ -0,0 +1,123 @@
+"""
+Cursor pagination, field projection and NDJSON streaming for list endpoints
+
+Cursors are opaque base64 tokens holding the catalog version and an offset;
+a cursor from an older catalog version is rejected rather than silently
+skipping or repeating records after a reload.
+"""
+
+import base64
+import json
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from .models import Place
+from .responses import encode_json
+
+MAX_LIMIT = 500
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Records per streamed chunk; sending one record per chunk is dominated by
+# per-chunk overhead
+NDJSON_BATCH = 100
+
+
+class Page:
+    """One page of results plus the cursor for the next one"""
+
+    def __init__(self, items: Sequence[Dict], next_cursor: Optional[str], total: int):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.total = total
+
+
+def parse_fields(fields) -> Optional[Tuple[str, ...]]:
+    """Validate a fields= projection (comma string or list) against Place"""
+    if not fields:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    names = tuple(dict.fromkeys(f.strip() for f in fields if f.strip()))
+    unknown = [f for f in names if f not in Place.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(unknown)}")
+    return names or None
+
+
+def project(place: Dict, fields: Optional[Tuple[str, ...]]) -> Dict:
+    """Keep only the requested fields of a place"""
+    if fields is None:
+        return place
+    return {f: place[f] for f in fields if f in place}
+
+
+def encode_cursor(version: str, offset: int) -> str:
+    raw = json.dumps({"v": version, "o": offset}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, version: str) -> int:
+    """Offset encoded in cursor; 400 if malformed or from another version"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        offset = int(data["o"])
+        cursor_version = data["v"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor_version != version or offset < 0:
+        raise HTTPException(
+            status_code=400,
+            detail="Cursor has expired because the catalog changed; start again from the first page",
+        )
+    return offset
+
+
+def paginate(items: Sequence[Dict], limit: Optional[int], cursor: Optional[str], version: str) -> Page:
+    """Slice items from the cursor position"""
+    offset = decode_cursor(cursor, version) if cursor else 0
+    if limit is None:
+        return Page(items[offset:], None, len(items))
+    end = offset + limit
+    next_cursor = encode_cursor(version, end) if end < len(items) else None
+    return Page(items[offset:end], next_cursor, len(items))
+
+
+def page_headers(request: Request, page: Page) -> Dict[str, str]:
+    """X-Next-Cursor / Link headers for a page"""
+    headers = {"X-Total-Count": str(page.total)}
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+        next_url = request.url.include_query_params(cursor=page.next_cursor)
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    return headers
+
+
+def wants_ndjson(request: Request, format: Optional[str] = None) -> bool:
+    """NDJSON if asked for by ?format=ndjson or the Accept header"""
+    if format:
+        return format == "ndjson"
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+async def _ndjson_lines(items: Iterable[Dict], fields: Optional[Tuple[str, ...]]):
+    # An async generator keeps Starlette from hopping to the threadpool for
+    # every chunk; records are still encoded only as they are sent
+    batch = []
+    for item in items:
+        batch.append(encode_json(project(item, fields)))
+        if len(batch) >= NDJSON_BATCH:
+            yield b"\n".join(batch) + b"\n"
+            batch = []
+    if batch:
+        yield b"\n".join(batch) + b"\n"
+
+
+def ndjson_response(items: Iterable[Dict], fields: Optional[Tuple[str, ...]], headers: Dict[str, str]) -> StreamingResponse:
+    """Stream one JSON record per line, encoding each only as it is sent"""
+    return StreamingResponse(_ndjson_lines(items, fields), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+
+def projected(items: Iterable[Dict], fields: Optional[Tuple[str, ...]]) -> List[Dict]:
+    return [project(item, fields) for item in items]
@@ -0,0 +1,187 @@
+"""
+Opt-in cProfile capture of individual requests
+
+Disabled unless PROFILING_ENABLED=1 and PROFILING_TOKEN are set; when
+disabled the middleware is not installed at all, so normal requests pay
+nothing. When enabled a request is profiled if it sends
+``X-Profile: <token>`` or is picked by PROFILING_SAMPLE_RATE (only paths
+under PROFILING_PATHS). The most recent PROFILING_BUFFER captures are kept
+in memory and served from /debug/profiles to callers presenting the token.
+
+cProfile only sees the event loop thread and one profile can be active at a
+time, so a request arriving while another is being profiled is served
+normally. Work from other requests interleaved at ``await`` points during
+the capture also shows up in the profile.
+"""
+
+import cProfile
+import hmac
+import io
+import itertools
+import marshal
+import os
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Sequence
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+class Profile:
+    """One captured request profile"""
+
+    __slots__ = ("id", "created", "method", "path", "status", "duration_ms", "trigger", "stats")
+
+    def __init__(self, id: int, method: str, path: str, status: int,
+                 duration_ms: float, trigger: str, stats: Dict):
+        self.id = id
+        self.created = time.time()
+        self.method = method
+        self.path = path
+        self.status = status
+        self.duration_ms = duration_ms
+        self.trigger = trigger
+        # Raw cProfile stats, the same structure pstats.dump_stats() writes
+        self.stats = stats
+
+    def summary(self) -> Dict:
+        return {
+            "id": self.id,
+            "created": self.created,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "duration_ms": round(self.duration_ms, 3),
+            "trigger": self.trigger,
+        }
+
+    def report(self, sort: str = "cumulative", limit: int = 40) -> str:
+        """Human-readable pstats listing"""
+        out = io.StringIO()
+        stats = pstats.Stats(_StatsHolder(self.stats), stream=out)
+        stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def dump(self) -> bytes:
+        """Bytes loadable with pstats.Stats(path) or snakeviz"""
+        return marshal.dumps(self.stats)
+
+
+class _StatsHolder:
+    # pstats.Stats loads from any object with create_stats() and .stats
+    def __init__(self, stats: Dict):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+class Profiler:
+    """Decides which requests to profile and keeps the ring buffer"""
+
+    def __init__(self, enabled: bool, token: str, sample_rate: float = 0.0,
+                 paths: Sequence[str] = ("/api/",), buffer_size: int = 50):
+        if enabled and not token:
+            print("PROFILING_ENABLED is set but PROFILING_TOKEN is empty; profiling stays off")
+            enabled = False
+        self.enabled = enabled
+        self.token = token
+        self.sample_rate = sample_rate
+        self.paths = tuple(paths)
+        self.profiles: deque = deque(maxlen=buffer_size)
+        self._ids = itertools.count(1)
+        self._busy = threading.Lock()
+
+    def authorized(self, presented: Optional[str]) -> bool:
+        if not self.enabled or not presented:
+            return False
+        return hmac.compare_digest(presented.encode("utf-8", "replace"), self.token.encode("utf-8"))
+
+    def trigger_for(self, scope) -> Optional[str]:
+        """'header' / 'sample' if this request should be profiled"""
+        for name, value in scope.get("headers", ()):
+            if name == b"x-profile":
+                if self.authorized(value.decode("latin-1")):
+                    return "header"
+                break
+        if self.sample_rate > 0 and scope["path"].startswith(self.paths) and random.random() < self.sample_rate:
+            return "sample"
+        return None
+
+    def begin(self) -> Optional[int]:
+        """Id for a new capture, or None if one is already running"""
+        if not self._busy.acquire(blocking=False):
+            return None
+        return next(self._ids)
+
+    def end(self, profile: Profile):
+        self._busy.release()
+        self.profiles.append(profile)
+
+    def get(self, profile_id: int) -> Optional[Profile]:
+        for profile in self.profiles:
+            if profile.id == profile_id:
+                return profile
+        return None
+
+    def list(self) -> List[Dict]:
+        return [profile.summary() for profile in reversed(self.profiles)]
+
+
+class ProfilingMiddleware:
+    """Run selected requests under cProfile and store the result"""
+
+    def __init__(self, app, profiler: "Profiler"):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trigger = self.profiler.trigger_for(scope)
+        profile_id = self.profiler.begin() if trigger else None
+        if profile_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", str(profile_id).encode())
+                ]
+            await send(message)
+
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.disable()
+            duration_ms = (time.perf_counter() - start) * 1000
+            profile.create_stats()
+            path = scope["path"]
+            if scope.get("query_string"):
+                path += "?" + scope["query_string"].decode("latin-1")
+            self.profiler.end(Profile(
+                profile_id, scope["method"], path, status, duration_ms, trigger, profile.stats
+            ))
+
+
+profiler = Profiler(
+    enabled=_env_flag("PROFILING_ENABLED"),
+    token=os.environ.get("PROFILING_TOKEN", ""),
+    sample_rate=float(os.environ.get("PROFILING_SAMPLE_RATE", "0")),
+    paths=[p for p in os.environ.get("PROFILING_PATHS", "/api/").split(",") if p],
+    buffer_size=int(os.environ.get("PROFILING_BUFFER", "50")),
+)
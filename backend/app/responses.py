@@ -0,0 +1,228 @@
+"""
+Pre-serialized JSON responses with ETag revalidation
+
+Hot read endpoints encode their JSON body once per catalog version and keep
+the bytes on the Catalog itself, so a reload naturally drops the old bodies.
+Each body carries a strong ETag derived from the catalog hash; a matching
+If-None-Match is answered with 304 and no body.
+
+Bodies above a size threshold are also compressed once per version (gzip,
+and brotli when the optional ``brotli`` package is installed) and the
+variant is picked from Accept-Encoding on each request. Bodies built for a
+single request (batch lookups) use cheap levels instead, and compression
+always runs off the event loop.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+
+from .metrics import record_cache
+
+CACHE_CONTROL = "no-cache"
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_SIZE = int(os.environ.get("MIN_COMPRESS_SIZE", "1024"))
+
+# Preference order when the client accepts several encodings equally
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+# Per-record bodies (one per place) kept per catalog version and worker
+RECORD_BODY_CACHE_SIZE = int(os.environ.get("RECORD_BODY_CACHE_SIZE", "512"))
+
+# Brotli's best quality runs at ~1 MB/s; beyond this size use a level that
+# still beats gzip but keeps whole-catalog bodies to a second or two
+BROTLI_MAX_QUALITY_SIZE = 1024 * 1024
+
+# Levels for bodies compressed once per request, not once per version
+FAST_BROTLI_QUALITY = 4
+FAST_GZIP_LEVEL = 1
+
+
+def compress(body: bytes, encoding: str, fast: bool = False) -> bytes:
+    if encoding == "br":
+        if fast:
+            quality = FAST_BROTLI_QUALITY
+        else:
+            quality = 11 if len(body) <= BROTLI_MAX_QUALITY_SIZE else 5
+        return brotli.compress(bytes(body), quality=quality)
+    # mtime=0 keeps the output (and therefore the ETag) deterministic
+    return gzip.compress(body, compresslevel=FAST_GZIP_LEVEL if fast else 9, mtime=0)
+
+
+# Same settings as FastAPI's JSONResponse; one shared encoder avoids
+# json.dumps() rebuilding it for every small record
+_encoder = json.JSONEncoder(ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"))
+
+
+def encode_json(content: Any) -> bytes:
+    """Encode exactly like FastAPI's JSONResponse"""
+    return _encoder.encode(content).encode("utf-8")
+
+
+class BufferResponse(Response):
+    """Response whose body may be a memoryview (e.g. into a mapped snapshot)"""
+
+    def render(self, content: Any) -> Any:
+        if isinstance(content, memoryview):
+            return content
+        return super().render(content)
+
+
+class CachedBody:
+    """Encoded JSON body plus its ETag and lazily built compressed variants
+
+    body and variants are bytes, or memoryviews when they live in a
+    memory-mapped snapshot. fast marks a body built for one request, which
+    is not worth the best compression levels.
+    """
+
+    __slots__ = ("body", "etag", "variants", "fast")
+
+    def __init__(self, body: bytes, etag: str, variants: Optional[Dict[str, bytes]] = None, fast: bool = False):
+        self.body = body
+        self.etag = etag
+        self.variants: Dict[str, bytes] = dict(variants or {})
+        self.fast = fast
+
+    def variant(self, encoding: str) -> bytes:
+        """Compressed body for encoding, compressed at most once"""
+        data = self.variants.get(encoding)
+        if data is None:
+            data = compress(self.body, encoding, self.fast)
+            self.variants[encoding] = data
+        return data
+
+    def variant_etag(self, encoding: Optional[str]) -> str:
+        # Strong ETags must differ between byte-different representations
+        if encoding is None:
+            return self.etag
+        return f'{self.etag[:-1]}-{encoding}"'
+
+
+def etag_for(version: str, key: str) -> str:
+    """Strong ETag of the body stored under key for a catalog version"""
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:12]
+    return f'"{version}-{digest}"'
+
+
+def cached_body(catalog, key: str, build: Callable[[], Any]) -> CachedBody:
+    """Return the encoded body for key, building it once per catalog version"""
+    cached = catalog.encoded.get(key)
+    if cached is not None:
+        record_cache("response", "hit")
+    else:
+        record_cache("response", "miss")
+        cached = CachedBody(encode_json(build()), etag_for(catalog.version, key))
+        # Plain dict assignment; a racing duplicate build is harmless
+        catalog.encoded[key] = cached
+    return cached
+
+
+class BodyLRU:
+    """Bounded store of per-key bodies (one per place) for a catalog version"""
+
+    def __init__(self, size: int = RECORD_BODY_CACHE_SIZE):
+        self.size = size
+        self._lock = threading.Lock()
+        self._bodies: "OrderedDict[str, CachedBody]" = OrderedDict()
+
+    def get(self, catalog, key: str, build: Callable[[], Any]) -> CachedBody:
+        """Like cached_body, evicting the least recently used beyond size"""
+        with self._lock:
+            cached = self._bodies.get(key)
+            if cached is not None:
+                self._bodies.move_to_end(key)
+        if cached is not None:
+            record_cache("response", "hit")
+            return cached
+        record_cache("response", "miss")
+        cached = CachedBody(encode_json(build()), etag_for(catalog.version, key))
+        with self._lock:
+            self._bodies[key] = cached
+            while len(self._bodies) > self.size:
+                self._bodies.popitem(last=False)
+        return cached
+
+    def __len__(self) -> int:
+        return len(self._bodies)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the best supported encoding from an Accept-Encoding header"""
+    if not accept_encoding:
+        return None
+    qualities: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        qualities[token] = q
+
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        q = qualities.get(encoding, qualities.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def etag_matches(request: Request, cached: CachedBody) -> bool:
+    """Weak comparison of If-None-Match against any of our ETags (RFC 9110)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Every variant carries the same content, so any of them is current
+    current = {cached.variant_etag(encoding) for encoding in (None, *ENCODINGS)}
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in current:
+            return True
+    return False
+
+
+async def cached_json_response(request: Request, cached: CachedBody) -> Response:
+    """200 with the cached body (compressed if negotiated), or 304"""
+    encoding = None
+    if len(cached.body) >= MIN_COMPRESS_SIZE:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+
+    headers = {
+        "ETag": cached.variant_etag(encoding),
+        "Cache-Control": CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request, cached):
+        return Response(status_code=304, headers=headers)
+    if encoding is None:
+        return BufferResponse(content=cached.body, media_type="application/json", headers=headers)
+    headers["Content-Encoding"] = encoding
+    data = cached.variants.get(encoding)
+    if data is None:
+        # Brotli's best quality takes ~1 s per MB; keep it off the event loop
+        data = await run_in_threadpool(cached.variant, encoding)
+    return BufferResponse(content=data, media_type="application/json", headers=headers)
@@ -0,0 +1,287 @@
+"""
+Full-text search over the places catalog
+
+Every text field is tokenized into a positional inverted index when the
+catalog loads. Queries are answered by intersecting posting lists (smallest
+first) and ranking the survivors with BM25F, so the cost follows the number
+of query terms and matching postings rather than the size of the catalog.
+
+Query syntax:
+    ram temple          every term must match (any field)
+    "kanak bhawan"      phrase: terms adjacent within one field
+    hanu*               prefix: any indexed term starting with "hanu"
+"""
+
+import math
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from typing import Container, Dict, Iterable, List, Optional, Set, Tuple
+
+# Per-field weights; name matches count most, long prose least
+FIELD_BOOSTS: Dict[str, float] = {
+    "name": 3.0,
+    "tags": 2.0,
+    "category": 1.5,
+    "location": 1.0,
+    "description": 1.0,
+    "tips": 0.5,
+    "history": 0.5,
+}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Position gap between list items (tags, tips) so phrases don't span items
+ITEM_GAP = 100
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+# Occurrences are packed as field index << FIELD_SHIFT | position
+FIELD_SHIFT = 24
+POSITION_MASK = (1 << FIELD_SHIFT) - 1
+
+
+
+def normalize(text: str) -> str:
+    """Lowercase and strip accents"""
+    if text.isascii():
+        # Nothing to decompose
+        return text.lower()
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+
+
+def stem(token: str) -> str:
+    """Very light plural folding so 'ghats' matches 'ghat'"""
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into normalized index terms"""
+    return [stem(t) for t in _TOKEN_RE.findall(normalize(text))]
+
+
+def _field_tokens(value) -> List[Tuple[str, int]]:
+    """Tokens with positions for a string or list-of-strings field"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = [value]
+    tokens = []
+    offset = 0
+    for item in value:
+        if not isinstance(item, str):
+            continue
+        terms = tokenize(item)
+        tokens.extend((term, offset + i) for i, term in enumerate(terms))
+        offset += len(terms) + ITEM_GAP
+    return tokens
+
+
+def parse_query(query: str) -> List[Tuple[str, List[str]]]:
+    """Split a query into ('term'|'prefix'|'phrase', terms) clauses"""
+    clauses = []
+    for phrase, word in _QUERY_RE.findall(query):
+        if phrase:
+            terms = tokenize(phrase)
+            if len(terms) > 1:
+                clauses.append(("phrase", terms))
+            elif terms:
+                clauses.append(("term", terms))
+        elif word.endswith("*") and len(word) > 1:
+            terms = _TOKEN_RE.findall(normalize(word[:-1]))
+            clauses.extend(("term", [stem(t)]) for t in terms[:-1])
+            if terms:
+                clauses.append(("prefix", [terms[-1]]))
+        else:
+            clauses.extend(("term", [t]) for t in tokenize(word))
+    return clauses
+
+
+class TermPostings:
+    """Postings of one term as flat arrays, ordered by doc id
+
+    entries holds (field index << 24 | position) for every occurrence,
+    grouped per doc: doc i owns entries[starts[i]:starts[i + 1]]. weights
+    holds each doc's BM25F contribution for the term, fixed once the
+    catalog is indexed. A few arrays per term replace a dict per (term,
+    doc) and a list per (term, doc, field).
+    """
+
+    __slots__ = ("docs", "starts", "entries", "weights")
+
+    def __init__(self):
+        self.docs = array("I")
+        self.starts = array("I", [0])
+        self.entries = array("I")
+        self.weights = array("d")
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def index(self, doc_id: int) -> int:
+        """Position of doc_id in docs, or -1"""
+        i = bisect_left(self.docs, doc_id)
+        if i < len(self.docs) and self.docs[i] == doc_id:
+            return i
+        return -1
+
+    def fields(self, i: int) -> Dict[int, List[int]]:
+        """field index -> positions for the i-th doc"""
+        out: Dict[int, List[int]] = {}
+        for entry in self.entries[self.starts[i]:self.starts[i + 1]]:
+            out.setdefault(entry >> FIELD_SHIFT, []).append(entry & POSITION_MASK)
+        return out
+
+
+class SearchIndex:
+    """Positional inverted index with BM25F ranking"""
+
+    def __init__(self, places: List[Dict], boosts: Optional[Dict[str, float]] = None):
+        self.boosts = boosts or FIELD_BOOSTS
+        self.fields = list(self.boosts)
+        self.doc_count = len(places)
+        self.postings: Dict[str, TermPostings] = {}
+        self.field_lengths: Dict[str, array] = {f: array("I", [0]) * len(places) for f in self.fields}
+
+        for doc_id, place in enumerate(places):
+            doc_terms: Dict[str, List[int]] = {}
+            for field_idx, field in enumerate(self.fields):
+                tokens = _field_tokens(place.get(field))
+                self.field_lengths[field][doc_id] = len(tokens)
+                for term, pos in tokens:
+                    doc_terms.setdefault(term, []).append(field_idx << FIELD_SHIFT | min(pos, POSITION_MASK))
+            for term, entries in doc_terms.items():
+                postings = self.postings.get(term)
+                if postings is None:
+                    postings = self.postings[term] = TermPostings()
+                postings.docs.append(doc_id)
+                postings.entries.extend(entries)
+                postings.starts.append(len(postings.entries))
+
+        self.avg_length = {
+            f: (sum(lengths) / len(lengths) if lengths else 0.0) or 1.0
+            for f, lengths in self.field_lengths.items()
+        }
+        self.terms = sorted(self.postings)
+        for term, postings in self.postings.items():
+            self._weigh(postings, self.idf(term))
+
+    def _weigh(self, postings: TermPostings, idf: float):
+        boosts = [self.boosts[f] for f in self.fields]
+        lengths = [self.field_lengths[f] for f in self.fields]
+        avgs = [self.avg_length[f] for f in self.fields]
+        entries, starts = postings.entries, postings.starts
+        for i, doc_id in enumerate(postings.docs):
+            counts: Dict[int, int] = {}
+            for entry in entries[starts[i]:starts[i + 1]]:
+                field_idx = entry >> FIELD_SHIFT
+                counts[field_idx] = counts.get(field_idx, 0) + 1
+            tf = 0.0
+            for field_idx, count in counts.items():
+                norm = 1 - B + B * lengths[field_idx][doc_id] / avgs[field_idx]
+                tf += boosts[field_idx] * count / norm
+            postings.weights.append(idf * tf / (K1 + tf))
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+
+    def expand_prefix(self, prefix: str) -> List[str]:
+        """Indexed terms starting with prefix, via binary search"""
+        i = bisect_left(self.terms, prefix)
+        out = []
+        while i < len(self.terms) and self.terms[i].startswith(prefix):
+            out.append(self.terms[i])
+            i += 1
+        return out
+
+    def _phrase_docs(self, terms: List[str]) -> Set[int]:
+        """Docs where the terms appear adjacent, in order, in one field"""
+        lists = [self.postings.get(t) for t in terms]
+        if not all(lists):
+            return set()
+        candidates = set(min(lists, key=len).docs)
+        for p in lists:
+            candidates.intersection_update(p.docs)
+        matched = set()
+        for doc_id in candidates:
+            per_term = [p.fields(p.index(doc_id)) for p in lists]
+            for field, first_positions in per_term[0].items():
+                rest = [fields.get(field) for fields in per_term[1:]]
+                if not all(rest):
+                    continue
+                rest_sets = [set(r) for r in rest]
+                if any(all(pos + i + 1 in s for i, s in enumerate(rest_sets)) for pos in first_positions):
+                    matched.add(doc_id)
+                    break
+        return matched
+
+    def _score_terms(self, doc_ids: Set[int], terms: Iterable[str]) -> Dict[int, float]:
+        scores: Dict[int, float] = {}
+        for term in terms:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            weights = postings.weights
+            if len(doc_ids) * 8 < len(postings):
+                # Few candidates: look each one up
+                for doc_id in doc_ids:
+                    i = postings.index(doc_id)
+                    if i >= 0:
+                        scores[doc_id] = scores.get(doc_id, 0.0) + weights[i]
+            else:
+                for doc_id, weight in zip(postings.docs, weights):
+                    if doc_id in doc_ids:
+                        scores[doc_id] = scores.get(doc_id, 0.0) + weight
+        return scores
+
+    def search(self, query: str, allowed: Optional[Container[int]] = None) -> List[Tuple[int, float]]:
+        """Return (doc id, score) pairs, best first; all clauses must match"""
+        clauses = parse_query(query)
+        if not clauses:
+            return []
+
+        # Resolve each clause to its candidate doc set and scoring terms
+        resolved = []
+        for kind, terms in clauses:
+            if kind == "term":
+                postings = self.postings.get(terms[0])
+                docs = set(postings.docs) if postings else set()
+                score_terms = terms
+            elif kind == "prefix":
+                score_terms = self.expand_prefix(terms[0])
+                docs = set()
+                for t in score_terms:
+                    docs.update(self.postings[t].docs)
+            else:
+                docs = self._phrase_docs(terms)
+                score_terms = terms
+            if not docs:
+                return []
+            resolved.append((docs, score_terms))
+
+        # Intersect smallest first
+        resolved.sort(key=lambda r: len(r[0]))
+        matched = resolved[0][0]
+        for docs, _ in resolved[1:]:
+            matched = matched & docs
+        if allowed is not None:
+            if isinstance(allowed, (set, frozenset)):
+                matched &= allowed
+            else:
+                matched = {doc_id for doc_id in matched if doc_id in allowed}
+        if not matched:
+            return []
+
+        scores: Dict[int, float] = dict.fromkeys(matched, 0.0)
+        for _, score_terms in resolved:
+            for doc_id, s in self._score_terms(matched, score_terms).items():
+                scores[doc_id] += s
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
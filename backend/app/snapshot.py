@@ -0,0 +1,481 @@
+"""
+Memory-mapped catalog snapshots shared by several worker processes
+
+With N workers each one would normally parse places.json and build its own
+records and indexes. A snapshot is the catalog compiled once into a single
+file of flat sections that every worker maps read-only, so the pages are
+shared through the OS page cache and memory grows with the catalog, not
+with catalog x workers:
+
+    body            the /api/places JSON array, records back to back
+    body.gzip/.br   its precompressed variants
+    offsets         Q[n+1]: record i is body[offsets[i]:offsets[i+1] - 1]
+    slugs           utf-8 slugs sorted bytewise, with slug_offsets Q[n+1]
+                    and slug_docs I[n] for binary search
+    by_rating       I[n]: doc ids, best rated first
+    rating          f[n], lat/lon d[n]: PlaceColumns, NaN where missing
+    category_codes  H[n]: index into the header's category keys
+    category:<key>  I[]: doc ids of one category in catalog order
+    kd_*            the implicit k-d tree arrays of SpatialIndex
+    suggest         JSON list of typeahead completions (see suggest.py)
+    fuzzy           JSON name vocabulary of the FuzzyIndex (see fuzzy.py)
+    fee             B[n]: free/paid code; hours H[n]: index into the
+                    header's distinct timings strings (see facets.py)
+
+Text search runs on a SQLite FTS5 database written next to the snapshot
+(one per version), which is shared through the page cache the same way.
+Records are decoded from the mapped bytes on access.
+
+A reload is a new snapshot renamed over the old one; workers notice the
+new file on their next poll and map it, while requests still holding the
+old mapping keep reading it until they finish. An FTS database is deleted
+only once it has been out of use for FTS_RETENTION seconds, so a worker
+that is slow to switch keeps its text search.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .columns import BBox, DocMask, PlaceColumns
+from .facets import FacetIndex, fee_code, hours_codes
+from .fuzzy import FuzzyIndex
+from .geo import SpatialIndex, coordinates_of
+from .hours import local_now
+from .responses import ENCODINGS, MIN_COMPRESS_SIZE, BodyLRU, CachedBody, compress, encode_json, etag_for
+from .storage import SQLiteBackend, StorageBackend, TextSearch, build_database
+from .suggest import Completion, Suggester, completions_from, dump_completions, load_completions
+
+MAGIC = b"AYGSNAP1"
+FORMAT_VERSION = 5
+_HEADER_LEN = struct.Struct("<Q")
+
+# Seconds an FTS database outlives the snapshot that referenced it
+FTS_RETENTION = float(os.environ.get("FTS_RETENTION", "3600"))
+
+
+def default_snapshot_path() -> Path:
+    return Path(os.environ.get("PLACES_SNAPSHOT", Path(__file__).parent / "data" / "places.snapshot"))
+
+
+def _fts_name(snapshot_path: Path, version: str) -> str:
+    return f"{snapshot_path.name}.{version}.fts.db"
+
+
+def _read_header(path: Path) -> Optional[Dict]:
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            (length,) = _HEADER_LEN.unpack(f.read(_HEADER_LEN.size))
+            return json.loads(f.read(length))
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def write_snapshot(places: List[Dict], version: str, path: Path) -> Path:
+    """Compile places into a snapshot at path (plus its FTS database)"""
+    from .catalog import validate_places
+
+    records = validate_places(places)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    count = len(records)
+
+    sections: Dict[str, Tuple[str, bytes]] = {}
+
+    body = bytearray(b"[")
+    offsets = array("Q")
+    for i, record in enumerate(records):
+        if i:
+            body += b","
+        offsets.append(len(body))
+        body += encode_json(record)
+    body += b"]"
+    offsets.append(len(body))
+    sections["body"] = ("B", bytes(body))
+    sections["offsets"] = ("Q", offsets.tobytes())
+    if len(body) >= MIN_COMPRESS_SIZE:
+        for encoding in ENCODINGS:
+            sections[f"body.{encoding}"] = ("B", compress(bytes(body), encoding))
+
+    by_slug = sorted((r["slug"].encode("utf-8"), doc_id) for doc_id, r in enumerate(records))
+    slug_blob = bytearray()
+    slug_offsets = array("Q", [0])
+    for slug, _ in by_slug:
+        slug_blob += slug
+        slug_offsets.append(len(slug_blob))
+    sections["slugs"] = ("B", bytes(slug_blob))
+    sections["slug_offsets"] = ("Q", slug_offsets.tobytes())
+    sections["slug_docs"] = ("I", array("I", (doc_id for _, doc_id in by_slug)).tobytes())
+
+    columns = PlaceColumns.from_places(records)
+    sections["by_rating"] = ("I", columns.rating_order.astype(np.uint32).tobytes())
+    sections["rating"] = ("f", columns.rating.tobytes())
+    sections["lat"] = ("d", columns.lat.tobytes())
+    sections["lon"] = ("d", columns.lon.tobytes())
+    sections["category_codes"] = ("H", columns.category_code.tobytes())
+    names = sorted({r["category"] for r in records if r.get("category")})
+    keys = columns.category_keys
+    for key in keys:
+        sections[f"category:{key}"] = ("I", columns.in_category(key).astype(np.uint32).tobytes())
+
+    points = []
+    for doc_id, record in enumerate(records):
+        coords = coordinates_of(record)
+        if coords:
+            points.append((doc_id, coords[0], coords[1]))
+    spatial = SpatialIndex(points)
+    sections["kd_xyz"] = ("d", spatial.xyz.tobytes())
+    sections["kd_latlon"] = ("d", spatial.latlon.tobytes())
+    sections["kd_ids"] = ("I", spatial.ids.tobytes())
+    sections["kd_splits"] = ("d", spatial.splits.tobytes())
+
+    # From the raw places: tags are not part of the validated records
+    sections["suggest"] = ("B", dump_completions(completions_from(places)))
+    sections["fuzzy"] = ("B", FuzzyIndex.from_places(records).dump())
+    sections["fee"] = ("B", bytes(fee_code(r.get("entryFee")) for r in records))
+    hours, timings = hours_codes(r.get("timings") for r in records)
+    sections["hours"] = ("H", hours.tobytes())
+
+    # Text search: a versioned FTS database next to the snapshot, written
+    # before the snapshot that points at it. Built from the raw places, like
+    # import_json, so tags stay searchable
+    fts_name = _fts_name(path, version)
+    build_database(places, version, path.parent / fts_name)
+
+    layout: Dict[str, List] = {}
+    position = 0
+    for name, (typecode, data) in sections.items():
+        layout[name] = [position, len(data), typecode]
+        position += (len(data) + 7) & ~7
+    header = json.dumps({
+        "format": FORMAT_VERSION,
+        "version": version,
+        "count": count,
+        "byteorder": sys.byteorder,
+        "fts": fts_name,
+        "categories": names,
+        "category_keys": keys,
+        "timings": timings,
+        "sections": layout,
+    }).encode("utf-8")
+    data_start = (len(MAGIC) + _HEADER_LEN.size + len(header) + 7) & ~7
+
+    previous = _read_header(path)
+    fd, tmp_name = tempfile.mkstemp(suffix=".snapshot", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(_HEADER_LEN.pack(len(header)))
+            f.write(header)
+            f.write(b"\0" * (data_start - f.tell()))
+            for name, (typecode, data) in sections.items():
+                f.write(data)
+                f.write(b"\0" * (-len(data) % 8))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+    # Workers may still be on older snapshots. Stamp the one just replaced
+    # with the time it went out of use (its FTS mtime) and delete only FTS
+    # files unused for FTS_RETENTION
+    retired = previous.get("fts") if previous else None
+    if retired and retired != fts_name:
+        try:
+            os.utime(path.parent / retired)
+        except OSError:
+            pass
+    cutoff = time.time() - FTS_RETENTION
+    for old in path.parent.glob(f"{path.name}.*.fts.db"):
+        if old.name == fts_name:
+            continue
+        try:
+            if old.stat().st_mtime < cutoff:
+                old.unlink()
+        except OSError:
+            pass
+    return path
+
+
+def compile_snapshot(json_path: Path, snapshot_path: Path) -> int:
+    """Compile places.json into a snapshot; return the number of places"""
+    raw = Path(json_path).read_bytes()
+    places = json.loads(raw)
+    write_snapshot(places, hashlib.sha256(raw).hexdigest()[:16], snapshot_path)
+    return len(places)
+
+
+class Snapshot:
+    """A snapshot file mapped read-only, with typed views of its sections"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mm)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{self.path} is not a places snapshot")
+        (length,) = _HEADER_LEN.unpack_from(view, len(MAGIC))
+        start = len(MAGIC) + _HEADER_LEN.size
+        self.header = json.loads(bytes(view[start:start + length]))
+        if self.header.get("format") != FORMAT_VERSION or self.header.get("byteorder") != sys.byteorder:
+            raise ValueError(f"{self.path} was written by an incompatible version; rebuild it")
+        self._data_start = (start + length + 7) & ~7
+        self._view = view
+        self.version: str = self.header["version"]
+
+    def has(self, name: str) -> bool:
+        return name in self.header["sections"]
+
+    def section(self, name: str) -> memoryview:
+        offset, length, typecode = self.header["sections"][name]
+        start = self._data_start + offset
+        data = self._view[start:start + length]
+        return data if typecode == "B" else data.cast(typecode)
+
+    def array(self, name: str) -> np.ndarray:
+        """A section as a read-only NumPy array over the mapping (no copy)"""
+        offset, length, typecode = self.header["sections"][name]
+        start = self._data_start + offset
+        return np.frombuffer(self._view[start:start + length], dtype=np.dtype(typecode))
+
+
+class MappedRecords:
+    """Read-only sequence of records decoded from the mapped body
+
+    docs selects and orders a subset (a category, rating order). Slicing
+    returns another lazy view, so pagination and streaming decode records
+    only as they are read.
+    """
+
+    __slots__ = ("_body", "_offsets", "_docs")
+
+    def __init__(self, body: memoryview, offsets: Sequence[int], docs: Optional[Sequence[int]] = None):
+        self._body = body
+        self._offsets = offsets
+        self._docs = docs
+
+    def __len__(self) -> int:
+        return len(self._docs) if self._docs is not None else len(self._offsets) - 1
+
+    def doc(self, doc_id: int) -> Dict:
+        return json.loads(bytes(self._body[self._offsets[doc_id]:self._offsets[doc_id + 1] - 1]))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            docs = self._docs if self._docs is not None else range(len(self))
+            return MappedRecords(self._body, self._offsets, docs[index])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("record index out of range")
+        return self.doc(self._docs[index] if self._docs is not None else index)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+class _SlugLookup:
+    """record_by_slug over the mapped slug table"""
+
+    def __init__(self, catalog: "MappedCatalog"):
+        self._catalog = catalog
+
+    def __getitem__(self, slug: str) -> Dict:
+        doc_id = self._catalog.doc_for_slug(slug)
+        if doc_id is None:
+            raise KeyError(slug)
+        return self._catalog.records.doc(doc_id)
+
+    def __contains__(self, slug: str) -> bool:
+        return self._catalog.doc_for_slug(slug) is not None
+
+    def get(self, slug: str, default=None):
+        doc_id = self._catalog.doc_for_slug(slug)
+        return default if doc_id is None else self._catalog.records.doc(doc_id)
+
+
+class MappedCatalog:
+    """Catalog interface served straight from a mapped Snapshot"""
+
+    def __init__(self, snapshot: Snapshot, text_search: Optional[TextSearch] = None):
+        start = time.perf_counter()
+        self.snapshot = snapshot
+        self.version = snapshot.version
+        header = snapshot.header
+        body = snapshot.section("body")
+        self.records = MappedRecords(body, snapshot.section("offsets"))
+        # Records are validated when the snapshot is written
+        self.places = self.records
+        self.record_by_slug = _SlugLookup(self)
+        self.categories: List[str] = header["categories"]
+        self.columns = PlaceColumns(
+            snapshot.array("rating"), snapshot.array("lat"), snapshot.array("lon"),
+            snapshot.array("category_codes"), header["category_keys"], snapshot.array("by_rating"),
+        )
+        self._slugs = snapshot.section("slugs")
+        self._slug_offsets = snapshot.section("slug_offsets")
+        self._slug_docs = snapshot.section("slug_docs")
+        self._by_rating = snapshot.section("by_rating")
+        self.text_search = text_search
+        self.spatial_index = SpatialIndex.from_arrays(
+            snapshot.section("kd_xyz"), snapshot.section("kd_latlon"),
+            snapshot.section("kd_ids"), snapshot.section("kd_splits"),
+        )
+        variants = {
+            encoding: snapshot.section(f"body.{encoding}")
+            for encoding in ENCODINGS if snapshot.has(f"body.{encoding}")
+        }
+        self.encoded: Dict[str, object] = {
+            "places": CachedBody(body, etag_for(self.version, "places"), variants)
+        }
+        self.record_bodies = BodyLRU()
+        self.build_timings = {"map": time.perf_counter() - start}
+        mark = time.perf_counter()
+        # Small next to the records; each worker sorts its own key array
+        self.suggester = Suggester(load_completions(snapshot.section("suggest")))
+        self.build_timings["suggest"] = time.perf_counter() - mark
+        mark = time.perf_counter()
+        self.fuzzy_index = FuzzyIndex.load(snapshot.section("fuzzy"))
+        self.build_timings["fuzzy_index"] = time.perf_counter() - mark
+        mark = time.perf_counter()
+        self.facets = FacetIndex(
+            self.columns, self.categories, snapshot.array("fee"), snapshot.array("hours"), header["timings"]
+        )
+        self.build_timings["facets"] = time.perf_counter() - mark
+
+    def doc_for_slug(self, slug: str) -> Optional[int]:
+        key = slug.encode("utf-8")
+        blob, offsets = self._slugs, self._slug_offsets
+        lo, hi = 0, len(self._slug_docs)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if blob[offsets[mid]:offsets[mid + 1]].tobytes() < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self._slug_docs) and blob[offsets[lo]:offsets[lo + 1]].tobytes() == key:
+            return self._slug_docs[lo]
+        return None
+
+    def get(self, slug: str) -> Optional[Dict]:
+        return self.record_by_slug.get(slug)
+
+    def in_category(self, category: str) -> Sequence[Dict]:
+        if self.columns.category(category) is None:
+            return []
+        return MappedRecords(
+            self.records._body, self.records._offsets, self.snapshot.section(f"category:{category.casefold()}")
+        )
+
+    def top_rated(self, limit: int) -> List[Dict]:
+        return list(MappedRecords(self.records._body, self.records._offsets, self._by_rating)[:limit])
+
+    def filter(
+        self,
+        category: Optional[str] = None,
+        min_rating: Optional[float] = None,
+        max_rating: Optional[float] = None,
+        bbox: Optional[BBox] = None,
+    ) -> Sequence[Dict]:
+        """Records matching every given filter, in catalog order"""
+        doc_ids = self.columns.filter(
+            category=category, min_rating=min_rating, max_rating=max_rating, bbox=bbox
+        )
+        return MappedRecords(self.records._body, self.records._offsets, doc_ids.tolist())
+
+    def search(self, query: str, category: Optional[str] = None, fuzzy: Optional[bool] = None) -> Sequence[Dict]:
+        """Ranked full-text search via the snapshot's FTS database
+
+        fuzzy as in Catalog.search.
+        """
+        if not query.strip():
+            return self.in_category(category) if category else self.records
+        return [self.records.doc(doc_id) for doc_id in self.search_ids(query, category, fuzzy)]
+
+    def search_ids(self, query: str, category: Optional[str] = None, fuzzy: Optional[bool] = None) -> List[int]:
+        if not query.strip():
+            return self.columns.filter(category=category).tolist() if category else list(range(len(self.records)))
+        doc_ids = []
+        if not fuzzy and self.text_search is not None:
+            docs = (self.doc_for_slug(slug) for slug in self.text_search(query, category))
+            doc_ids = [doc_id for doc_id in docs if doc_id is not None]
+        if doc_ids or fuzzy is False:
+            return doc_ids
+        allowed = DocMask(self.columns.mask(category=category)) if category else None
+        return [doc_id for doc_id, _ in self.fuzzy_index.search(query, allowed)]
+
+    def faceted_search(
+        self,
+        query: str,
+        filters: Optional[Dict[str, List[str]]] = None,
+        fuzzy: Optional[bool] = None,
+        category: Optional[str] = None,
+    ) -> Tuple[Sequence[Dict], Dict[str, Dict[str, int]]]:
+        now = local_now()
+        doc_ids, counts = self.facets.apply(
+            self.search_ids(query, category, fuzzy), filters, (now.weekday(), now.hour * 60 + now.minute)
+        )
+        return MappedRecords(self.records._body, self.records._offsets, doc_ids), counts
+
+    def nearby(
+        self,
+        lat: float,
+        lon: float,
+        radius: Optional[float] = None,
+        k: Optional[int] = None,
+        category: Optional[str] = None,
+    ) -> List[Tuple[Dict, float]]:
+        """(place, metres) pairs nearest first"""
+        allowed = None
+        if category:
+            if self.columns.category(category) is None:
+                return []
+            allowed = DocMask(self.columns.mask(category=category))
+        hits = self.spatial_index.nearby(lat, lon, radius, k, allowed)
+        return [(self.records.doc(doc_id), distance) for doc_id, distance in hits]
+
+    def suggest(self, query: str, limit: int = 10) -> List[Completion]:
+        return self.suggester.suggest(query, limit)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+
+class SnapshotBackend(StorageBackend):
+    """Serve a snapshot written by write_snapshot/compile_snapshot"""
+
+    name = "snapshot"
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else default_snapshot_path()
+
+    def signature(self):
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        # A new snapshot is renamed into place, so the inode changes
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def load(self, known_version=None):
+        snapshot = Snapshot(self.path)
+        if snapshot.version == known_version:
+            return None
+        fts = SQLiteBackend(self.path.parent / snapshot.header["fts"])
+        return MappedCatalog(snapshot, fts.search), snapshot.version
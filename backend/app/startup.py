@@ -0,0 +1,56 @@
+"""
+Startup timing and readiness state
+
+The lifespan records how long each startup phase took (process boot and
+imports, catalog load, index build, warm-up) and flips ``ready`` once the
+catalog is live and warmed, which is what /ready reports. The phase
+timings are printed once as a startup report and exported in /metrics.
+"""
+
+import os
+import time
+from typing import Dict, Optional
+
+
+def process_age() -> Optional[float]:
+    """Seconds since the OS started this process (Linux only, else None)"""
+    try:
+        with open("/proc/self/stat") as f:
+            # Field 22, after the parenthesised command name which may
+            # itself contain spaces
+            fields = f.read().rpartition(")")[2].split()
+        started_ticks = int(fields[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - started_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class Startup:
+    """Phase timings and the ready flag for this worker process"""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.ready = False
+        self.ready_at: Optional[float] = None
+
+    def record(self, phase: str, seconds: float):
+        self.phases[phase] = seconds
+
+    def mark_ready(self):
+        self.ready = True
+        self.ready_at = time.time()
+
+    def snapshot(self) -> Dict:
+        return {
+            "ready": self.ready,
+            "phases_ms": {phase: round(seconds * 1000, 1) for phase, seconds in self.phases.items()},
+        }
+
+    def report(self) -> str:
+        parts = [f"{phase} {seconds * 1000:.1f} ms" for phase, seconds in self.phases.items()]
+        return "Startup: " + ", ".join(parts)
+
+
+startup = Startup()
@@ -0,0 +1,293 @@
+"""
+Storage backends for the places catalog
+
+The catalog is read through a small backend interface so the data source can
+be switched by configuration:
+
+    PLACES_BACKEND=json     places.json (default; PLACES_DATA_FILE overrides the path)
+    PLACES_BACKEND=sqlite   SQLite database (PLACES_DB, default app/data/places.db)
+    PLACES_BACKEND=snapshot memory-mapped snapshot shared by all workers
+                            (PLACES_SNAPSHOT, see snapshot.py)
+
+The SQLite backend keeps one row per place with indexed category and
+rating columns, which answer the /api/places category and rating filters,
+plus an FTS5 table that answers /api/search directly. Build it from JSON
+with:
+
+    python import_places.py ../data/places.json app/data/places.db
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .search import FIELD_BOOSTS, parse_query
+
+# Columns of the FTS5 table, in bm25() weight order
+FTS_FIELDS = tuple(FIELD_BOOSTS)
+
+TextSearch = Callable[[str, Optional[str]], List[str]]
+# (category, min_rating, max_rating) -> doc ids in catalog order
+RecordFilter = Callable[[Optional[str], Optional[float], Optional[float]], List[int]]
+
+
+def resolve_data_file() -> Path:
+    """Find places.json, preferring the backend copy"""
+    override = os.environ.get("PLACES_DATA_FILE")
+    if override:
+        return Path(override)
+
+    data_file = Path(__file__).parent / "data" / "places.json"
+    if not data_file.exists():
+        # Fallback to parent directory
+        data_file = Path(__file__).parent.parent.parent / "data" / "places.json"
+    return data_file
+
+
+def _stat(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class StorageBackend:
+    """Source of place records for the catalog"""
+
+    name = "base"
+
+    def signature(self):
+        """Cheap token that changes whenever the data may have changed"""
+        raise NotImplementedError
+
+    def load(self, known_version: Optional[str] = None) -> Optional[Tuple[List[Dict], str]]:
+        """(records, version), or None if the content is still known_version
+
+        A backend that builds its own catalog (snapshot) returns it in place
+        of the records. Raises OSError if the data source is missing or
+        unreadable.
+        """
+        raise NotImplementedError
+
+    @property
+    def text_search(self) -> Optional[TextSearch]:
+        """Backend-native ranked search returning slugs, if it has one"""
+        return None
+
+    @property
+    def record_filter(self) -> Optional[RecordFilter]:
+        """Backend-native category/rating filter returning doc ids, if it has one"""
+        return None
+
+
+class JsonFileBackend(StorageBackend):
+    """The places.json file, versioned by content hash"""
+
+    name = "json"
+
+    def __init__(self, path: Optional[Path] = None):
+        self._path = path
+
+    @property
+    def path(self) -> Path:
+        return self._path or resolve_data_file()
+
+    def signature(self):
+        return _stat(self.path)
+
+    def load(self, known_version=None):
+        raw = self.path.read_bytes()
+        version = hashlib.sha256(raw).hexdigest()[:16]
+        if version == known_version:
+            # Touched but not changed, nothing to rebuild
+            return None
+        return json.loads(raw), version
+
+
+class SQLiteBackend(StorageBackend):
+    """SQLite database built by import_json, with FTS5 text search"""
+
+    name = "sqlite"
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        # Per-thread (file stat, connection) reused across queries
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self.path.exists():
+            raise FileNotFoundError(f"No such database: {self.path}")
+        return sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+
+    def signature(self):
+        # import_json replaces the whole file, so its stat is enough
+        return _stat(self.path)
+
+    def load(self, known_version=None):
+        conn = self._connect()
+        try:
+            version = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+            if version == known_version:
+                return None
+            rows = conn.execute("SELECT data FROM places ORDER BY pk").fetchall()
+        finally:
+            conn.close()
+        return [json.loads(data) for (data,) in rows], version
+
+    @property
+    def text_search(self) -> TextSearch:
+        return self.search
+
+    @property
+    def record_filter(self) -> RecordFilter:
+        return self.filter
+
+    def filter(
+        self, category: Optional[str] = None, min_rating: Optional[float] = None, max_rating: Optional[float] = None
+    ) -> List[int]:
+        """Doc ids (pk - 1) in catalog order, via the category/rating indexes"""
+        clauses, params = [], []
+        if category is not None:
+            clauses.append("category_key = ?")
+            params.append(category.casefold())
+        if min_rating is not None:
+            clauses.append("rating >= ?")
+            params.append(min_rating)
+        if max_rating is not None:
+            clauses.append("rating <= ?")
+            params.append(max_rating)
+        sql = "SELECT pk - 1 FROM places"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY pk"
+        return [doc_id for (doc_id,) in self._query_connection().execute(sql, params)]
+
+    def _query_connection(self) -> sqlite3.Connection:
+        """This thread's read-only connection, reopened when the file is replaced"""
+        stat = _stat(self.path)
+        cached = getattr(self._local, "conn", None)
+        if cached is not None:
+            if cached[0] == stat:
+                return cached[1]
+            cached[1].close()
+        conn = self._connect()
+        self._local.conn = (stat, conn)
+        return conn
+
+    def search(self, query: str, category: Optional[str] = None) -> List[str]:
+        """Slugs matching query, best bm25() first, via the FTS5 table"""
+        match = fts_query(query)
+        if not match:
+            return []
+        weights = ", ".join(str(FIELD_BOOSTS[f]) for f in FTS_FIELDS)
+        sql = (
+            "SELECT p.slug FROM places_fts JOIN places p ON p.pk = places_fts.rowid "
+            "WHERE places_fts MATCH ?"
+        )
+        params: List = [match]
+        if category:
+            sql += " AND p.category_key = ?"
+            params.append(category.casefold())
+        sql += f" ORDER BY bm25(places_fts, {weights})"
+        return [slug for (slug,) in self._query_connection().execute(sql, params)]
+
+
+def fts_query(query: str) -> str:
+    """Translate our query syntax into a safe FTS5 MATCH expression"""
+    parts = []
+    for kind, terms in parse_query(query):
+        quoted = '"' + " ".join(terms) + '"'
+        parts.append(quoted + "*" if kind == "prefix" else quoted)
+    return " AND ".join(parts)
+
+
+def _fts_text(value) -> str:
+    if isinstance(value, list):
+        return "\n".join(v for v in value if isinstance(v, str))
+    return value or ""
+
+
+def import_json(json_path: Path, db_path: Path) -> int:
+    """Build a SQLite catalog from places.json; return the number of places
+
+    The database is written to a temporary file and renamed into place, so a
+    running server never sees a half-built catalog.
+    """
+    from .catalog import validate_places
+
+    raw = Path(json_path).read_bytes()
+    places = json.loads(raw)
+    validate_places(places)  # refuse to import bad data
+    version = hashlib.sha256(raw).hexdigest()[:16]
+    build_database(places, version, db_path)
+    return len(places)
+
+
+def build_database(places: List[Dict], version: str, db_path: Path):
+    """Write validated places to a new SQLite catalog at db_path, atomically"""
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(suffix=".db", dir=db_path.parent)
+    os.close(fd)
+    try:
+        conn = sqlite3.connect(tmp_name)
+        with conn:
+            conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            conn.execute(
+                """CREATE TABLE places (
+                    pk INTEGER PRIMARY KEY,
+                    slug TEXT NOT NULL UNIQUE,
+                    category_key TEXT,
+                    rating REAL,
+                    data TEXT NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX idx_places_category ON places (category_key, rating)")
+            conn.execute("CREATE INDEX idx_places_rating ON places (rating)")
+            conn.execute(
+                f"CREATE VIRTUAL TABLE places_fts USING fts5({', '.join(FTS_FIELDS)}, "
+                f"tokenize = 'porter unicode61 remove_diacritics 2')"
+            )
+            for pk, place in enumerate(places, start=1):
+                category = place.get("category")
+                conn.execute(
+                    "INSERT INTO places (pk, slug, category_key, rating, data) VALUES (?, ?, ?, ?, ?)",
+                    (
+                        pk,
+                        place["slug"],
+                        category.casefold() if category else None,
+                        place.get("rating"),
+                        json.dumps(place, ensure_ascii=False),
+                    ),
+                )
+                conn.execute(
+                    f"INSERT INTO places_fts (rowid, {', '.join(FTS_FIELDS)}) VALUES (?{', ?' * len(FTS_FIELDS)})",
+                    (pk, *(_fts_text(place.get(f)) for f in FTS_FIELDS)),
+                )
+            conn.execute("INSERT INTO meta (key, value) VALUES ('version', ?)", (version,))
+        conn.execute("INSERT INTO places_fts (places_fts) VALUES ('optimize')")
+        conn.commit()
+        conn.close()
+        os.replace(tmp_name, db_path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def backend_from_env() -> StorageBackend:
+    """Pick the storage backend from PLACES_BACKEND"""
+    kind = os.environ.get("PLACES_BACKEND", "json").lower()
+    if kind == "sqlite":
+        return SQLiteBackend(Path(os.environ.get("PLACES_DB", Path(__file__).parent / "data" / "places.db")))
+    if kind == "json":
+        return JsonFileBackend()
+    if kind == "snapshot":
+        from .snapshot import SnapshotBackend
+        return SnapshotBackend()
+    raise ValueError(f"Unknown PLACES_BACKEND '{kind}' (expected 'json', 'sqlite' or 'snapshot')")
@@ -0,0 +1,137 @@
+"""
+Typeahead suggestions for the search box
+
+Completions (place names and slugs, categories and tags) are indexed under
+every word start, normalized like search terms, in one sorted array of
+keys. A typed prefix maps to a contiguous run of keys found by binary
+search. Prefixes shared by many keys ("t", "te", ...) have their best
+completions precomputed when the catalog loads, so a lookup is a binary
+search plus at most HEAVY_RANGE key checks, however big the catalog is.
+"""
+
+import heapq
+import json
+from bisect import bisect_left
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .search import _TOKEN_RE, normalize
+
+# Largest limit a lookup may ask for
+MAX_SUGGESTIONS = 20
+
+# Prefixes matching more keys than this get precomputed top completions
+HEAVY_RANGE = 64
+
+# Sorts after every character a normalized key can contain
+_END = "\U0010ffff"
+
+
+class Completion(NamedTuple):
+    text: str
+    kind: str  # "place", "category" or "tag"
+    slug: Optional[str]
+    rating: float
+
+
+def _words(text: str) -> List[str]:
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def _keys(words: List[str]) -> List[str]:
+    """One key per word start: "hanuman garhi" -> "hanuman garhi", "garhi" """
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+def completions_from(places: Iterable[Dict]) -> List[Completion]:
+    """Place names, categories and tags, weighted by rating
+
+    A category or tag takes the rating of its best place.
+    """
+    completions = []
+    groups: Dict[Tuple[str, str], Completion] = {}
+    for place in places:
+        rating = place.get("rating")
+        rating = float(rating) if isinstance(rating, (int, float)) else 0.0
+        if place.get("name") and place.get("slug"):
+            completions.append(Completion(place["name"], "place", place["slug"], rating))
+        labels = [("category", place.get("category"))]
+        labels += [("tag", tag) for tag in place.get("tags") or () if isinstance(tag, str)]
+        for kind, text in labels:
+            if not text:
+                continue
+            key = (kind, text.casefold())
+            current = groups.get(key)
+            if current is None or rating > current.rating:
+                groups[key] = Completion(current.text if current else text, kind, None, rating)
+    return completions + list(groups.values())
+
+
+def dump_completions(completions: List[Completion]) -> bytes:
+    return json.dumps([list(c) for c in completions], separators=(",", ":")).encode("utf-8")
+
+
+def load_completions(data) -> List[Completion]:
+    return [Completion(*c) for c in json.loads(bytes(data))]
+
+
+class Suggester:
+    """Top-k prefix completions over a sorted key array"""
+
+    def __init__(self, completions: List[Completion]):
+        # Best first, so a completion's id is also its rank and the best
+        # matches of any key range are its smallest ids
+        kind_order = {"place": 0, "category": 1, "tag": 2}
+        self.completions = sorted(
+            completions, key=lambda c: (-c.rating, kind_order.get(c.kind, 3), c.text.casefold())
+        )
+        entries = set()
+        for comp_id, completion in enumerate(self.completions):
+            entries.update((key, comp_id) for key in _keys(_words(completion.text)))
+            if completion.slug:
+                # The whole slug, for people typing it as it appears in URLs
+                entries.add((" ".join(_words(completion.slug)), comp_id))
+        entries = sorted(entries)
+        self.keys: List[str] = [key for key, _ in entries]
+        self.ids: List[int] = [comp_id for _, comp_id in entries]
+        self.heavy: Dict[str, List[int]] = {}
+        self._precompute()
+
+    def _best(self, lo: int, hi: int, limit: int) -> List[int]:
+        return heapq.nsmallest(limit, set(self.ids[lo:hi]))
+
+    def _precompute(self):
+        """Store the top completions of every prefix matching > HEAVY_RANGE keys"""
+        keys = self.keys
+        # Explicit stack; keys can share long prefixes
+        stack = [(0, len(keys), 0)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            if hi - lo <= HEAVY_RANGE:
+                continue
+            self.heavy[keys[lo][:depth]] = self._best(lo, hi, MAX_SUGGESTIONS)
+            # Keys equal to the prefix sort first; the rest split by next character
+            i = lo
+            while i < hi and len(keys[i]) == depth:
+                i += 1
+            while i < hi:
+                child = keys[i][:depth + 1]
+                j = bisect_left(keys, child + _END, i, hi)
+                stack.append((i, j, depth + 1))
+                i = j
+
+    def suggest(self, query: str, limit: int = 10) -> List[Completion]:
+        """Best completions of query's last words, best first"""
+        prefix = " ".join(_words(query))
+        if not prefix:
+            return []
+        limit = min(limit, MAX_SUGGESTIONS)
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + _END, lo)
+        if hi - lo > HEAVY_RANGE:
+            ids = self.heavy[prefix][:limit]
+        else:
+            ids = self._best(lo, hi, limit)
+        return [self.completions[comp_id] for comp_id in ids]
+
+    def __len__(self) -> int:
+        return len(self.keys)
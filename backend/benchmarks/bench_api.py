@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+API benchmark suite
+
+Drives every endpoint of app.main against synthetic catalogs of several sizes
+and reports throughput, p50/p95/p99 latency and peak RSS per endpoint and
+per catalog size. Two modes:
+
+    inprocess   ASGI app called directly through httpx (no network, no server)
+    uvicorn     a real uvicorn server per catalog size, driven over HTTP
+
+Each catalog size runs in a fresh process so memory figures don't bleed
+between sizes. Results are written as JSON and can be compared with an
+earlier run to catch regressions.
+
+Run from the backend directory:
+    pip install -r benchmarks/requirements.txt
+    python benchmarks/bench_api.py --sizes 10,1000,10000,100000 --output results.json
+    python benchmarks/bench_api.py --mode uvicorn --compare results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from synthetic_catalog import generate  # noqa: E402
+
+# (method, path, json body) built from a sample of the catalog
+Request = Tuple[str, str, Optional[Dict]]
+
+
+def _endpoints() -> List[Tuple[str, Callable[[Dict], Request]]]:
+    """Every endpoint in app.main, with a representative request for each"""
+    return [
+        ("GET /", lambda s: ("GET", "/", None)),
+        ("GET /health", lambda s: ("GET", "/health", None)),
+        ("GET /api/places", lambda s: ("GET", "/api/places", None)),
+        ("GET /api/places (304)", lambda s: ("GET", "/api/places", None)),
+        ("GET /api/places?limit=20&fields=", lambda s: ("GET", "/api/places?limit=20&fields=name,slug,image,rating,category", None)),
+        ("GET /api/places?format=ndjson", lambda s: ("GET", "/api/places?format=ndjson&fields=slug,name", None)),
+        ("GET /api/places/featured", lambda s: ("GET", "/api/places/featured", None)),
+        ("GET /api/places/nearby", lambda s: ("GET", f"/api/places/nearby?lat={s['lat']}&lon={s['lon']}&radius=2000&k=10", None)),
+        ("GET /api/places/{slug}", lambda s: ("GET", f"/api/places/{s['slug']}", None)),
+        ("GET /api/places/batch", lambda s: ("GET", f"/api/places/batch?slugs={s['slug']},missing-place&fields=name,slug,image", None)),
+        ("GET /api/places/{slug}/images", lambda s: ("GET", f"/api/places/{s['slug']}/images", None)),
+        ("GET /api/categories", lambda s: ("GET", "/api/categories", None)),
+        ("GET /api/places/category/{category}", lambda s: ("GET", f"/api/places/category/{s['category']}?limit=50", None)),
+        ("POST /api/search", lambda s: ("POST", "/api/search", {"query": s["word"], "limit": 20})),
+        ("POST /api/search (phrase)", lambda s: ("POST", "/api/search", {"query": f'"{s["phrase"]}"', "limit": 20})),
+        ("POST /api/search (prefix)", lambda s: ("POST", "/api/search", {"query": s["word"][:3] + "*", "limit": 20})),
+        ("POST /api/search (filters)", lambda s: ("POST", "/api/search", {"query": "", "filters": {"rating": ["4.5+", "4-4.5"], "fee": ["free"]}, "limit": 20})),
+        ("GET /api/suggest", lambda s: ("GET", f"/api/suggest?q={s['word'][:3]}", None)),
+        ("POST /api/itinerary", lambda s: ("POST", "/api/itinerary", {"slugs": s["stops"], "start_time": "06:00", "end_time": "22:00", "visit_minutes": 20})),
+        ("GET /api/images/{name}", lambda s: ("GET", "/api/images/ram-temple.jpg?w=320&fmt=webp", None)),
+        ("POST /api/contact", lambda s: ("POST", "/api/contact", {"name": "Bench", "email": "bench@example.com", "message": "benchmark"})),
+        ("GET /api/contact/stats", lambda s: ("GET", "/api/contact/stats", None)),
+    ]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _proc_status_kb(pid: int, field: str) -> Optional[int]:
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def reset_peak_rss(pid: int):
+    """Reset the kernel's peak RSS counter (Linux); no-op elsewhere"""
+    try:
+        Path(f"/proc/{pid}/clear_refs").write_text("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb(pid: int) -> float:
+    kb = _proc_status_kb(pid, "VmHWM")
+    if kb is None and pid == os.getpid():
+        kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == "darwin":
+            kb //= 1024
+    return round((kb or 0) / 1024, 1)
+
+
+async def drive(client, request: Request, count: int, concurrency: int, headers: Dict) -> Dict:
+    """Send count requests with concurrency in flight; return raw measurements"""
+    method, path, body = request
+    latencies: List[float] = []
+    errors = 0
+    remaining = count
+
+    async def one():
+        nonlocal errors
+        start = time.perf_counter()
+        response = await client.request(method, path, json=body, headers=headers)
+        await response.aread()
+        latencies.append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 400:
+            errors += 1
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await one()
+
+    for _ in range(min(5, count)):  # warm up caches and lazy indexes
+        await client.request(method, path, json=body, headers=headers)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": count,
+        "errors": errors,
+        "throughput_rps": round(count / wall, 1) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+    }
+
+
+def catalog_sample(places: List[Dict]) -> Dict:
+    place = places[len(places) // 2]
+    words = [w for w in place["name"].split() if len(w) > 3]
+    return {
+        "slug": place["slug"],
+        "category": place["category"],
+        "lat": place["coordinates"][0],
+        "lon": place["coordinates"][1],
+        "word": (words or [place["category"]])[0].lower(),
+        "phrase": " ".join(place["name"].split()[:2]).lower(),
+        # Up to 30 places spread over the catalog, for itinerary planning
+        "stops": [p["slug"] for p in places[::max(1, len(places) // 30)][:30]],
+    }
+
+
+def prepare_env(size: int, workdir: Path) -> Tuple[Dict, Dict]:
+    places = generate(size)
+    data_file = workdir / f"places-{size}.json"
+    data_file.write_text(json.dumps(places, ensure_ascii=False), encoding="utf-8")
+    env = {
+        "PLACES_BACKEND": "json",
+        "PLACES_DATA_FILE": str(data_file),
+        "CATALOG_POLL_INTERVAL": "0",
+        "CONTACT_DB": str(workdir / f"contact-{size}.db"),
+        "IMAGE_CACHE_DIR": str(workdir / "image_cache"),
+    }
+    return env, catalog_sample(places)
+
+
+async def run_endpoints(client, pid: int, sample: Dict, args) -> List[Dict]:
+    results = []
+    etags: Dict[str, str] = {}
+    for name, build in _endpoints():
+        if args.only and not any(o in name for o in args.only.split(",")):
+            continue
+        request = build(sample)
+        headers = {"Accept-Encoding": "gzip, br"}
+        if name.endswith("(304)"):
+            if request[1] not in etags:
+                first = await client.get(request[1], headers=headers)
+                etags[request[1]] = first.headers.get("etag", "")
+            headers["If-None-Match"] = etags[request[1]]
+        reset_peak_rss(pid)
+        stats = await drive(client, request, args.requests, args.concurrency, headers)
+        stats["endpoint"] = name
+        stats["peak_rss_mb"] = peak_rss_mb(pid)
+        results.append(stats)
+        print(f"    {name:40s} {stats['throughput_rps']:9.1f} req/s  p50 {stats['p50_ms']:8.3f}  "
+              f"p95 {stats['p95_ms']:8.3f}  p99 {stats['p99_ms']:8.3f} ms  rss {stats['peak_rss_mb']:7.1f} MB",
+              file=sys.stderr)
+    return results
+
+
+async def run_inprocess(size: int, args) -> List[Dict]:
+    import httpx
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench-"))
+    env, sample = prepare_env(size, workdir)
+    os.environ.update(env)
+
+    start = time.perf_counter()
+    from app.main import app
+    import_ms = (time.perf_counter() - start) * 1000
+
+    reset_peak_rss(os.getpid())
+    async with app.router.lifespan_context(app):
+        load_ms = (time.perf_counter() - start) * 1000 - import_ms
+        startup = {"endpoint": "startup (import + catalog load)", "requests": 1, "errors": 0,
+                   "throughput_rps": 0.0, "p50_ms": round(import_ms + load_ms, 3),
+                   "p95_ms": round(import_ms + load_ms, 3), "p99_ms": round(import_ms + load_ms, 3),
+                   "peak_rss_mb": peak_rss_mb(os.getpid())}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return [startup] + await run_endpoints(client, os.getpid(), sample, args)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def run_uvicorn(size: int, args) -> List[Dict]:
+    import httpx
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench-"))
+    env, sample = prepare_env(size, workdir)
+    port = _free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR, env={**os.environ, **env},
+    )
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+            while True:
+                if server.poll() is not None:
+                    raise RuntimeError("uvicorn exited during startup")
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.05)
+            ready_ms = (time.perf_counter() - start) * 1000
+            startup = {"endpoint": "startup (spawn to healthy)", "requests": 1, "errors": 0,
+                       "throughput_rps": 0.0, "p50_ms": round(ready_ms, 3), "p95_ms": round(ready_ms, 3),
+                       "p99_ms": round(ready_ms, 3), "peak_rss_mb": peak_rss_mb(server.pid)}
+            return [startup] + await run_endpoints(client, server.pid, sample, args)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def compare(results: List[Dict], baseline_file: str, threshold: float) -> int:
+    """Print regressions against a baseline run; return how many were found"""
+    baseline = json.loads(Path(baseline_file).read_text())
+    key = lambda r: (r["mode"], r["size"], r["endpoint"])  # noqa: E731
+    old = {key(r): r for r in baseline["results"]}
+    regressions = 0
+    print(f"\nComparison with {baseline_file} (threshold {threshold:.0%}):")
+    for r in results:
+        before = old.get(key(r))
+        if not before or r["endpoint"].startswith("startup"):
+            continue
+        p95_change = (r["p95_ms"] - before["p95_ms"]) / before["p95_ms"] if before["p95_ms"] else 0.0
+        rps_change = (r["throughput_rps"] - before["throughput_rps"]) / before["throughput_rps"] if before["throughput_rps"] else 0.0
+        if p95_change > threshold or rps_change < -threshold:
+            regressions += 1
+            print(f"  REGRESSION {r['mode']:9s} {r['size']:>7} {r['endpoint']:40s} "
+                  f"p95 {before['p95_ms']:.3f} -> {r['p95_ms']:.3f} ms ({p95_change:+.0%}), "
+                  f"throughput {rps_change:+.0%}")
+    if not regressions:
+        print("  no regressions")
+    return regressions
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every Ayodhya Guide API endpoint")
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn", "both"], default="inprocess")
+    parser.add_argument("--sizes", default="10,1000,10000,100000")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--only", help="Comma-separated substrings of endpoint names to run")
+    parser.add_argument("--output", help="Write machine-readable results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Regression threshold (fraction)")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)  # "mode:size", internal
+    args = parser.parse_args()
+
+    if args.worker:
+        mode, size = args.worker.split(":")
+        runner = run_inprocess if mode == "inprocess" else run_uvicorn
+        results = asyncio.run(runner(int(size), args))
+        print(json.dumps(results))
+        return
+
+    modes = ["inprocess", "uvicorn"] if args.mode == "both" else [args.mode]
+    sizes = [int(s) for s in args.sizes.split(",")]
+    passthrough = ["--requests", str(args.requests), "--concurrency", str(args.concurrency)]
+    if args.only:
+        passthrough += ["--only", args.only]
+
+    all_results = []
+    for mode in modes:
+        for size in sizes:
+            print(f"== {mode}, {size} places", file=sys.stderr)
+            out = subprocess.run(
+                [sys.executable, __file__, "--worker", f"{mode}:{size}", *passthrough],
+                cwd=BACKEND_DIR, stdout=subprocess.PIPE, text=True, check=True,
+            ).stdout
+            for r in json.loads(out.strip().splitlines()[-1]):
+                all_results.append({"mode": mode, "size": size, **r})
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "results": all_results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"Results written to {args.output}", file=sys.stderr)
+
+    regressions = compare(all_results, args.compare, args.threshold) if args.compare else 0
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request response_model validation vs. pre-validated bodies
+
+Compares the old /api/places behaviour (return plain dicts and let FastAPI
+validate and serialize them through List[Place] on every request) with the
+current one (validate once at load, serve cached bytes).
+
+Run from the backend directory:
+    python benchmarks/bench_response_model.py [--places 1000] [--requests 200]
+"""
+
+import argparse
+import copy
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+
+def make_catalog(size: int) -> list:
+    """Replicate the bundled places up to size, with unique ids and slugs"""
+    source = json.loads((Path(__file__).parent.parent / "app" / "data" / "places.json").read_text())
+    places = []
+    for i in range(size):
+        place = copy.deepcopy(source[i % len(source)])
+        place["id"] = i + 1
+        place["slug"] = f"{place['slug']}-{i}"
+        places.append(place)
+    return places
+
+
+def time_requests(client: TestClient, path: str, count: int) -> List[float]:
+    client.get(path)  # warm up
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = client.get(path)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--places", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    places = make_catalog(args.places)
+    data_file = Path(tempfile.mkdtemp()) / "places.json"
+    data_file.write_text(json.dumps(places))
+    os.environ["PLACES_DATA_FILE"] = str(data_file)
+    os.environ["CATALOG_POLL_INTERVAL"] = "0"
+
+    from app.main import app
+    from app.models import Place
+
+    # The previous implementation, kept here only for comparison
+    legacy = FastAPI()
+
+    @legacy.get("/api/places", response_model=List[Place])
+    async def legacy_get_places():
+        return places
+
+    print(f"Catalog: {args.places} places, {args.requests} requests per case")
+    results = {}
+    for label, target in (("response_model per request", legacy), ("pre-validated cached body", app)):
+        with TestClient(target) as client:
+            timings = time_requests(client, "/api/places", args.requests)
+        results[label] = timings
+        print(
+            f"  {label:28s} mean {statistics.mean(timings):8.3f} ms"
+            f"   p50 {statistics.median(timings):8.3f} ms"
+            f"   p95 {sorted(timings)[int(len(timings) * 0.95) - 1]:8.3f} ms"
+        )
+
+    before, after = (statistics.mean(t) for t in results.values())
+    print(f"  saving per request: {before - after:.3f} ms ({before / after:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Memory per place of the in-memory catalog
+
+Builds synthetic catalogs and measures, with tracemalloc, how many bytes
+each part of the resident Catalog costs per place once the parsed JSON has
+been released: the validated records, the search and spatial indexes, the
+columns and the warmed /api/places body.
+
+Run from the backend directory:
+    python benchmarks/catalog_memory.py [--sizes 1000,10000,100000]
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_catalog import generate  # noqa: E402
+
+
+def _allocated() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def _component(build) -> int:
+    """Bytes retained by whatever build() returns"""
+    before = _allocated()
+    kept = build()
+    after = _allocated()
+    del kept
+    return after - before
+
+
+def measure(size: int):
+    from app.catalog import Catalog, validate_places
+    from app.main import places_body
+    from app.search import SearchIndex
+
+    raw = json.dumps(generate(size)).encode("utf-8")
+    tracemalloc.start()
+    try:
+        start = _allocated()
+        places = json.loads(raw)
+        # Main parts of the build, measured on their own for the breakdown
+        records = _component(lambda: validate_places(places))
+        search = _component(lambda: SearchIndex(places))
+        catalog = Catalog(places, "bench")
+        # The parsed JSON is only needed during the build
+        places = None
+        built = _allocated()
+        places_body(catalog)
+        warmed = _allocated()
+    finally:
+        tracemalloc.stop()
+
+    parts = {
+        "catalog": built - start,
+        "  records": records,
+        "  search index": search,
+        "  other indexes": built - start - records - search,
+        "places body": warmed - built,
+    }
+    print(f"{size} places:")
+    for name, total in parts.items():
+        print(f"    {name:<16} {total / size:>10,.0f} B/place")
+    print(f"    {'total':<16} {(warmed - start) / size:>10,.0f} B/place   ({(warmed - start) / 1e6:,.1f} MB)")
+    # Keep the catalog alive until everything is measured
+    del catalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure catalog memory per place")
+    parser.add_argument("--sizes", default="1000,10000")
+    args = parser.parse_args()
+    for size in (int(s) for s in args.sizes.split(",")):
+        measure(size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Synthetic places.json generator for benchmarks
+
+Produces deterministic catalogs of any size that follow the Place schema,
+scattered around Ayodhya, with realistic text lengths so search and
+serialization costs resemble the real data.
+
+Run from the backend directory:
+    python benchmarks/synthetic_catalog.py 10000 /tmp/places-10k.json [--seed 42]
+"""
+
+import argparse
+import json
+import random
+from typing import Dict, List
+
+CENTER = (26.7922, 82.1998)
+
+CATEGORIES = {
+    "temple": ["Mandir", "Temple", "Devasthan", "Shrine"],
+    "historical": ["Fort", "Palace", "Kund", "Stambh"],
+    "cultural": ["Ghat", "Bagh", "Chowk", "Sabha"],
+    "dharamshala": ["Dharamshala", "Ashram", "Bhawan", "Niwas"],
+    "eatery": ["Bhojanalaya", "Rasoi", "Sweets", "Dhaba"],
+}
+
+NAME_WORDS = [
+    "Ram", "Sita", "Hanuman", "Lakshman", "Bharat", "Shatrughan", "Dasharath", "Kaushalya",
+    "Kanak", "Saryu", "Janaki", "Raghu", "Awadh", "Guptar", "Mani", "Treta", "Nageshwar",
+    "Valmiki", "Tulsi", "Vashishtha", "Sugriv", "Angad", "Jambvant", "Bibhishan", "Shringi",
+]
+
+SENTENCES = [
+    "Pilgrims gather here at dawn for darshan and the morning aarti.",
+    "The structure blends traditional Nagara architecture with intricate stone carvings.",
+    "Local legend connects this site to events described in the Ramayana.",
+    "The courtyard fills with devotional music during festivals such as Ram Navami and Diwali.",
+    "Visitors often combine a stop here with a walk along the Saryu river ghats.",
+    "The site was restored in the nineteenth century with support from local patrons.",
+    "Simple vegetarian meals and prasad are available nearby throughout the day.",
+    "Evening lamps reflected on the water create a serene atmosphere.",
+    "Its walls are decorated with murals depicting scenes from Lord Rama's life.",
+    "The surrounding lanes are lined with shops selling flowers, sweets and souvenirs.",
+]
+
+TIPS = [
+    "Visit early morning to avoid crowds",
+    "Dress modestly and remove footwear before entering",
+    "Photography may be restricted inside",
+    "Carry water during summer months",
+    "Attend the evening aarti for a complete experience",
+    "Hire a local guide for historical context",
+    "Keep small change for offerings and parking",
+    "Weekdays are quieter than weekends",
+]
+
+TIMINGS = [
+    "5:00 AM - 9:00 PM (All days)",
+    "6:00 AM - 8:00 PM (All days)",
+    "7:00 AM - 12:00 PM, 4:00 PM - 9:00 PM",
+    "24 hours (All days)",
+    "9:00 AM - 6:00 PM (Closed on Mondays)",
+    "8:00 AM - 10:00 PM (All days)",
+]
+
+FEES = ["Free entry for all devotees", "Free", "₹20 per person", "₹50 for adults, ₹20 for children", "₹100 per person"]
+
+IMAGES = [
+    "images/ram-temple.jpg", "images/hanuman-garhi.jpg", "images/kanak-bhawan.jpg",
+    "images/nageshwarnath-temple.jpg", "images/treta-ke-thakur.jpg", "images/chhoti-devkali.jpg",
+    "images/sarayu-ghats.jpg", "images/ayodhya-fort.jpg", "images/gulab-bari.jpg", "images/mani-parbat.jpg",
+]
+
+
+def make_place(i: int, rng: random.Random) -> Dict:
+    category = rng.choice(list(CATEGORIES))
+    name = f"{rng.choice(NAME_WORDS)} {rng.choice(NAME_WORDS)} {rng.choice(CATEGORIES[category])}"
+    slug = f"{name.lower().replace(' ', '-')}-{i}"
+    image = rng.choice(IMAGES)
+    stem = image[len("images/"):-len(".jpg")]
+    return {
+        "id": i,
+        "name": name,
+        "slug": slug,
+        "category": category,
+        "description": " ".join(rng.sample(SENTENCES, 2)),
+        "image": image,
+        "rating": round(rng.uniform(3.0, 5.0), 1),
+        "location": f"{rng.choice(NAME_WORDS)} Marg, Ayodhya, Uttar Pradesh, India",
+        "coordinates": [
+            round(rng.gauss(CENTER[0], 0.05), 6),
+            round(rng.gauss(CENTER[1], 0.05), 6),
+        ],
+        "timings": rng.choice(TIMINGS),
+        "entryFee": rng.choice(FEES),
+        "bestTime": rng.choice(["Early morning", "Evening for aarti", "October to March", "During festivals"]),
+        "history": " ".join(rng.sample(SENTENCES, 4)),
+        "tips": rng.sample(TIPS, rng.randint(2, 5)),
+        "gallery": [f"images/{stem}-{n}.jpg" for n in range(1, rng.randint(1, 4))],
+        "tags": rng.sample(NAME_WORDS, 2) + [category],
+    }
+
+
+def generate(size: int, seed: int = 42) -> List[Dict]:
+    """A deterministic catalog of size places"""
+    rng = random.Random(seed)
+    return [make_place(i, rng) for i in range(1, size + 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic places.json")
+    parser.add_argument("size", type=int)
+    parser.add_argument("output")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(generate(args.size, args.seed), f, ensure_ascii=False)
+    print(f"Wrote {args.size} places to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
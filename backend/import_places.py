@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Import places.json into the SQLite catalog backend
+Run this from the backend directory:
+    python import_places.py [../data/places.json] [app/data/places.db]
+
+Then start the server with PLACES_BACKEND=sqlite to serve from it.
+
+Or compile a memory-mapped snapshot for multi-worker servers:
+    python import_places.py --snapshot [../data/places.json] [app/data/places.snapshot]
+
+and start the workers with PLACES_BACKEND=snapshot. Re-running it while the
+server is up swaps the snapshot in place; workers pick it up on their next
+poll.
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.snapshot import compile_snapshot, default_snapshot_path
+from app.storage import import_json, resolve_data_file
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Import places.json into the SQLite catalog or a snapshot")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="Compile a memory-mapped snapshot instead of the SQLite database")
+    parser.add_argument("json_path", nargs="?", type=Path, default=None,
+                        help="Source places.json (default: the bundled data file)")
+    parser.add_argument("output", nargs="?", type=Path, default=None,
+                        help="Database or snapshot to write (default: PLACES_DB / PLACES_SNAPSHOT "
+                             "or the file under app/data)")
+    # --snapshot may come before or after the paths, as it always could
+    return parser.parse_intermixed_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    json_path = args.json_path or resolve_data_file()
+    if args.snapshot:
+        snapshot_path = args.output or default_snapshot_path()
+        print(f"Compiling {json_path} -> {snapshot_path}")
+        count = compile_snapshot(json_path, snapshot_path)
+        print(f"Compiled {count} places")
+        sys.exit(0)
+
+    db_path = args.output or Path(
+        os.environ.get("PLACES_DB", Path(__file__).parent / "app" / "data" / "places.db")
+    )
+
+    print(f"Importing {json_path} -> {db_path}")
+    count = import_json(json_path, db_path)
+    print(f"Imported {count} places")
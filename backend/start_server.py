@@ -2,24 +2,114 @@
 """
 Simple startup script for the Ayodhya Guide backend server
 Run this from the backend directory: python start_server.py
+
+Development (default): auto-reload on code changes.
+Production: python start_server.py --production [--port $PORT] [--workers N]
+    No reloader; the app is imported once up front (timed for the startup
+    report) and the catalog is loaded and warmed before traffic is accepted.
+    With more than one worker (and PLACES_BACKEND unset) places.json is
+    compiled into a memory-mapped snapshot that all workers share, and
+    recompiled whenever the JSON changes.
 """
 
-import uvicorn
-import sys
+import argparse
 import os
+import subprocess
+import sys
+import threading
+import time
+
+import uvicorn
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # Add the current directory to Python path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Start the Ayodhya Guide backend")
+    parser.add_argument("--production", action="store_true",
+                        default=os.environ.get("APP_ENV", "").lower() == "production",
+                        help="No reloader, warm start (default when APP_ENV=production)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", "1")))
+    return parser.parse_args()
+
+
+def compile_snapshot(json_path, snapshot_path):
+    """Compile in a child process so the supervisor never holds the catalog"""
+    subprocess.run(
+        [sys.executable, os.path.join(BACKEND_DIR, "import_places.py"), "--snapshot",
+         str(json_path), str(snapshot_path)],
+        check=True
+    )
+
+
+def watch_json(json_path, snapshot_path, interval):
+    """Recompile the shared snapshot when places.json changes"""
+    last = None
+    while True:
+        try:
+            st = json_path.stat()
+            current = (st.st_mtime_ns, st.st_size)
+            if last is not None and current != last:
+                compile_snapshot(json_path, snapshot_path)
+            last = current
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Snapshot compile failed, workers keep the previous one: {e}")
+        time.sleep(interval)
+
+
+def prepare_shared_snapshot():
+    """Compile places.json once for all workers and point them at it"""
+    from app.snapshot import default_snapshot_path
+    from app.storage import resolve_data_file
+
+    json_path, snapshot_path = resolve_data_file(), default_snapshot_path()
+    started = time.perf_counter()
+    compile_snapshot(json_path, snapshot_path)
+    print(f"Snapshot ready in {time.perf_counter() - started:.2f}s")
+    # Inherited by the worker processes
+    os.environ["PLACES_BACKEND"] = "snapshot"
+    os.environ["PLACES_SNAPSHOT"] = str(snapshot_path)
+    interval = float(os.environ.get("CATALOG_POLL_INTERVAL", "2.0"))
+    if interval > 0:
+        threading.Thread(target=watch_json, args=(json_path, snapshot_path, interval),
+                         name="snapshot-compiler", daemon=True).start()
+
+
+def run_production(args):
+    if args.workers > 1:
+        if "PLACES_BACKEND" not in os.environ:
+            prepare_shared_snapshot()
+        # Each worker imports and warms the app itself
+        uvicorn.run("app.main:app", host=args.host, port=args.port,
+                    workers=args.workers, log_level="info")
+        return
+
+    started = time.perf_counter()
+    from app.main import app
+    from app.startup import startup
+    startup.record("import", time.perf_counter() - started)
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="info")
+
 
 if __name__ == "__main__":
+    args = parse_args()
     print("Starting Ayodhya Guide Backend Server...")
-    print("Server will be available at: http://localhost:8000")
+    print(f"Server will be available at: http://localhost:{args.port}")
     print("Press Ctrl+C to stop the server")
-    
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
+
+    if args.production:
+        run_production(args)
+    else:
+        uvicorn.run(
+            "app.main:app",
+            host=args.host,
+            port=args.port,
+            reload=True,
+            log_level="info"
+        )
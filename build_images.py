@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Responsive Image Builder for Ayodhya Guide
+Turns the full-size JPEGs in images/ into several widths of WebP (and AVIF
+where Pillow supports it), named by content hash, and writes a manifest the
+API uses to return srcset data for each place.
+
+Usage (from the project root):
+    python build_images.py [--widths 320,640,960,1280] [--jobs N] [--force]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+from image_common import encode_image, load_manifest, write_atomic, write_manifest, writable_formats
+
+IMAGES_DIR = Path("images")
+OUTPUT_DIR = IMAGES_DIR / "build"
+MANIFEST_FILE = OUTPUT_DIR / "manifest.json"
+SOURCE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+DEFAULT_WIDTHS = (320, 640, 960, 1280)
+
+# Encoder settings per output format
+FORMAT_OPTIONS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 6},
+    "avif": {"format": "AVIF", "quality": 60, "speed": 6},
+}
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def settings_key(widths, formats):
+    """Hash of everything besides the source that affects the outputs"""
+    settings = {"widths": list(widths), "formats": {f: FORMAT_OPTIONS[f] for f in formats}}
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def output_stem(source):
+    return source.stem.replace(" ", "-").lower()
+
+
+def build_variants(source, source_sha, widths, formats, output_dir):
+    """Worker: resize one source to every width/format; return its manifest entry"""
+    variants = []
+    with Image.open(source) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGB")
+        src_width, src_height = img.size
+
+        # Never upscale; a narrow source just gets its own width
+        targets = sorted({min(w, src_width) for w in widths})
+        for width in targets:
+            height = round(src_height * width / src_width)
+            resized = img if width == src_width else img.resize((width, height), Image.LANCZOS)
+            for fmt in formats:
+                options = dict(FORMAT_OPTIONS[fmt])
+                pil_format = options.pop("format")
+                data = encode_image(resized, pil_format, **options)
+                content_hash = hashlib.sha256(data).hexdigest()[:10]
+                final = output_dir / f"{output_stem(source)}-{width}.{content_hash}.{fmt}"
+                write_atomic(final, data)
+                variants.append({
+                    "format": fmt,
+                    "width": width,
+                    "height": height,
+                    "path": final.as_posix(),
+                    "bytes": len(data),
+                })
+
+    stat = source.stat()
+    return {
+        "sha256": source_sha,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "width": src_width,
+        "height": src_height,
+        "variants": variants,
+    }
+
+
+def is_current(entry, source, source_sha, settings):
+    return (
+        entry is not None
+        and entry.get("settings") == settings
+        and entry.get("sha256") == source_sha
+        and all(Path(v["path"]).exists() for v in entry.get("variants", []))
+    )
+
+
+def remove_outputs(entry, keep=()):
+    keep = set(keep)
+    for variant in entry.get("variants", []):
+        if variant["path"] not in keep:
+            Path(variant["path"]).unlink(missing_ok=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build responsive WebP/AVIF variants of images/")
+    parser.add_argument("--widths", default=",".join(map(str, DEFAULT_WIDTHS)))
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    parser.add_argument("--force", action="store_true", help="Rebuild even if sources are unchanged")
+    args = parser.parse_args()
+
+    widths = sorted({int(w) for w in args.widths.split(",") if w.strip()})
+    formats = writable_formats(FORMAT_OPTIONS)
+    if not formats:
+        print("❌ This Pillow build cannot write WebP or AVIF")
+        return
+    settings = settings_key(widths, formats)
+
+    print("🖼️  Building responsive images for Ayodhya Guide...")
+    print(f"   Widths: {widths}   Formats: {formats}")
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    manifest = load_manifest(MANIFEST_FILE, {"sources": {}})
+    old_sources = manifest.get("sources", {})
+    sources = sorted(p for p in IMAGES_DIR.iterdir() if p.is_file() and p.suffix.lower() in SOURCE_EXTENSIONS)
+
+    new_sources = {}
+    pending = []
+    for source in sources:
+        key = source.as_posix()
+        entry = old_sources.get(key)
+        stat = source.stat()
+        # Cheap check first; only hash when size or mtime moved
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            source_sha = entry["sha256"]
+        else:
+            source_sha = file_sha256(source)
+        if not args.force and is_current(entry, source, source_sha, settings):
+            new_sources[key] = entry
+            continue
+        pending.append((source, source_sha))
+
+    print(f"   {len(sources) - len(pending)} unchanged, {len(pending)} to build")
+
+    start = time.time()
+    failures = 0
+    if pending:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            futures = {
+                pool.submit(build_variants, source, sha, widths, formats, OUTPUT_DIR): source
+                for source, sha in pending
+            }
+            for future in as_completed(futures):
+                source = futures[future]
+                key = source.as_posix()
+                try:
+                    entry = future.result()
+                except Exception as e:
+                    print(f"❌ {source.name}: {e}")
+                    failures += 1
+                    if key in old_sources:
+                        new_sources[key] = old_sources[key]
+                    continue
+                entry["settings"] = settings
+                if key in old_sources:
+                    remove_outputs(old_sources[key], keep=[v["path"] for v in entry["variants"]])
+                new_sources[key] = entry
+                total = sum(v["bytes"] for v in entry["variants"])
+                print(f"✅ {source.name}: {len(entry['variants'])} variants, {total / 1024:.0f} KB total")
+
+    # Drop outputs of sources that no longer exist
+    for key, entry in old_sources.items():
+        if key not in new_sources:
+            remove_outputs(entry)
+
+    manifest = {"widths": widths, "formats": formats, "sources": new_sources}
+    write_manifest(MANIFEST_FILE, manifest)
+
+    print(f"\n🎉 Done in {time.time() - start:.1f}s ({failures} failed)")
+    print(f"📄 Manifest saved to: {MANIFEST_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,21 +2,58 @@
 """
 Ayodhya Guide - Image Downloader
 Downloads high-quality, free images from open source websites for all locations
+
+Downloads run concurrently over pooled connections (one requests.Session per
+worker thread), at most `workers` at a time, with a token-bucket rate limit
+per host. Connection errors and 5xx responses are retried with backoff,
+and every retry waits for the host's rate limit like a first attempt. Each
+file is written to a .part file and renamed into place when complete;
+interrupted downloads resume with an HTTP Range request (guarded by If-Range
+on the ETag), and a manifest lets re-runs skip work that already finished.
 """
 
-import os
-import requests
+import argparse
 import json
-from urllib.parse import quote
+import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from urllib.parse import quote, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
 
 # Configuration
 IMAGES_DIR = "images"
 PLACES_FILE = "data/places.json"
+MANIFEST_FILE = os.path.join(IMAGES_DIR, "download_manifest.json")
 UNSPLASH_ACCESS_KEY = ""  # Optional: Add your Unsplash API key for better results
 PEXELS_API_KEY = ""       # Optional: Add your Pexels API key for better results
 
+# Service endpoints (overridable, e.g. to point at a local test server)
+UNSPLASH_API = os.environ.get("UNSPLASH_API", "https://api.unsplash.com")
+PEXELS_API = os.environ.get("PEXELS_API", "https://api.pexels.com")
+PLACEHOLDER_BASE = os.environ.get("PLACEHOLDER_BASE", "https://via.placeholder.com")
+
+# Requests per second (and burst) allowed per host
+HOST_RATE_LIMITS = {
+    "api.unsplash.com": (1.0, 2),
+    "images.unsplash.com": (4.0, 4),
+    "api.pexels.com": (1.0, 2),
+    "images.pexels.com": (4.0, 4),
+    "via.placeholder.com": (4.0, 4),
+}
+DEFAULT_RATE_LIMIT = (2.0, 2)
+
+CHUNK_SIZE = 64 * 1024
+TIMEOUT = 30
+# Retries per request on connection errors and these statuses, after
+# RETRY_BACKOFF seconds and then twice as long before each further retry
+RETRIES = 3
+RETRY_STATUSES = (500, 502, 503, 504)
+RETRY_BACKOFF = 0.5
+
 # Image search queries for each location
 LOCATION_IMAGES = {
     "ram-temple": [
@@ -81,181 +118,277 @@ LOCATION_IMAGES = {
     ]
 }
 
-def create_images_directory():
-    """Create images directory if it doesn't exist"""
-    Path(IMAGES_DIR).mkdir(exist_ok=True)
-    print(f"✅ Images directory created/verified: {IMAGES_DIR}")
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `burst`"""
 
-def download_image_from_unsplash(query, filename, size="800x600"):
-    """Download image from Unsplash (free tier)"""
-    if not UNSPLASH_ACCESS_KEY:
-        # Use Unsplash source without API key (limited but free)
-        search_url = f"https://unsplash.com/s/photos/{quote(query)}"
-        print(f"🔍 Search Unsplash manually: {search_url}")
-        return False
-    
-    headers = {"Authorization": f"Client-ID {UNSPLASH_ACCESS_KEY}"}
-    search_url = f"https://api.unsplash.com/search/photos?query={quote(query)}&per_page=1"
-    
-    try:
-        response = requests.get(search_url, headers=headers)
-        if response.status_code == 200:
-            data = response.json()
-            if data["results"]:
-                image_url = data["results"][0]["urls"]["regular"]
-                return download_image(image_url, filename)
-    except Exception as e:
-        print(f"❌ Unsplash API error: {e}")
-    
-    return False
-
-def download_image_from_pexels(query, filename, size="800x600"):
-    """Download image from Pexels (free tier)"""
-    if not PEXELS_API_KEY:
-        # Use Pexels source without API key (limited but free)
-        search_url = f"https://www.pexels.com/search/{quote(query)}/"
-        print(f"🔍 Search Pexels manually: {search_url}")
-        return False
-    
-    headers = {"Authorization": PEXELS_API_KEY}
-    search_url = f"https://api.pexels.com/v1/search?query={quote(query)}&per_page=1"
-    
-    try:
-        response = requests.get(search_url, headers=headers)
-        if response.status_code == 200:
-            data = response.json()
-            if data["photos"]:
-                image_url = data["photos"][0]["src"]["large"]
-                return download_image(image_url, filename)
-    except Exception as e:
-        print(f"❌ Pexels API error: {e}")
-    
-    return False
-
-def download_image_from_pixabay(query, filename, size="800x600"):
-    """Download image from Pixabay (free tier)"""
-    # Pixabay allows direct image downloads without API key
-    search_url = f"https://pixabay.com/images/search/{quote(query)}/"
-    print(f"🔍 Search Pixabay manually: {search_url}")
-    return False
-
-def download_image_from_wikimedia(query, filename, size="800x600"):
-    """Download image from Wikimedia Commons (completely free)"""
-    # Wikimedia Commons has many free images
-    search_url = f"https://commons.wikimedia.org/w/index.php?search={quote(query)}&title=Special:MediaSearch&go=Go&type=bitmap"
-    print(f"🔍 Search Wikimedia Commons manually: {search_url}")
-    return False
-
-def download_image(url, filename):
-    """Download image from URL"""
-    try:
-        response = requests.get(url, stream=True, timeout=30)
-        response.raise_for_status()
-        
-        filepath = os.path.join(IMAGES_DIR, filename)
-        with open(filepath, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        
-        print(f"✅ Downloaded: {filename}")
-        return True
-    except Exception as e:
-        print(f"❌ Download failed for {filename}: {e}")
-        return False
-
-def create_placeholder_image(filename, text, size="800x600"):
-    """Create a placeholder image using placeholder.com service"""
-    try:
-        # Use placeholder.com for temporary images
-        url = f"https://via.placeholder.com/{size}/4A90E2/FFFFFF?text={quote(text)}"
-        return download_image(url, filename)
-    except Exception as e:
-        print(f"❌ Placeholder creation failed for {filename}: {e}")
-        return False
-
-def download_all_images():
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostRateLimiter:
+    """One token bucket per host"""
+
+    def __init__(self, limits=None, default=DEFAULT_RATE_LIMIT):
+        self.limits = dict(HOST_RATE_LIMITS if limits is None else limits)
+        self.default = default
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlparse(url).netloc.lower()
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(*self.limits.get(host, self.default))
+                self.buckets[host] = bucket
+        bucket.acquire()
+
+
+class DownloadManifest:
+    """JSON record of finished (and partially finished) downloads"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.entries = {}
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text())
+            except ValueError:
+                print(f"⚠️  Ignoring unreadable manifest: {self.path}")
+
+    def get(self, filename):
+        with self.lock:
+            return dict(self.entries.get(filename, {}))
+
+    def update(self, filename, **fields):
+        with self.lock:
+            self.entries.setdefault(filename, {}).update(fields)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.entries, indent=2, sort_keys=True))
+            os.replace(tmp, self.path)
+
+
+class ImageDownloader:
+    """Concurrent, resumable downloads into IMAGES_DIR"""
+
+    def __init__(self, images_dir=IMAGES_DIR, manifest=None, limiter=None, workers=8, force=False):
+        self.images_dir = Path(images_dir)
+        self.manifest = manifest or DownloadManifest(self.images_dir / "download_manifest.json")
+        self.limiter = limiter or HostRateLimiter()
+        self.workers = workers
+        self.force = force
+        self.local = threading.local()
+        # Caps requests in flight, however many threads call in
+        self.slots = threading.BoundedSemaphore(workers)
+
+    @property
+    def session(self):
+        """Per-thread Session so each worker reuses its pooled connections"""
+        session = getattr(self.local, "session", None)
+        if session is None:
+            session = requests.Session()
+            # No adapter-level retries: get() retries through the rate limiter
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8, max_retries=0)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["User-Agent"] = "AyodhyaGuide-ImageDownloader/2.0"
+            self.local.session = session
+        return session
+
+    def get(self, url, **kwargs):
+        """GET url once the host's rate limit allows, retrying transient failures
+
+        The last response is returned even if its status is still in
+        RETRY_STATUSES; a connection error on the last attempt is raised.
+        """
+        kwargs.setdefault("timeout", TIMEOUT)
+        for attempt in range(RETRIES + 1):
+            if attempt:
+                time.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+            self.limiter.wait(url)
+            try:
+                response = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == RETRIES:
+                    raise
+                continue
+            if response.status_code not in RETRY_STATUSES or attempt == RETRIES:
+                return response
+            response.close()
+
+    def is_complete(self, filename, url=None):
+        entry = self.manifest.get(filename)
+        path = self.images_dir / filename
+        return (
+            entry.get("complete")
+            and (url is None or entry.get("url") == url)
+            and path.exists()
+            and path.stat().st_size == entry.get("size")
+        )
+
+    def download(self, url, filename):
+        """Download url to images_dir/filename, resuming a partial .part file"""
+        if not self.force and self.is_complete(filename, url):
+            return "skipped"
+
+        path = self.images_dir / filename
+        part = path.with_name(path.name + ".part")
+        entry = self.manifest.get(filename)
+        headers = {}
+        offset = 0
+        if part.exists() and entry.get("url") == url and not self.force:
+            offset = part.stat().st_size
+            if offset:
+                headers["Range"] = f"bytes={offset}-"
+                # Only resume if the remote file is still the same one
+                validator = entry.get("etag") or entry.get("last_modified")
+                if validator:
+                    headers["If-Range"] = validator
+
+        with self.slots, self.get(url, headers=headers, stream=True) as response:
+            if response.status_code == 416 and offset:
+                # Nothing left to fetch: the .part already holds everything
+                pass
+            else:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    offset = 0  # server ignored or refused the range
+                self.manifest.update(
+                    filename,
+                    url=url,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                    complete=False,
+                )
+                with open(part, "ab" if offset else "wb") as f:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        f.write(chunk)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+        os.replace(part, path)
+        self.manifest.update(filename, complete=True, size=path.stat().st_size, finished_at=time.time())
+        return "resumed" if offset else "downloaded"
+
+    def search_unsplash(self, query):
+        """URL of the first Unsplash result for query, if an API key is set"""
+        if not UNSPLASH_ACCESS_KEY:
+            return None
+        headers = {"Authorization": f"Client-ID {UNSPLASH_ACCESS_KEY}"}
+        try:
+            response = self.get(f"{UNSPLASH_API}/search/photos?query={quote(query)}&per_page=1", headers=headers)
+            if response.status_code == 200 and response.json()["results"]:
+                return response.json()["results"][0]["urls"]["regular"]
+        except Exception as e:
+            print(f"❌ Unsplash API error: {e}")
+        return None
+
+    def search_pexels(self, query):
+        """URL of the first Pexels result for query, if an API key is set"""
+        if not PEXELS_API_KEY:
+            return None
+        headers = {"Authorization": PEXELS_API_KEY}
+        try:
+            response = self.get(f"{PEXELS_API}/v1/search?query={quote(query)}&per_page=1", headers=headers)
+            if response.status_code == 200 and response.json()["photos"]:
+                return response.json()["photos"][0]["src"]["large"]
+        except Exception as e:
+            print(f"❌ Pexels API error: {e}")
+        return None
+
+    def fetch(self, filename, queries, placeholder_text):
+        """Try the photo APIs for each query, falling back to a placeholder"""
+        if not self.force and self.is_complete(filename):
+            return filename, "skipped", None
+        for query in queries:
+            url = self.search_unsplash(query) or self.search_pexels(query)
+            if url:
+                try:
+                    return filename, self.download(url, filename), url
+                except Exception as e:
+                    print(f"❌ Download failed for {filename}: {e}")
+        url = placeholder_url(placeholder_text)
+        try:
+            return filename, self.download(url, filename), url
+        except Exception as e:
+            print(f"❌ Placeholder creation failed for {filename}: {e}")
+            return filename, "failed", url
+
+
+def placeholder_url(text, size="800x600"):
+    """placeholder.com image with the given caption"""
+    return f"{PLACEHOLDER_BASE}/{size}/4A90E2/FFFFFF?text={quote(text)}"
+
+
+def print_manual_search_hints(queries):
+    """Sources without a download API: print search links to browse by hand"""
+    query = queries[0]
+    print(f"🔍 Search Pixabay manually: https://pixabay.com/images/search/{quote(query)}/")
+    print(f"🔍 Search Wikimedia Commons manually: https://commons.wikimedia.org/w/index.php?search={quote(query)}&title=Special:MediaSearch&go=Go&type=bitmap")
+
+
+def build_jobs(gallery_count=2):
+    """(filename, queries, placeholder text) for every main and gallery image"""
+    jobs = []
+    for location, queries in LOCATION_IMAGES.items():
+        title = location.replace('-', ' ').title()
+        jobs.append((f"{location}.jpg", queries, title))
+        for i in range(1, gallery_count + 1):
+            jobs.append((f"{location}-{i}.jpg", queries, f"{title} - View {i}"))
+    return jobs
+
+
+def download_all_images(workers=8, force=False):
     """Download images for all locations"""
     print("🚀 Starting image download for Ayodhya Guide...")
     print("=" * 60)
-    
-    create_images_directory()
-    
-    total_images = 0
-    successful_downloads = 0
-    
-    for location, queries in LOCATION_IMAGES.items():
-        print(f"\n📍 Processing: {location.replace('-', ' ').title()}")
-        print("-" * 40)
-        
-        # Main image
-        main_filename = f"{location}.jpg"
-        main_downloaded = False
-        
-        # Try different sources for main image
-        for query in queries:
-            if not main_downloaded:
-                print(f"🔍 Trying query: '{query}'")
-                
-                # Try Unsplash first
-                if UNSPLASH_ACCESS_KEY:
-                    main_downloaded = download_image_from_unsplash(query, main_filename)
-                
-                # Try Pexels if Unsplash failed
-                if not main_downloaded and PEXELS_API_KEY:
-                    main_downloaded = download_image_from_pexels(query, main_filename)
-                
-                # Try Pixabay
-                if not main_downloaded:
-                    main_downloaded = download_image_from_pixabay(query, main_filename)
-                
-                # Try Wikimedia Commons
-                if not main_downloaded:
-                    main_downloaded = download_image_from_wikimedia(query, main_filename)
-                
-                if main_downloaded:
-                    break
-        
-        # Create placeholder if no image downloaded
-        if not main_downloaded:
-            print(f"📝 Creating placeholder for: {main_filename}")
-            create_placeholder_image(main_filename, location.replace('-', ' ').title())
-            successful_downloads += 1
-        
-        total_images += 1
-        
-        # Gallery images (optional)
-        gallery_count = 2  # Limit to 2 gallery images per location
-        for i in range(1, gallery_count + 1):
-            gallery_filename = f"{location}-{i}.jpg"
-            
-            # Try to download gallery image
-            gallery_downloaded = False
-            for query in queries:
-                if not gallery_downloaded:
-                    if UNSPLASH_ACCESS_KEY:
-                        gallery_downloaded = download_image_from_unsplash(query, gallery_filename)
-                    if not gallery_downloaded and PEXELS_API_KEY:
-                        gallery_downloaded = download_image_from_pexels(query, gallery_filename)
-                    if gallery_downloaded:
-                        break
-            
-            # Create placeholder if no gallery image downloaded
-            if not gallery_downloaded:
-                create_placeholder_image(gallery_filename, f"{location.replace('-', ' ').title()} - View {i}")
-                successful_downloads += 1
-            
-            total_images += 1
-        
-        # Rate limiting to be respectful to APIs
-        time.sleep(1)
-    
+
+    Path(IMAGES_DIR).mkdir(exist_ok=True)
+    print(f"✅ Images directory created/verified: {IMAGES_DIR}")
+
+    if not (UNSPLASH_ACCESS_KEY or PEXELS_API_KEY):
+        print("ℹ️  No Unsplash/Pexels API key set; using placeholders")
+        for queries in LOCATION_IMAGES.values():
+            print_manual_search_hints(queries)
+
+    downloader = ImageDownloader(IMAGES_DIR, DownloadManifest(MANIFEST_FILE), workers=workers, force=force)
+    jobs = build_jobs()
+    counts = {}
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(downloader.fetch, *job) for job in jobs]
+        for future in as_completed(futures):
+            filename, status, _ = future.result()
+            counts[status] = counts.get(status, 0) + 1
+            icon = "❌" if status == "failed" else "⏭️ " if status == "skipped" else "✅"
+            print(f"{icon} {filename}: {status}")
+
+    successful = len(jobs) - counts.get("failed", 0)
     print("\n" + "=" * 60)
-    print(f"🎉 Download complete!")
-    print(f"📊 Total images processed: {total_images}")
-    print(f"✅ Successfully created: {successful_downloads}")
+    print(f"🎉 Download complete in {time.time() - start:.1f}s!")
+    print(f"📊 Total images processed: {len(jobs)}")
+    print(f"✅ Ready: {successful} ({', '.join(f'{k}: {v}' for k, v in sorted(counts.items()))})")
     print(f"📁 Images saved in: {IMAGES_DIR}/")
-    
-    return successful_downloads
+
+    return successful
 
 def verify_images():
     """Verify that all required images exist"""
@@ -294,6 +427,11 @@ def verify_images():
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Download images for all Ayodhya Guide locations")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent downloads")
+    parser.add_argument("--force", action="store_true", help="Ignore the manifest and download everything again")
+    args = parser.parse_args()
+
     print("🏛️  Ayodhya Guide - Image Downloader")
     print("=" * 60)
     
@@ -304,7 +442,7 @@ def main():
         return
     
     # Download images
-    download_all_images()
+    download_all_images(workers=args.workers, force=args.force)
     
     # Verify images
     verify_images()
@@ -313,7 +451,7 @@ def main():
     print("💡 Next steps:")
     print("1. Review downloaded images in the 'images/' directory")
     print("2. Replace placeholder images with better ones if needed")
-    print("3. Optimize images for web use (compress, resize)")
+    print("3. Optimize images for web use (python build_images.py)")
     print("4. Test your website to ensure images display correctly")
     print("\n🌐 Your Ayodhya Guide website is ready with images!")
 
@@ -29,7 +29,7 @@ fi
 
 # Install required packages
 echo "📦 Installing required Python packages..."
-pip3 install requests pathlib
+pip3 install -r requirements.txt
 
 # Run the Python script
 echo "🚀 Starting image download..."
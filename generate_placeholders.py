@@ -1,119 +1,207 @@
 #!/usr/bin/env python3
 """
-Simple Placeholder Image Generator for Ayodhya Guide
-Creates basic colored rectangles as placeholder images
+Placeholder Image Generator for Ayodhya Guide
+Creates simple coloured placeholder images for every image referenced in
+data/places.json (main images and gallery entries)
+
+Rendering is spread over a process pool; each worker loads its fonts once.
+A hash manifest records the inputs (text, colour, size) of every placeholder
+it wrote, so re-runs only render what changed. Files that exist but were not
+written by this script (real photos) are never overwritten unless --force.
+
+Usage (from the project root):
+    python generate_placeholders.py [--jobs N] [--force]
 """
 
-import os
-from PIL import Image, ImageDraw, ImageFont
+import argparse
+import hashlib
 import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFont
+
+from image_common import encode_image, load_manifest, write_atomic, write_manifest
+
+PLACES_FILE = Path("data/places.json")
+MANIFEST_FILE = Path("images/placeholder_manifest.json")
+SIZE = (800, 600)
+# Bump when the drawing code changes so every placeholder is re-rendered
+RENDER_VERSION = 1
 
-def create_placeholder_image(filename, name, color, category, size=(800, 600)):
+COLORS = [
+    (255, 107, 53), (76, 175, 80), (156, 39, 176), (33, 150, 243), (255, 152, 0),
+    (121, 85, 72), (96, 125, 139), (233, 30, 99), (103, 58, 183), (63, 81, 181),
+]
+
+FONT_CANDIDATES = [
+    "/System/Library/Fonts/Arial.ttf",
+    "/System/Library/Fonts/Helvetica.ttc",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf",
+    "C:\\Windows\\Fonts\\arial.ttf",
+    "DejaVuSans-Bold.ttf",
+]
+
+# Per-worker font cache, filled once by _init_worker
+_fonts = {}
+
+
+def load_font(size):
+    """First available TrueType font at size, else Pillow's default"""
+    for candidate in FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1
+        return ImageFont.load_default()
+
+
+def _init_worker():
+    _fonts["large"] = load_font(48)
+    _fonts["small"] = load_font(24)
+
+
+def color_for(slug):
+    """Stable colour per place"""
+    return COLORS[int(hashlib.md5(slug.encode()).hexdigest(), 16) % len(COLORS)]
+
+
+def build_jobs(places):
+    """One job per image path referenced by the catalog"""
+    jobs = {}
+    for place in places:
+        color = color_for(place["slug"])
+        category = place.get("category", "").title()
+        if place.get("image"):
+            jobs.setdefault(place["image"], {"title": place["name"], "subtitle": category, "color": color})
+        for i, image in enumerate(place.get("gallery") or [], start=1):
+            jobs.setdefault(image, {"title": place["name"], "subtitle": f"View {i}", "color": color})
+    return [dict(job, path=path) for path, job in sorted(jobs.items())]
+
+
+def job_hash(job):
+    inputs = {
+        "title": job["title"],
+        "subtitle": job["subtitle"],
+        "color": list(job["color"]),
+        "size": list(SIZE),
+        "version": RENDER_VERSION,
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def create_placeholder_image(name, color, category, size=SIZE):
     """Create a simple placeholder image"""
+    if not _fonts:
+        _init_worker()
+    font_large, font_small = _fonts["large"], _fonts["small"]
+
     # Create image with background color
-    img = Image.new('RGB', size, color)
+    img = Image.new('RGB', size, tuple(color))
     draw = ImageDraw.Draw(img)
-    
-    # Try to use a default font, fallback to basic if not available
-    try:
-        # Try to use a system font
-        font_large = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 48)
-        font_small = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 24)
-    except:
-        try:
-            # Try alternative font paths
-            font_large = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 48)
-            font_small = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 24)
-        except:
-            # Use default font
-            font_large = ImageFont.load_default()
-            font_small = ImageFont.load_default()
-    
+
     # Calculate text positions
     text_bbox = draw.textbbox((0, 0), name, font=font_large)
     text_width = text_bbox[2] - text_bbox[0]
     text_height = text_bbox[3] - text_bbox[1]
-    
+
     x = (size[0] - text_width) // 2
     y = (size[1] - text_height) // 2 - 30
-    
+
     # Draw main text
     draw.text((x, y), name, fill='white', font=font_large)
-    
+
     # Draw category text
     category_bbox = draw.textbbox((0, 0), category, font=font_small)
     category_width = category_bbox[2] - category_bbox[0]
     category_x = (size[0] - category_width) // 2
     category_y = y + text_height + 20
-    
+
     draw.text((category_x, category_y), category, fill='white', font=font_small)
-    
+
     # Draw border
     draw.rectangle([10, 10, size[0]-10, size[1]-10], outline='white', width=3)
-    
+
     return img
 
+
+def render(job):
+    """Worker: render one placeholder, writing it atomically"""
+    img = create_placeholder_image(job["title"], job["color"], job["subtitle"])
+    write_atomic(job["path"], encode_image(img, 'JPEG', quality=85))
+    return job["path"]
+
+
+def generate_placeholders(jobs_count=None, force=False):
+    """Render every missing or out-of-date placeholder; return (rendered, total)"""
+    places = json.loads(PLACES_FILE.read_text(encoding='utf-8'))
+    jobs = build_jobs(places)
+    manifest = load_manifest(MANIFEST_FILE, {})
+
+    pending = []
+    kept = 0
+    for job in jobs:
+        job["hash"] = job_hash(job)
+        path = Path(job["path"])
+        if path.exists():
+            recorded = manifest.get(job["path"])
+            if recorded is None and not force:
+                # Not one of ours: a real photo, leave it alone
+                kept += 1
+                continue
+            if recorded == job["hash"] and not force:
+                continue
+        pending.append(job)
+
+    print(f"   {len(jobs)} images in catalog: {len(pending)} to render, "
+          f"{len(jobs) - len(pending) - kept} up to date, {kept} real images kept")
+
+    rendered = 0
+    if pending:
+        with ProcessPoolExecutor(max_workers=jobs_count, initializer=_init_worker) as pool:
+            futures = {pool.submit(render, job): job for job in pending}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"❌ Error generating {job['path']}: {e}")
+                    continue
+                manifest[job["path"]] = job["hash"]
+                rendered += 1
+                print(f"✅ Generated: {job['path']}")
+        write_manifest(MANIFEST_FILE, manifest)
+
+    return rendered, len(pending)
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Generate placeholder images for data/places.json")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Re-render everything, overwriting existing images")
+    args = parser.parse_args()
+
     print("🖼️  Generating placeholder images for Ayodhya Guide...")
-    
-    # Create images directory if it doesn't exist
-    if not os.path.exists('images'):
-        os.makedirs('images')
-    
-    # Define required images
-    required_images = [
-        {'filename': 'ram-temple.jpg', 'name': 'Ram Temple', 'color': (255, 107, 53), 'category': 'Temple'},
-        {'filename': 'hanuman-garhi.jpg', 'name': 'Hanuman Garhi', 'color': (76, 175, 80), 'category': 'Temple'},
-        {'filename': 'kanak-bhawan.jpg', 'name': 'Kanak Bhawan', 'color': (156, 39, 176), 'category': 'Temple'},
-        {'filename': 'nageshwarnath-temple.jpg', 'name': 'Nageshwarnath Temple', 'color': (33, 150, 243), 'category': 'Temple'},
-        {'filename': 'treta-ke-thakur.jpg', 'name': 'Treta Ke Thakur', 'color': (255, 152, 0), 'category': 'Historical'},
-        {'filename': 'chhoti-devkali.jpg', 'name': 'Chhoti Devkali', 'color': (121, 85, 72), 'category': 'Temple'},
-        {'filename': 'sarayu-ghats.jpg', 'name': 'Sarayu Ghats', 'color': (96, 125, 139), 'category': 'Cultural'},
-        {'filename': 'ayodhya-fort.jpg', 'name': 'Ayodhya Fort', 'color': (233, 30, 99), 'category': 'Historical'},
-        {'filename': 'gulab-bari.jpg', 'name': 'Gulab Bari', 'color': (103, 58, 183), 'category': 'Cultural'},
-        {'filename': 'mani-parbat.jpg', 'name': 'Mani Parbat', 'color': (63, 81, 181), 'category': 'Historical'}
-    ]
-    
-    # Generate images
-    generated_count = 0
-    for img_data in required_images:
-        try:
-            img = create_placeholder_image(
-                img_data['filename'],
-                img_data['name'],
-                img_data['color'],
-                img_data['category']
-            )
-            
-            # Save image
-            filepath = os.path.join('images', img_data['filename'])
-            img.save(filepath, 'JPEG', quality=85)
-            print(f"✅ Generated: {img_data['filename']}")
-            generated_count += 1
-            
-        except Exception as e:
-            print(f"❌ Error generating {img_data['filename']}: {e}")
-    
-    print(f"\n🎉 Generated {generated_count}/{len(required_images)} placeholder images")
-    print(f"📁 Images saved to: {os.path.abspath('images')}")
-    
-    # Create a simple status file
-    status = {
-        'generated_images': [img['filename'] for img in required_images[:generated_count]],
-        'total_required': len(required_images),
-        'total_generated': generated_count,
-        'status': 'ready' if generated_count == len(required_images) else 'partial'
-    }
-    
-    with open('image_status.json', 'w') as f:
-        json.dump(status, f, indent=2)
-    
-    print(f"\n📄 Status saved to: image_status.json")
+
+    if not PLACES_FILE.exists():
+        print(f"❌ Error: {PLACES_FILE} not found!")
+        print("Please run this script from the ayodhya-guide directory")
+        return
+
+    rendered, pending = generate_placeholders(args.jobs, args.force)
+
+    print(f"\n🎉 Generated {rendered}/{pending} placeholder images")
+    print(f"📄 Manifest saved to: {MANIFEST_FILE}")
     print("\n🎯 Next Steps:")
     print("1. Check the 'images/' directory for generated placeholder images")
     print("2. Test your application - images should now load properly")
     print("3. To get real images, visit: https://uptourism.gov.in/en/dynamic/photogallery?slug=en-ayodhya")
     print("4. Replace placeholder images with real ones when available")
 
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,50 @@
+"""
+Pillow helpers shared by the image scripts (generate_placeholders.py,
+build_images.py)
+
+Encoding, atomic writes and the JSON manifests those scripts keep.
+"""
+
+import io
+import json
+import os
+from pathlib import Path
+
+from PIL import Image
+
+
+def writable_formats(formats):
+    """The formats (file extensions without the dot) this Pillow build can write"""
+    extensions = Image.registered_extensions()
+    return [fmt for fmt in formats if f".{fmt}" in extensions]
+
+
+def encode_image(img, pil_format, **options):
+    """img encoded as pil_format, as bytes"""
+    buffer = io.BytesIO()
+    img.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def write_atomic(path, data):
+    """Write bytes to path via a temporary file, so readers never see half a file"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def load_manifest(path, default):
+    """Parsed JSON manifest at path, or default if missing or unreadable"""
+    path = Path(path)
+    if path.exists():
+        try:
+            return json.loads(path.read_text())
+        except ValueError:
+            print(f"⚠️  Ignoring unreadable manifest: {path}")
+    return default
+
+
+def write_manifest(path, manifest):
+    write_atomic(path, json.dumps(manifest, indent=2, sort_keys=True).encode())
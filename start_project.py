@@ -8,9 +8,14 @@ import os
 import sys
 import subprocess
 import time
+import urllib.error
+import urllib.request
 import webbrowser
 from pathlib import Path
 
+READY_URL = "http://localhost:8000/ready"
+READY_TIMEOUT = 60
+
 def check_dependencies():
     """Check if required Python packages are installed"""
     try:
@@ -24,6 +29,30 @@ def check_dependencies():
         print("cd backend && pip install -r requirements.txt")
         return False
 
+def wait_until_ready(process, url=READY_URL, timeout=READY_TIMEOUT):
+    """Poll /ready with exponential backoff until it answers 200"""
+    started = time.monotonic()
+    delay = 0.1
+    last_error = None
+    while time.monotonic() - started < timeout:
+        if process.poll() is not None:
+            print(f"❌ Backend server exited with code {process.returncode}")
+            return False
+        try:
+            with urllib.request.urlopen(url, timeout=2) as response:
+                if response.status == 200:
+                    elapsed = time.monotonic() - started
+                    print(f"✅ Backend server is ready at {url.rsplit('/', 1)[0]} ({elapsed:.1f}s)")
+                    return True
+        except urllib.error.HTTPError as e:
+            last_error = f"HTTP {e.code}"  # 503 while still loading
+        except (urllib.error.URLError, OSError) as e:
+            last_error = e  # not listening yet
+        time.sleep(delay)
+        delay = min(delay * 2, 2.0)
+    print(f"❌ Backend server not ready after {timeout}s ({last_error})")
+    return False
+
 def start_backend():
     """Start the backend server"""
     print("🚀 Starting Ayodhya Guide Backend Server...")
@@ -41,34 +70,16 @@ def start_backend():
         # Start the server using the startup script
         if Path("start_server.py").exists():
             print("🎯 Using startup script...")
-            subprocess.Popen([sys.executable, "start_server.py"])
+            process = subprocess.Popen([sys.executable, "start_server.py"])
         else:
             print("🎯 Using uvicorn directly...")
-            subprocess.Popen([
+            process = subprocess.Popen([
                 sys.executable, "-m", "uvicorn", 
                 "app.main:app", "--reload", "--host", "0.0.0.0", "--port", "8000"
             ])
         
-        print("⏳ Waiting for server to start...")
-        time.sleep(3)
-        
-        # Test if server is running
-        try:
-            import requests
-            response = requests.get("http://localhost:8000/", timeout=5)
-            if response.status_code == 200:
-                print("✅ Backend server is running at http://localhost:8000")
-                return True
-            else:
-                print("❌ Backend server responded with error")
-                return False
-        except ImportError:
-            print("⚠️  requests module not available, skipping server check")
-            print("✅ Backend server should be running at http://localhost:8000")
-            return True
-        except Exception as e:
-            print(f"❌ Backend server check failed: {e}")
-            return False
+        print("⏳ Waiting for server to be ready...")
+        return wait_until_ready(process)
             
     except Exception as e:
         print(f"❌ Failed to start backend: {e}")
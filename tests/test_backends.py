@@ -0,0 +1,110 @@
+"""
+The json, sqlite and snapshot catalog backends give the same answers
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "backend"))
+
+from app.catalog import Catalog  # noqa: E402
+from app.snapshot import SnapshotBackend, compile_snapshot  # noqa: E402
+from app.storage import JsonFileBackend, SQLiteBackend, import_json  # noqa: E402
+
+QUERIES = ["pilgrimage", "temple", "ram", '"hanuman garhi"', "kan*", "ghat river", "hanumangarhi", "zzzz"]
+PREFIXES = ["pil", "ha", "te", "kanak b", "z"]
+FILTERS = [
+    None,
+    {"category": ["temple"]},
+    {"category": ["temple", "ghat"], "rating": ["4.5+"]},
+    {"fee": ["free"], "rating": ["4-4.5", "4.5+"]},
+]
+
+
+@pytest.fixture(scope="module")
+def catalogs(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("backends")
+    places = json.loads((ROOT / "data" / "places.json").read_text(encoding="utf-8"))
+    # Tags are not part of the validated records; every backend must still search them
+    for place in places:
+        if place["slug"] == "nageshwarnath-temple":
+            place["tags"] = ["pilgrimage"]
+    json_path = tmp / "places.json"
+    json_path.write_text(json.dumps(places), encoding="utf-8")
+
+    import_json(json_path, tmp / "places.db")
+    compile_snapshot(json_path, tmp / "places.snapshot")
+
+    sqlite = SQLiteBackend(tmp / "places.db")
+    mapped, _ = SnapshotBackend(tmp / "places.snapshot").load()
+    return {
+        "json": Catalog(*JsonFileBackend(json_path).load()),
+        "sqlite": Catalog(*sqlite.load(), sqlite.text_search, sqlite.record_filter),
+        "snapshot": mapped,
+    }
+
+
+def slugs(records):
+    return [record["slug"] for record in records]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_search(catalogs, query):
+    results = {name: slugs(catalog.search(query)) for name, catalog in catalogs.items()}
+    # sqlite and snapshot share the FTS5 ranking; json ranks with its own BM25F
+    assert results["sqlite"] == results["snapshot"]
+    assert sorted(results["json"]) == sorted(results["sqlite"])
+
+
+def test_tags_are_searchable(catalogs):
+    for catalog in catalogs.values():
+        assert slugs(catalog.search("pilgrimage")) == ["nageshwarnath-temple"]
+        assert "pilgrimage" in [c.text for c in catalog.suggest("pil")]
+
+
+@pytest.mark.parametrize("prefix", PREFIXES)
+def test_suggest(catalogs, prefix):
+    results = {name: catalog.suggest(prefix, 10) for name, catalog in catalogs.items()}
+    assert results["json"] == results["sqlite"] == results["snapshot"]
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("query", ["", "temple"])
+def test_facets(catalogs, query, filters):
+    results = {}
+    for name, catalog in catalogs.items():
+        records, counts = catalog.faceted_search(query, filters)
+        results[name] = (sorted(slugs(records)), counts)
+    assert results["json"] == results["sqlite"] == results["snapshot"]
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {"category": "Temple"},
+        {"category": "temple", "min_rating": 4.5},
+        {"min_rating": 4.0, "max_rating": 4.5},
+        {"category": "nowhere"},
+        {"category": "temple", "bbox": (26.78, 82.18, 26.81, 82.22)},
+    ],
+)
+def test_filter(catalogs, filters):
+    results = {name: slugs(catalog.filter(**filters)) for name, catalog in catalogs.items()}
+    assert results["json"] == results["sqlite"] == results["snapshot"]
+
+
+@pytest.mark.parametrize("query", ["", "temple", "ram"])
+def test_category_narrows_facet_filters(catalogs, query):
+    for catalog in catalogs.values():
+        records, counts = catalog.faceted_search(query, {"category": ["historical"]}, category="temple")
+        assert list(records) == []
+        records, counts = catalog.faceted_search(query, {"category": ["temple", "historical"]}, category="Temple")
+        assert records and all(record["category"] == "temple" for record in records)
+        assert set(name for name, n in counts["category"].items() if n) <= {"temple"}
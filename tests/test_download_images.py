@@ -0,0 +1,190 @@
+"""
+download_images.ImageDownloader against a local stand-in HTTP server
+
+Run from the project root:
+    pip install pytest
+    python -m pytest tests
+"""
+
+import hashlib
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import download_images  # noqa: E402
+from download_images import DownloadManifest, HostRateLimiter, ImageDownloader  # noqa: E402
+
+PAYLOAD = bytes(range(256)) * 1024  # 256 KB
+ETAG = '"' + hashlib.sha256(PAYLOAD).hexdigest()[:16] + '"'
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves PAYLOAD with ETag/Range support, plus a slow and a flaky path
+
+    /file/<name>    the payload; honours Range and If-Range
+    /slow/<name>    the payload after a short delay
+    /flaky/<name>   503 for the first `failures` requests, then the payload
+    """
+
+    protocol_version = "HTTP/1.1"
+    requests = []
+    lock = threading.Lock()
+    active = 0
+    max_active = 0
+    failures = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.requests.append((time.monotonic(), self.path, dict(self.headers)))
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        try:
+            if self.path.startswith("/slow/"):
+                time.sleep(0.2)
+            elif self.path.startswith("/flaky/"):
+                with cls.lock:
+                    fail = cls.failures > 0
+                    cls.failures -= 1
+                if fail:
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+            self.send_payload()
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def send_payload(self):
+        start = 0
+        byte_range = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if byte_range and (if_range is None or if_range == ETAG):
+            start = int(byte_range.split("=")[1].rstrip("-"))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}")
+        else:
+            self.send_response(200)
+        body = PAYLOAD[start:]
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    StandInHandler.requests = []
+    StandInHandler.active = StandInHandler.max_active = StandInHandler.failures = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def make_downloader(tmp_path, server, rate=1000.0, burst=1000, workers=8):
+    host = server.split("://")[1]
+    return ImageDownloader(
+        tmp_path,
+        DownloadManifest(tmp_path / "manifest.json"),
+        HostRateLimiter({host: (rate, burst)}),
+        workers=workers,
+    )
+
+
+def test_resumes_partial_download(tmp_path, server):
+    url = f"{server}/file/a.jpg"
+    half = len(PAYLOAD) // 2
+    (tmp_path / "a.jpg.part").write_bytes(PAYLOAD[:half])
+    downloader = make_downloader(tmp_path, server)
+    downloader.manifest.update("a.jpg", url=url, etag=ETAG, complete=False)
+
+    assert downloader.download(url, "a.jpg") == "resumed"
+
+    _, _, headers = StandInHandler.requests[-1]
+    assert headers["Range"] == f"bytes={half}-"
+    assert headers["If-Range"] == ETAG
+    assert (tmp_path / "a.jpg").read_bytes() == PAYLOAD
+    assert not (tmp_path / "a.jpg.part").exists()
+    assert downloader.manifest.get("a.jpg")["complete"]
+
+    # Finished: a re-run does not touch the server
+    count = len(StandInHandler.requests)
+    assert downloader.download(url, "a.jpg") == "skipped"
+    assert len(StandInHandler.requests) == count
+
+
+def test_restarts_when_remote_file_changed(tmp_path, server):
+    url = f"{server}/file/b.jpg"
+    (tmp_path / "b.jpg.part").write_bytes(b"stale bytes")
+    downloader = make_downloader(tmp_path, server)
+    downloader.manifest.update("b.jpg", url=url, etag='"old"', complete=False)
+
+    assert downloader.download(url, "b.jpg") == "downloaded"
+    assert (tmp_path / "b.jpg").read_bytes() == PAYLOAD
+
+
+def test_rate_limit_per_host(tmp_path, server):
+    downloader = make_downloader(tmp_path, server, rate=10.0, burst=1)
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        list(pool.map(lambda i: downloader.download(f"{server}/file/{i}.jpg", f"{i}.jpg"), range(6)))
+
+    times = sorted(t for t, _, _ in StandInHandler.requests)
+    assert len(times) == 6
+    # One token up front, then 10 per second
+    assert times[-1] - times[0] >= 0.45
+
+
+def test_concurrency_cap(tmp_path, server):
+    downloader = make_downloader(tmp_path, server, workers=2)
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(lambda i: downloader.download(f"{server}/slow/{i}.jpg", f"{i}.jpg"), range(6)))
+
+    assert results == ["downloaded"] * 6
+    assert StandInHandler.max_active == 2
+
+
+def test_retries_server_errors(tmp_path, server, monkeypatch):
+    monkeypatch.setattr(download_images, "RETRY_BACKOFF", 0)
+    StandInHandler.failures = 2
+    downloader = make_downloader(tmp_path, server)
+
+    assert downloader.download(f"{server}/flaky/c.jpg", "c.jpg") == "downloaded"
+    assert [path for _, path, _ in StandInHandler.requests] == ["/flaky/c.jpg"] * 3
+    assert (tmp_path / "c.jpg").read_bytes() == PAYLOAD
+
+
+def test_retries_wait_for_the_rate_limit(tmp_path, server, monkeypatch):
+    monkeypatch.setattr(download_images, "RETRY_BACKOFF", 0)
+    StandInHandler.failures = 2
+    downloader = make_downloader(tmp_path, server, rate=10.0, burst=1)
+
+    assert downloader.download(f"{server}/flaky/e.jpg", "e.jpg") == "downloaded"
+    times = [t for t, _, _ in StandInHandler.requests]
+    assert len(times) == 3
+    # One token up front, then one per 0.1 s, retries included
+    assert times[-1] - times[0] >= 0.18
+
+
+def test_gives_up_after_retries(tmp_path, server, monkeypatch):
+    monkeypatch.setattr(download_images, "RETRY_BACKOFF", 0)
+    StandInHandler.failures = download_images.RETRIES + 1
+    downloader = make_downloader(tmp_path, server)
+
+    with pytest.raises(Exception):
+        downloader.download(f"{server}/flaky/d.jpg", "d.jpg")
+    assert len(StandInHandler.requests) == download_images.RETRIES + 1
+    assert not (tmp_path / "d.jpg").exists()
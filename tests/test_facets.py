@@ -0,0 +1,156 @@
+"""
+facets.FacetIndex: filters and disjunctive counts against a brute-force count
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+import itertools
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app.columns import PlaceColumns  # noqa: E402
+from app.facets import RATING_BUCKETS, FacetIndex, fee_code, from_bits, to_bits  # noqa: E402
+from app.hours import parse_timings  # noqa: E402
+
+CATEGORIES = ["Temple", "Ghat", "Museum", None]
+FEES = ["Free", "₹50 per person", "Nominal entry fee", None]
+TIMINGS = ["5:00 AM - 9:00 PM", "9:00 AM - 6:00 PM (Closed on Mondays)", "4 - 9 PM", "24 hours", "Ask locally"]
+NOW = (0, 17 * 60)  # Monday, 5 PM
+
+
+def make_places(count=300, seed=3):
+    rng = random.Random(seed)
+    return [
+        {
+            "slug": f"p{i}",
+            "category": rng.choice(CATEGORIES),
+            "rating": rng.choice([None, round(rng.uniform(2.0, 5.0), 1)]),
+            "entryFee": rng.choice(FEES),
+            "timings": rng.choice(TIMINGS),
+        }
+        for i in range(count)
+    ]
+
+
+PLACES = make_places()
+
+
+@pytest.fixture(scope="module")
+def index():
+    names = sorted({p["category"] for p in PLACES if p["category"]})
+    return FacetIndex.from_places(PLACES, PlaceColumns.from_places(PLACES), names)
+
+
+def values(place):
+    """Facet name -> the value this place has (None if none)"""
+    rating = place["rating"]
+    bucket = None
+    if rating is not None:
+        for name, low, high in RATING_BUCKETS:
+            if (low is None or rating >= low) and (high is None or rating < high):
+                bucket = name
+    hours = parse_timings(place["timings"])
+    return {
+        "category": place["category"].casefold() if place["category"] else None,
+        "rating": bucket,
+        "fee": {1: "free", 2: "paid"}.get(fee_code(place["entryFee"])),
+        "open_now": None if hours is None else ("open" if hours.is_open(*NOW) else "closed"),
+    }
+
+
+def brute_force(doc_ids, filters):
+    facets = {doc_id: values(PLACES[doc_id]) for doc_id in doc_ids}
+    wanted = {facet: {v.casefold() for v in chosen} for facet, chosen in filters.items() if chosen}
+
+    def passes(doc_id, skip=None):
+        return all(facets[doc_id][f] in chosen for f, chosen in wanted.items() if f != skip)
+
+    kept = [doc_id for doc_id in doc_ids if passes(doc_id)]
+    counts = {}
+    for facet in ("category", "rating", "fee", "open_now"):
+        counts[facet] = {}
+        for doc_id in doc_ids:
+            if passes(doc_id, skip=facet) and facets[doc_id][facet] is not None:
+                key = facets[doc_id][facet]
+                counts[facet][key] = counts[facet].get(key, 0) + 1
+    return kept, counts
+
+
+FILTERS = [
+    {},
+    {"category": ["temple"]},
+    {"category": ["temple", "ghat"]},
+    {"category": ["Temple"], "rating": ["4.5+", "4-4.5"]},
+    {"category": ["ghat"], "fee": ["free"], "open_now": ["open"]},
+    {"rating": ["<3"], "open_now": ["closed"]},
+    {"category": ["nowhere"]},
+]
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("subset", ["all", "half"])
+def test_matches_brute_force(index, filters, subset):
+    doc_ids = list(range(len(PLACES)))
+    if subset == "half":
+        doc_ids = random.Random(1).sample(doc_ids, len(doc_ids) // 2)
+    kept, counts = index.apply(doc_ids, filters, NOW)
+    expected_kept, expected_counts = brute_force(doc_ids, filters)
+    assert kept == expected_kept
+    for facet, by_value in counts.items():
+        nonzero = {name.casefold(): n for name, n in by_value.items() if n}
+        assert nonzero == expected_counts[facet], facet
+
+
+def test_counts_are_disjunctive(index):
+    everything = list(range(len(PLACES)))
+    _, unfiltered = index.apply(everything, {}, NOW)
+    kept, counts = index.apply(everything, {"category": ["temple"]}, NOW)
+    # Picking one category still counts the others...
+    assert counts["category"] == unfiltered["category"]
+    # ...while the other facets only count temples
+    assert sum(counts["fee"].values()) == sum(1 for d in kept if values(PLACES[d])["fee"])
+    # Combining values ORs them
+    both, _ = index.apply(everything, {"category": ["temple", "ghat"]}, NOW)
+    ghats, _ = index.apply(everything, {"category": ["ghat"]}, NOW)
+    assert sorted(both) == sorted(kept + ghats)
+
+
+def test_order_is_kept(index):
+    doc_ids = list(reversed(range(len(PLACES))))
+    kept, _ = index.apply(doc_ids, {"category": ["ghat"]}, NOW)
+    assert kept == [d for d in doc_ids if PLACES[d]["category"] == "Ghat"]
+
+
+def test_display_names(index):
+    _, counts = index.apply(range(len(PLACES)), {}, NOW)
+    assert set(counts["category"]) == {"Ghat", "Museum", "Temple"}
+    assert set(counts["rating"]) == {name for name, _, _ in RATING_BUCKETS}
+
+
+def test_unknown_facet(index):
+    with pytest.raises(HTTPException):
+        index.apply([0], {"colour": ["red"]}, NOW)
+
+
+@pytest.mark.parametrize(
+    "text, code",
+    [("Free", 1), ("Free entry", 1), ("₹50", 2), ("Free for children, Rs. 20 for adults", 2),
+     ("Nominal entry fee", 2), ("Donations welcome", 0), (None, 0)],
+)
+def test_fee_code(text, code):
+    assert fee_code(text) == code
+
+
+def test_bitsets_round_trip():
+    for size in (1, 7, 8, 9, 64, 65):
+        for pattern in itertools.islice(itertools.product([False, True], repeat=min(size, 6)), 20):
+            mask = np.resize(np.array(pattern, dtype=np.bool_), size)
+            assert from_bits(to_bits(mask), size).tolist() == mask.tolist()
@@ -0,0 +1,105 @@
+"""
+fuzzy.FuzzyIndex: transliteration-tolerant name matching
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app.fuzzy import THRESHOLD, FuzzyIndex, _targets, fold, trigrams  # noqa: E402
+
+NAMES = [
+    "Kanak Bhawan",
+    "Hanuman Garhi",
+    "Sarayu River Ghats",
+    "Nageshwarnath Temple",
+    "Treta Ke Thakur",
+    "Gulab Bari",
+    "Moti Mahal",
+]
+PLACES = [{"name": name} for name in NAMES] + [{"name": None}, {}]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return FuzzyIndex.from_places(PLACES)
+
+
+def top(index, query, **kwargs):
+    results = index.search(query, **kwargs)
+    return NAMES[results[0][0]] if results else None
+
+
+@pytest.mark.parametrize(
+    "query, name",
+    [
+        ("Kanak Bhavan", "Kanak Bhawan"),
+        ("kanak bhawan", "Kanak Bhawan"),
+        ("bhavan", "Kanak Bhawan"),
+        ("Hanumangarhi", "Hanuman Garhi"),
+        ("hanuman gadhi", "Hanuman Garhi"),
+        ("Saryu", "Sarayu River Ghats"),
+        ("sarayu ghaat", "Sarayu River Ghats"),
+        ("Nageswarnath", "Nageshwarnath Temple"),
+        ("Treta ka Thakur", "Treta Ke Thakur"),
+        ("Gulaab Baari", "Gulab Bari"),
+        ("Motee Mahal", "Moti Mahal"),
+    ],
+)
+def test_transliterations(index, query, name):
+    assert top(index, query) == name
+
+
+def test_unrelated_query_matches_nothing(index):
+    assert index.search("xyzzy") == []
+    assert index.search("") == []
+    assert index.search("!!!") == []
+
+
+def test_matches_brute_force(index):
+    # Every target compared with every query, no posting lists
+    for query in ["bhavan", "ghat", "hanuman", "mahal tempel", "sarayu"]:
+        grams = trigrams(fold(query))
+        expected = {}
+        for doc_id, name in enumerate(NAMES):
+            for target in _targets(name):
+                target_grams = trigrams(target)
+                score = len(grams & target_grams) / len(grams | target_grams)
+                if score >= THRESHOLD:
+                    expected[doc_id] = max(expected.get(doc_id, 0.0), score)
+        results = index.search(query)
+        assert [doc_id for doc_id, _ in results] == sorted(expected, key=lambda d: (-expected[d], d))
+        for doc_id, score in results:
+            assert score == pytest.approx(expected[doc_id])
+
+
+def test_allowed(index):
+    assert index.search("bhavan", allowed={2, 3}) == []
+    assert [doc_id for doc_id, _ in index.search("bhavan", allowed={0})] == [0]
+
+
+def test_dump_round_trip(index):
+    loaded = FuzzyIndex.load(index.dump())
+    assert loaded.vocabulary == index.vocabulary
+    for query in ["Kanak Bhavan", "saryu", "hanumangarhi"]:
+        assert loaded.search(query) == index.search(query)
+
+
+@pytest.mark.parametrize(
+    "text, folded",
+    [
+        ("Kanak Bhawan", "kanak bavan"),
+        ("Sarayu Ghaat", "sarayu gat"),
+        ("Sarayu", "sarayu"),
+        ("Ayodhyā", "ayodya"),
+        ("Sheesh Mahal", "sis mahal"),
+    ],
+)
+def test_fold(text, folded):
+    assert fold(text) == folded
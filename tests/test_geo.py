@@ -0,0 +1,96 @@
+"""
+geo.SpatialIndex: radius and k-nearest queries against brute-force haversine
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+import math
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app.geo import EARTH_RADIUS_M, SpatialIndex, haversine  # noqa: E402
+
+
+def make_points(count, seed, centre=(26.7991, 82.2044), spread=0.5):
+    rng = random.Random(seed)
+    return [
+        (doc_id, centre[0] + rng.uniform(-spread, spread), centre[1] + rng.uniform(-spread, spread))
+        for doc_id in range(count)
+    ]
+
+
+def brute_force(points, lat, lon, radius=None, k=None, allowed=None):
+    out = sorted(
+        (
+            (doc_id, haversine(lat, lon, p_lat, p_lon))
+            for doc_id, p_lat, p_lon in points
+            if allowed is None or doc_id in allowed
+        ),
+        key=lambda r: (r[1], r[0]),
+    )
+    if radius is not None:
+        out = [r for r in out if r[1] <= radius]
+    return out[:k] if k is not None else out
+
+
+def assert_same(results, expected):
+    assert [doc_id for doc_id, _ in results] == [doc_id for doc_id, _ in expected]
+    for (_, got), (_, want) in zip(results, expected):
+        assert got == pytest.approx(want)
+
+
+@pytest.mark.parametrize("k", [1, 5, 17, 200])
+def test_knn(k):
+    points = make_points(500, seed=k)
+    index = SpatialIndex(points)
+    rng = random.Random(k + 100)
+    for _ in range(25):
+        lat, lon = 26.8 + rng.uniform(-0.6, 0.6), 82.2 + rng.uniform(-0.6, 0.6)
+        assert_same(index.nearby(lat, lon, k=k), brute_force(points, lat, lon, k=k))
+
+
+@pytest.mark.parametrize("radius", [100, 2_000, 25_000, 200_000])
+def test_radius(radius):
+    points = make_points(500, seed=radius)
+    index = SpatialIndex(points)
+    rng = random.Random(radius)
+    for _ in range(25):
+        lat, lon = 26.8 + rng.uniform(-0.5, 0.5), 82.2 + rng.uniform(-0.5, 0.5)
+        assert_same(index.nearby(lat, lon, radius=radius), brute_force(points, lat, lon, radius=radius))
+
+
+def test_radius_and_k_with_allowed():
+    points = make_points(400, seed=9)
+    index = SpatialIndex(points)
+    allowed = set(range(0, 400, 3))
+    lat, lon = 26.8, 82.2
+    assert_same(
+        index.nearby(lat, lon, radius=30_000, k=10, allowed=allowed),
+        brute_force(points, lat, lon, radius=30_000, k=10, allowed=allowed),
+    )
+
+
+def test_antimeridian_and_poles():
+    points = [(0, 10.0, 179.9), (1, 10.0, -179.9), (2, 10.0, 0.0), (3, 89.99, 0.0), (4, 89.99, 180.0)]
+    index = SpatialIndex(points)
+    near = index.nearby(10.0, 180.0, k=2)
+    assert sorted(doc_id for doc_id, _ in near) == [0, 1]
+    assert_same(index.nearby(90.0, 0.0, radius=5_000), brute_force(points, 90.0, 0.0, radius=5_000))
+
+
+def test_haversine_known_distances():
+    assert haversine(0, 0, 0, 0) == 0
+    # A quarter of the way round the equator
+    assert haversine(0, 0, 0, 90) == pytest.approx(math.pi / 2 * EARTH_RADIUS_M)
+    assert haversine(90, 0, -90, 0) == pytest.approx(math.pi * EARTH_RADIUS_M)
+
+
+def test_empty_and_zero_k():
+    assert SpatialIndex([]).nearby(0, 0, k=3) == []
+    assert SpatialIndex(make_points(10, seed=1)).nearby(0, 0, k=0) == []
@@ -0,0 +1,90 @@
+"""
+hours.parse_timings on the free-text timings field
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app.hours import DAY_MINUTES, OpeningHours, parse_timings  # noqa: E402
+
+
+def hm(hours, minutes=0):
+    return hours * 60 + minutes
+
+
+@pytest.mark.parametrize(
+    "text, intervals",
+    [
+        # A bare start takes the end's AM/PM unless that puts it at or after the end
+        ("11 - 2 PM", ((hm(11), hm(14)),)),
+        ("12 - 4 PM", ((hm(12), hm(16)),)),
+        ("9 - 5 PM", ((hm(9), hm(17)),)),
+        ("2 - 5 PM", ((hm(14), hm(17)),)),
+        ("6:30 - 11 AM", ((hm(6, 30), hm(11)),)),
+        ("5:00 AM - 9:00 PM (All days)", ((hm(5), hm(21)),)),
+        ("9.30 am to 5.30 pm", ((hm(9, 30), hm(17, 30)),)),
+        # Past midnight only when both ends say AM/PM
+        ("6 PM - 2 AM", ((hm(18), hm(2) + DAY_MINUTES),)),
+    ],
+)
+def test_single_range(text, intervals):
+    assert parse_timings(text).intervals == intervals
+
+
+def test_multi_segment():
+    hours = parse_timings("7:00 AM - 12:00 PM, 4:00 PM - 9:00 PM")
+    assert hours.intervals == ((hm(7), hm(12)), (hm(16), hm(21)))
+    assert hours.is_open(0, hm(11, 59))
+    assert not hours.is_open(0, hm(12))
+    assert not hours.is_open(0, hm(15))
+    assert hours.is_open(0, hm(16))
+
+
+def test_segments_are_sorted():
+    hours = parse_timings("4 - 9 PM, 6 - 11 AM")
+    assert hours.intervals == ((hm(6), hm(11)), (hm(16), hm(21)))
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["24 hours (Best during sunrise and sunset)", "Open 24 hours", "24 hrs", "24x7", "Open all day"],
+)
+def test_open_all_day(text):
+    hours = parse_timings(text)
+    assert hours.intervals == ((0, DAY_MINUTES),)
+    assert all(hours.is_open(day, minute) for day in range(7) for minute in (0, hm(12), DAY_MINUTES - 1))
+
+
+def test_closed_days():
+    hours = parse_timings("9:00 AM - 6:00 PM (Closed on Mondays)")
+    assert hours.closed_days == frozenset({0})
+    assert hours.on(0) == ()
+    assert hours.on(1) == ((hm(9), hm(18)),)
+    assert not hours.is_open(0, hm(10))
+    assert hours.is_open(1, hm(10))
+
+
+def test_overnight_carries_into_next_day():
+    hours = parse_timings("6 PM - 2 AM (Closed on Sunday)")
+    assert hours.is_open(5, hm(1))  # Saturday's late hours
+    assert not hours.is_open(0, hm(1))  # Sunday was closed
+    assert not hours.is_open(1, hm(3))
+
+
+@pytest.mark.parametrize(
+    "text",
+    [None, "", "Sunrise to sunset", "Varies by season", "By appointment", "11:30 - 11 AM"],
+)
+def test_unparseable(text):
+    assert parse_timings(text) is None
+
+
+def test_impossible_range_is_dropped():
+    assert parse_timings("11:30 - 11 AM, 4 - 8 PM") == OpeningHours(((hm(16), hm(20)),))
@@ -0,0 +1,108 @@
+"""
+itinerary.plan_itinerary: every stop accounted for, visits inside opening hours
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app.hours import parse_timings  # noqa: E402
+from app.itinerary import plan_itinerary  # noqa: E402
+from app.models import MAX_STOPS, ItineraryQuery  # noqa: E402
+
+TIMINGS = [
+    "5:00 AM - 9:00 PM",
+    "7:00 AM - 12:00 PM, 4:00 PM - 9:00 PM",
+    "24 hours",
+    "9:00 AM - 6:00 PM (Closed on Mondays)",
+    "4 - 9 PM",
+    "Sunrise to sunset",
+]
+START = (26.7991, 82.2044)
+TUESDAY, MONDAY = 1, 0
+
+
+def clock(text):
+    hours, minutes = text.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def make_stops(count, seed=7):
+    rng = random.Random(seed)
+    stops = []
+    for i in range(count):
+        timings = TIMINGS[i % len(TIMINGS)]
+        coords = (START[0] + rng.uniform(-0.03, 0.03), START[1] + rng.uniform(-0.03, 0.03))
+        stops.append(({"slug": f"stop-{i}", "name": f"Stop {i}", "timings": timings}, coords, parse_timings(timings)))
+    return stops
+
+
+def plan(stops, weekday=TUESDAY, start="09:00", end="18:00", visit=45, version="test"):
+    return plan_itinerary(version, START, stops, weekday, clock(start), clock(end), visit, 15.0)
+
+
+def assert_within_hours(result, stops, weekday, start, end):
+    by_slug = {place["slug"]: hours for place, _, hours in stops}
+    clock_now = clock(start)
+    for visit in result["stops"]:
+        begin, finish = clock(visit["start"]), clock(visit["end"])
+        assert clock_now <= clock(visit["arrive"]) <= begin < finish <= clock(end)
+        hours = by_slug[visit["slug"]]
+        if hours is not None:
+            assert any(opens <= begin and finish <= closes for opens, closes in hours.on(weekday))
+        clock_now = finish
+
+
+def test_every_stop_is_accounted_for():
+    stops = make_stops(12)
+    result = plan(stops)
+    planned = [visit["slug"] for visit in result["stops"]]
+    unscheduled = [entry["slug"] for entry in result["unscheduled"]]
+    assert sorted(planned + unscheduled) == sorted(place["slug"] for place, _, _ in stops)
+    assert len(set(planned)) == len(planned)
+
+
+def test_visits_respect_opening_hours():
+    for weekday in (MONDAY, TUESDAY):
+        stops = make_stops(10, seed=weekday)
+        result = plan(stops, weekday=weekday, start="08:00", end="21:00", visit=30, version=f"hours-{weekday}")
+        assert result["stops"]
+        assert_within_hours(result, stops, weekday, "08:00", "21:00")
+
+
+def test_waits_for_late_opening():
+    stops = make_stops(1)
+    stops[0] = ({"slug": "evening", "name": "Evening"}, stops[0][1], parse_timings("4 - 9 PM"))
+    result = plan(stops, start="09:00", end="20:00")
+    (visit,) = result["stops"]
+    assert visit["start"] == "16:00"
+    assert visit["wait_minutes"] > 0
+
+
+def test_closed_day_is_unscheduled():
+    stops = [({"slug": "fort", "name": "Fort"}, (26.8021, 82.2056), parse_timings("9 AM - 6 PM (Closed on Mondays)"))]
+    result = plan(stops, weekday=MONDAY)
+    assert result["stops"] == []
+    assert result["unscheduled"] == [{"slug": "fort", "reason": "closed on this day"}]
+
+
+def test_too_many_for_the_day():
+    stops = make_stops(20)
+    result = plan(stops, start="09:00", end="12:00", visit=45)
+    assert 0 < len(result["stops"]) < 20
+    assert len(result["stops"]) + len(result["unscheduled"]) == 20
+    assert_within_hours(result, stops, TUESDAY, "09:00", "12:00")
+
+
+def test_stop_count_is_capped():
+    ItineraryQuery(slugs=[f"stop-{i}" for i in range(MAX_STOPS)])
+    with pytest.raises(ValidationError):
+        ItineraryQuery(slugs=[f"stop-{i}" for i in range(MAX_STOPS + 1)])
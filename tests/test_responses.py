@@ -0,0 +1,39 @@
+"""
+responses.etag_matches: If-None-Match against a body's ETag and its variants
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+from starlette.requests import Request
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app.responses import ENCODINGS, CachedBody, etag_matches  # noqa: E402
+
+CACHED = CachedBody(b"[]", '"v1-abc"')
+
+
+def request(if_none_match):
+    return Request({"type": "http", "headers": [(b"if-none-match", if_none_match.encode())]})
+
+
+@pytest.mark.parametrize(
+    "header",
+    ['"v1-abc"', 'W/"v1-abc"', '"other", "v1-abc"', "*"]
+    + [f'"v1-abc-{encoding}"' for encoding in ENCODINGS],
+)
+def test_matches(header):
+    assert etag_matches(request(header), CACHED)
+
+
+@pytest.mark.parametrize(
+    "header",
+    ['"v1-ab"', '"v1-abc-xyz"', '"v1-abc-gzip-old"', '"v1-abc-"', '"v2-abc"', "v1-abc"],
+)
+def test_does_not_match(header):
+    assert not etag_matches(request(header), CACHED)
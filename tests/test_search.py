@@ -0,0 +1,118 @@
+"""
+search.SearchIndex: query syntax and BM25F ranking
+
+Run from the project root:
+    python -m pytest tests
+"""
+
+import math
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app.search import B, FIELD_BOOSTS, K1, SearchIndex, parse_query, tokenize  # noqa: E402
+
+PLACES = [
+    {"name": "Kanak Bhawan", "category": "temple", "description": "A palace temple gifted to Sita."},
+    {"name": "Hanuman Garhi", "category": "temple", "description": "Hilltop temple of Hanuman.",
+     "tags": ["hanuman", "hilltop"]},
+    {"name": "Ram Ki Paidi", "category": "ghat", "description": "A series of ghats on the Sarayu river.",
+     "tips": ["Visit at sunset for the aarti"]},
+    {"name": "Guptar Ghat", "category": "ghat", "description": "Quiet ghat where Ram took jal samadhi."},
+    {"name": "Bhawan Kanak Museum", "category": "museum", "description": "Paintings, not a temple."},
+    {"name": "Tulsi Smarak Bhawan", "category": "cultural", "history": ["Built for Tulsidas"],
+     "description": "Library and evening Ram katha."},
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return SearchIndex(PLACES)
+
+
+def docs(index, query, **kwargs):
+    return [doc_id for doc_id, _ in index.search(query, **kwargs)]
+
+
+def reference_scores(places, terms):
+    """BM25F written out longhand, one term at a time, summed"""
+    fields = list(FIELD_BOOSTS)
+    lengths = {f: [len(tokenize(" ".join(p[f]) if isinstance(p.get(f), list) else p.get(f) or ""))
+                   for p in places] for f in fields}
+    avg = {f: (sum(v) / len(v)) or 1.0 for f, v in lengths.items()}
+    scores = {}
+    for term in terms:
+        tfs = []
+        for doc_id, place in enumerate(places):
+            tf = 0.0
+            for f in fields:
+                value = place.get(f) or ""
+                text = " ".join(value) if isinstance(value, list) else value
+                count = tokenize(text).count(term)
+                if count:
+                    tf += FIELD_BOOSTS[f] * count / (1 - B + B * lengths[f][doc_id] / avg[f])
+            tfs.append(tf)
+        df = sum(1 for tf in tfs if tf)
+        idf = math.log(1 + (len(places) - df + 0.5) / (df + 0.5))
+        for doc_id, tf in enumerate(tfs):
+            if tf:
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf / (K1 + tf)
+    return scores
+
+
+@pytest.mark.parametrize("query", ["temple", "ram", "ghat", "bhawan", "hanuman", "temple bhawan"])
+def test_ranking_matches_reference(index, query):
+    terms = tokenize(query)
+    expected = reference_scores(PLACES, terms)
+    # AND semantics: only docs matching every term
+    matching = [d for d in expected if all(reference_scores(PLACES, [t]).get(d) for t in terms)]
+    expected_order = sorted(matching, key=lambda d: (-expected[d], d))
+    results = index.search(query)
+    assert [d for d, _ in results] == expected_order
+    for doc_id, score in results:
+        assert score == pytest.approx(expected[doc_id])
+
+
+def test_field_boosts(index):
+    # Both have "temple" as category and in the description; the museum
+    # only mentions it in its description
+    assert docs(index, "temple") == [1, 0, 4]
+    # Same name match; the shorter name wins on length normalization
+    assert docs(index, "kanak") == [0, 4]
+
+
+def test_every_term_must_match(index):
+    assert docs(index, "ram ghat") == [2, 3]
+    assert docs(index, "sita temple") == [0]
+    assert docs(index, "ram zzz") == []
+
+
+def test_plural_folding(index):
+    assert set(docs(index, "ghats")) == set(docs(index, "ghat")) == {2, 3}
+
+
+def test_phrase(index):
+    assert docs(index, '"kanak bhawan"') == [0]
+    assert docs(index, '"bhawan kanak"') == [4]
+    # Phrases stay within one field
+    assert docs(index, '"tulsidas library"') == []
+
+
+def test_prefix(index):
+    assert set(docs(index, "hanu*")) == {1}
+    assert set(docs(index, "bha*")) == {0, 4, 5}
+    assert index.expand_prefix("bha") == ["bhawan"]
+
+
+def test_allowed(index):
+    assert docs(index, "bhawan", allowed={4, 5}) == [d for d in docs(index, "bhawan") if d in {4, 5}]
+
+
+def test_parse_query():
+    assert parse_query('"Kanak Bhawan" ghats hanu*') == [
+        ("phrase", ["kanak", "bhawan"]), ("term", ["ghat"]), ("prefix", ["hanu"]),
+    ]
+    assert parse_query('"  " *') == []